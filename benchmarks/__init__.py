@@ -0,0 +1,12 @@
+"""
+Benchmarks of related.
+
+The suite (``python -m benchmarks run``) measures the throughput and peak
+memory of to_model, to_dict, to_json, from_json, to_yaml and from_yaml on
+scaled up versions of the example models and writes the results as JSON,
+to be compared between commits with ``python -m benchmarks compare``.
+
+The bench_* modules are focused benchmarks of single optimizations
+(``python -m benchmarks.bench_dates`` ...). Run from the repository root
+with related importable (e.g. PYTHONPATH=src).
+"""
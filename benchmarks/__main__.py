@@ -0,0 +1,59 @@
+"""
+Command line of the benchmark suite.
+
+    python -m benchmarks run [--records 1000 10000 ...] [--output FILE]
+    python -m benchmarks compare BASE.json NEW.json [--threshold 0.1]
+
+compare exits with status 1 if an operation got slower (or allocated more
+memory) than the threshold allows.
+"""
+import argparse
+import sys
+
+from . import suite
+from .scenarios import SCENARIOS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("--records", type=int, nargs="+",
+                     default=list(suite.DEFAULT_RECORDS),
+                     help="numbers of records (default: 1000 10000)")
+    run.add_argument("--scenario", nargs="+",
+                     choices=[s.name for s in SCENARIOS])
+    run.add_argument("--operation", nargs="+", choices=suite.OPERATIONS)
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--no-memory", action="store_true",
+                     help="skip the peak memory measurement")
+    run.add_argument("--output", help="write the results to a JSON file")
+
+    compare = commands.add_parser("compare", help="compare two results")
+    compare.add_argument("base")
+    compare.add_argument("new")
+    compare.add_argument("--threshold", type=float, default=0.1,
+                         help="tolerated slowdown ratio (default: 0.1)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        document = suite.run(args.records, args.scenario, args.operation,
+                             args.repeat, not args.no_memory,
+                             log=lambda r: suite.print_line(
+                                 suite.format_result(r)))
+        if args.output:
+            suite.save(document, args.output)
+        return 0
+
+    rows = suite.compare(suite.load(args.base), suite.load(args.new),
+                         args.threshold)
+    for row in rows:
+        suite.print_line(suite.format_row(row))
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Benchmark of the binary encoding (to_bytes/from_bytes) against JSON.
+
+Loads the document of each scenario once, then compares the payload size
+and the time to encode and decode it with to_json/from_json (compact JSON)
+and with to_bytes/from_bytes.
+
+Usage: python -m benchmarks.bench_binary [number of records]
+"""
+import sys
+
+import related
+
+from .scenarios import SCENARIOS
+from .timing import best
+
+
+def main(size=20000):
+    print("%d records" % size)
+    print("%-10s %-6s %10s %10s %10s" % ("scenario", "format", "bytes",
+                                         "encode", "decode"))
+
+    for scenario in SCENARIOS:
+        cls = scenario.cls
+        obj = related.to_model(cls, scenario.build(size))
+
+        text = related.to_json(obj, indent=None)
+        data = related.to_bytes(obj)
+        assert related.from_bytes(data, cls) == obj
+
+        print("%-10s %-6s %10d %9.3fs %9.3fs" % (
+            scenario.name, "json", len(text.encode("utf-8")),
+            best(lambda: related.to_json(obj, indent=None)),
+            best(lambda: related.from_json(text, cls))))
+        print("%-10s %-6s %10d %9.3fs %9.3fs" % (
+            scenario.name, "binary", len(data),
+            best(lambda: related.to_bytes(obj)),
+            best(lambda: related.from_bytes(data, cls))))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
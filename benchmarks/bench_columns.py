@@ -0,0 +1,60 @@
+"""
+Benchmark of to_columns and from_columns against going through dicts.
+
+Builds the columns of the DayData records of the store scenario with
+to_columns and with to_dict followed by one numpy array per key (the
+previous way), which also parses the formatted dates back. Then creates
+the models back from the columns with from_columns and with one
+dictionary per row passed to to_model.
+
+Usage: python -m benchmarks.bench_columns [number of records]
+"""
+import sys
+
+import numpy as np
+
+import related
+
+from .scenarios import get_scenario
+from .timing import best
+
+
+def via_dicts(days):
+    rows = related.to_dict(days)
+    return dict(
+        date=np.array([row["date"] for row in rows], dtype="datetime64[D]"),
+        customers=np.array([row["customers"] for row in rows],
+                           dtype="int64"),
+        sales=np.ma.masked_invalid(np.array(
+            [row["sales"] for row in rows], dtype="float64")))
+
+
+def via_rows(cls, columns):
+    keys = list(columns)
+    lists = [columns[key].tolist() for key in keys]
+    return [related.to_model(cls, dict(zip(keys, row)))
+            for row in zip(*lists)]
+
+
+def main(size=100000):
+    scenario = get_scenario("store")
+    days = related.to_model(scenario.cls, scenario.build(size)).days
+
+    assert via_dicts(days)["sales"].sum() == \
+        related.to_columns(days)["sales"].sum()
+
+    print("%d records" % size)
+    print("to_dict + arrays   %.3f s" % best(lambda: via_dicts(days)))
+    print("to_columns         %.3f s" % best(lambda: related.to_columns(days)))
+
+    cls = days[0].__class__
+    columns = related.to_columns(days)
+    assert via_rows(cls, columns) == related.from_columns(cls, columns)
+
+    print("rows + to_model    %.3f s" % best(lambda: via_rows(cls, columns)))
+    print("from_columns       %.3f s" % best(
+        lambda: related.from_columns(cls, columns)))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
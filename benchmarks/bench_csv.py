@@ -0,0 +1,50 @@
+"""
+Benchmark of from_csv and to_csv on the DayData records of the store
+scenario, against csv.DictReader/DictWriter with to_model/to_dict.
+
+Usage: python -m benchmarks.bench_csv [number of records]
+"""
+import csv
+import io
+import sys
+
+import related
+
+from .scenarios import get_scenario
+from .timing import best
+
+
+def dict_reader(text, cls):
+    return [related.to_model(cls, dict((k, v) for k, v in row.items() if v))
+            for row in csv.DictReader(io.StringIO(text))]
+
+
+def dict_writer(days):
+    stream = io.StringIO()
+    writer = csv.DictWriter(stream, list(related.to_dict(days[0])))
+    writer.writeheader()
+    writer.writerows(related.to_dict(day) for day in days)
+    return stream.getvalue()
+
+
+def main(size=100000):
+    scenario = get_scenario("store")
+    days = list(related.to_model(scenario.cls, scenario.build(size)).days)
+    cls = days[0].__class__
+    text = related.to_csv(days)
+
+    assert dict_reader(text, cls) == list(related.from_csv(text, cls))
+
+    print("%d records" % size)
+    print("DictReader + to_model  %.3f s" % best(
+        lambda: dict_reader(text, cls), repeat=3))
+    print("from_csv               %.3f s" % best(
+        lambda: list(related.from_csv(text, cls)), repeat=3))
+    print("to_dict + DictWriter   %.3f s" % best(
+        lambda: dict_writer(days), repeat=3))
+    print("to_csv                 %.3f s" % best(
+        lambda: related.to_csv(days), repeat=3))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,131 @@
+"""
+Benchmark of the date/time codec on time series records.
+
+Compares the related.dates parsers and formatters (fromisoformat/strptime per
+formatter, memoised) with the previous behaviour: dateutil for every
+datetime string, strptime for dates and times and strftime on every
+to_dict, both per call and when loading and dumping DayData-like records.
+
+Usage: python -m benchmarks.bench_dates [number of records]
+"""
+from datetime import datetime
+import sys
+
+from dateutil import parser
+
+import related
+from related import dates
+
+from .timing import best
+
+STAMPS = ["2017-12-%02dT%02d:%02d:00" % (day, hour, minute)
+          for day in range(1, 29) for hour in (8, 12, 18)
+          for minute in (0, 30)]
+
+
+@related.immutable
+class Reading(object):
+    date = related.DateField()
+    logged_on = related.TimeField("%H:%M")
+    open_at = related.TimeField()
+    stamp = related.DateTimeField()
+    local_stamp = related.DateTimeField("%m/%d/%Y %H:%M:%S")
+
+
+def make_records(size):
+    records = []
+    for i in range(size):
+        stamp = datetime.strptime(STAMPS[i % len(STAMPS)],
+                                  "%Y-%m-%dT%H:%M:%S")
+        records.append(dict(date=stamp.strftime("%Y-%m-%d"),
+                            logged_on=stamp.strftime("%H:%M"),
+                            open_at=stamp.strftime("%H:%M:%S"),
+                            stamp=stamp.isoformat(),
+                            local_stamp=stamp.strftime("%m/%d/%Y %H:%M:%S")))
+    return records
+
+
+def old_parse_date(value, formatter="%Y-%m-%d"):
+    return datetime.strptime(value, formatter).date()
+
+
+def old_parse_datetime(value, formatter="ISO_FORMAT"):
+    return parser.parse(value)
+
+
+def old_parse_time(value, formatter="%H:%M:%S"):
+    return datetime.strptime(value, formatter).time()
+
+
+def old_format_datetime(value, formatter=None):
+    formatter = formatter or "ISO_FORMAT"
+    return (value.isoformat() if formatter == "ISO_FORMAT"
+            else value.strftime(formatter))
+
+
+def old_format(value, formatter=None):
+    return value.strftime(formatter or "%Y-%m-%d")
+
+
+def old_format_time(value, formatter=None):
+    return value.strftime(formatter or "%H:%M:%S")
+
+
+OLD = dict(parse_date=old_parse_date, parse_datetime=old_parse_datetime,
+           parse_time=old_parse_time, format_date=old_format,
+           format_datetime=old_format_datetime, format_time=old_format_time)
+
+
+class patched_codec(object):
+    """ Replace the dates functions used by converters and to_dict. """
+
+    def __init__(self, functions):
+        self.functions = functions
+        self.modules = [related.converters, related.dispatchers, dates]
+
+    def __enter__(self):
+        self.saved = []
+        for module in self.modules:
+            for name, function in self.functions.items():
+                if hasattr(module, name):
+                    self.saved.append((module, name, getattr(module, name)))
+                    setattr(module, name, function)
+
+    def __exit__(self, *exc_info):
+        for module, name, function in self.saved:
+            setattr(module, name, function)
+
+
+def main(size=20000):
+    per_call = 20000
+    for name, args in [("parse_date", ("2017-12-18",)),
+                       ("parse_datetime", ("2017-12-18T08:00:00",)),
+                       ("parse_time", ("08:00:00",)),
+                       ("format_date", (datetime(2017, 12, 18).date(),))]:
+        new = getattr(dates, name)
+        new_time = best(lambda: new(*args), per_call)
+        uncached = best(lambda: new.__wrapped__(*args), per_call)
+        old = best(lambda: OLD[name](*args), per_call)
+        print("%-15s old: %6.2f us  new: %6.2f us  new uncached: %6.2f us"
+              % (name, old * 1e6 / per_call, new_time * 1e6 / per_call,
+                 uncached * 1e6 / per_call))
+
+    records = make_records(size)
+    dates.clear_caches()
+    new_load = best(lambda: [related.to_model(Reading, r) for r in records])
+    models = [related.to_model(Reading, r) for r in records]
+    new_dump = best(lambda: related.to_dict(models))
+
+    with patched_codec(OLD):
+        old_load = best(lambda: [related.to_model(Reading, r)
+                                 for r in records])
+        old_dump = best(lambda: related.to_dict(models))
+
+    print("to_model %d records  old: %.3f s  new: %.3f s"
+          % (size, old_load, new_load))
+    print("to_dict  %d records  old: %.3f s  new: %.3f s"
+          % (size, old_dump, new_dump))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
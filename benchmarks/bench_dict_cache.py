@@ -0,0 +1,62 @@
+"""
+Benchmark of to_dict on immutable models with and without cache_dict.
+
+Serves the same configuration object (a service with its endpoints) many
+times with to_dict and to_json, then serializes fresh parents sharing the
+same endpoint children, for model classes declared with and without
+``@immutable(cache_dict=True)``.
+
+Usage: python -m benchmarks.bench_dict_cache [number of calls]
+"""
+import json
+import sys
+
+import related
+
+from .timing import best
+
+
+def make_models(cache_dict):
+
+    @related.immutable(cache_dict=cache_dict)
+    class Endpoint(object):
+        path = related.StringField()
+        method = related.StringField(default="GET")
+        timeout = related.FloatField(required=False)
+        tags = related.SequenceField(str, required=False)
+
+    @related.immutable(cache_dict=cache_dict)
+    class Service(object):
+        name = related.StringField()
+        version = related.IntegerField()
+        endpoints = related.SequenceField(Endpoint)
+
+    return Endpoint, Service
+
+
+def build(cache_dict, size=50):
+    Endpoint, Service = make_models(cache_dict)
+    endpoints = [Endpoint("/api/v1/items/%d" % i, timeout=i / 10.0,
+                          tags=["a", "b"]) for i in range(size)]
+    return Service, Service("api", 1, endpoints)
+
+
+def main(calls=2000):
+    print("%d calls" % calls)
+
+    for cache_dict in (False, True):
+        Service, service = build(cache_dict)
+        name = "cache_dict=%s" % cache_dict
+
+        print("%-17s to_dict      %.3f s" % (name, best(
+            lambda: [related.to_dict(service) for _ in range(calls)])))
+        print("%-17s to_dict+json %.3f s" % (name, best(
+            lambda: [json.dumps(related.to_dict(service))
+                     for _ in range(calls)])))
+        print("%-17s new parents  %.3f s" % (name, best(
+            lambda: [related.to_dict(Service("api", i, service.endpoints))
+                     for i in range(calls // 10)])))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
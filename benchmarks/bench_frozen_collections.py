@@ -0,0 +1,83 @@
+"""
+Benchmark of the frozen collections of immutable models.
+
+Loads records with a sequence, a set and a mapping field into immutable
+model classes declared with and without frozen_collections, comparing the
+load time, the memory held by the models (traced allocations of the load
+that are still alive afterwards) and the time of attr.evolve (the frozen
+collections are passed to the new instance as is). The frozen records are
+then put in a set, which mutable collections do not allow.
+
+Usage: python -m benchmarks.bench_frozen_collections [number of records]
+"""
+import gc
+import sys
+import tracemalloc
+
+import attr
+
+import related
+
+from .timing import best
+
+
+def build(frozen):
+
+    @related.immutable
+    class Tag(object):
+        name = related.StringField()
+
+    @related.immutable(frozen_collections=frozen)
+    class Record(object):
+        name = related.StringField()
+        values = related.SequenceField(int)
+        labels = related.SetField(str)
+        tags = related.MappingField(Tag, "name")
+
+    @related.immutable(frozen_collections=frozen)
+    class Table(object):
+        records = related.SequenceField(Record)
+
+    return Table
+
+
+def retained(load):
+    gc.collect()
+    tracemalloc.start()
+    obj = load()  # noqa F841 (kept alive while measured)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main(size=20000):
+    document = {"records": [
+        {"name": "record-%d" % i, "values": list(range(i % 8)),
+         "labels": ["a", "b"], "tags": {"x": {}, "y": {}}}
+        for i in range(size)]}
+
+    print("%d records" % size)
+
+    for frozen in (False, True):
+        Table = build(frozen)
+        table = related.to_model(Table, document)
+
+        def evolve():
+            for record in table.records:
+                attr.evolve(record, name="renamed")
+
+        print("frozen_collections=%-5s load %.3f s %8.1f KiB  "
+              "evolve %.3f s" % (
+                  frozen,
+                  best(lambda: related.to_model(Table, document)),
+                  retained(lambda: related.to_model(Table,
+                                                    document)) / 1024.0,
+                  best(evolve)))
+
+    print("set of the frozen records %.3f s" % best(
+        lambda: set(table.records)))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
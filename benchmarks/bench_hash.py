@@ -0,0 +1,66 @@
+"""
+Benchmark of set fields and hash-keyed lookups of deep immutable models
+with and without cache_hash.
+
+Members are chains of nested child models (depth levels). Loads a model
+with a SetField of the members, then tests the membership of every member
+a few times, for model classes declared with and without
+``@immutable(cache_hash=True)``.
+
+Usage: python -m benchmarks.bench_hash [number of members] [depth]
+"""
+import sys
+
+import related
+
+from .timing import best
+
+
+def build(cache_hash, size, depth):
+    @related.immutable(cache_hash=cache_hash)
+    class Leaf(object):
+        name = related.StringField()
+        value = related.IntegerField()
+
+    cls = Leaf
+    for level in range(depth):
+        cls = related.immutable(cache_hash=cache_hash)(type(
+            "Level%d" % level, (object,), dict(
+                name=related.StringField(), value=related.IntegerField(),
+                child=related.ChildField(cls))))
+
+    @related.immutable
+    class Group(object):
+        members = related.SetField(cls)
+
+    def member(i):
+        value = {"name": "leaf", "value": i}
+        for level in range(depth):
+            value = {"name": "level-%d" % level, "value": level,
+                     "child": value}
+        return value
+
+    return Group, [member(i) for i in range(size)]
+
+
+def main(size=5000, depth=10):
+    print("%d members, depth %d" % (size, depth))
+
+    for cache_hash in (False, True):
+        Group, members = build(cache_hash, size, depth)
+        group = related.to_model(Group, {"members": members})
+        items = list(group.members)
+
+        def lookups():
+            for _ in range(5):
+                for item in items:
+                    assert item in group.members
+
+        print("cache_hash=%-5s load %.3f s  lookups %.3f s" % (
+            cache_hash,
+            best(lambda: related.to_model(Group, {"members": members})),
+            best(lookups)))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,58 @@
+"""
+Benchmark of interning on the memory held by loaded model graphs.
+
+Loads the JSON documents of the benchmark scenarios with and without
+intern=True and reports the memory still allocated by the loaded models
+(measured with tracemalloc, the JSON text excluded), the load time and the
+interner statistics.
+
+Usage: python -m benchmarks.bench_interning [number of records]
+"""
+import gc
+import sys
+import tracemalloc
+
+import related
+
+from .scenarios import SCENARIOS
+from .timing import best
+
+
+def retained_memory(func):
+    """ Bytes still allocated by the result of func once it returned. """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
+
+
+def main(size=10000):
+    print("%-10s %-6s %10s %10s %10s %12s" % (
+        "scenario", "intern", "retained", "seconds", "hits", "bytes saved"))
+
+    for scenario in SCENARIOS:
+        cls = scenario.cls
+        text = related.to_json(related.to_model(cls, scenario.build(size)))
+
+        for intern in (False, True):
+            # the table of a shared Interner would be measured too
+            memory, _ = retained_memory(
+                lambda: related.from_json(text, cls, intern=intern))
+            interner = related.Interner()
+            related.from_json(text, cls, intern=interner)
+            stats = interner.stats() if intern else None
+            seconds = best(lambda: related.from_json(text, cls,
+                                                     intern=intern),
+                           repeat=3)
+            print("%-10s %-6s %7.1f MB %9.3fs %10s %12s" % (
+                scenario.name, intern, memory / 1e6, seconds,
+                stats.hits if stats else "-",
+                stats.bytes_saved if stats else "-"))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
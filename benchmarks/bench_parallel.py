@@ -0,0 +1,87 @@
+"""
+Benchmark of the workers=N mode on large record collections.
+
+Loads and dumps a model with a long sequence field (from_json/to_json) and
+JSON Lines records (from_jsonl/to_jsonl) serially and with 1, 2, 4 ... N
+worker processes. Scaling depends on the number of cores available and on
+the cost of pickling the records to the workers and the results back to
+the parent process: workers only pay off when converting a record costs
+more than pickling it and its result, which is printed first. On a single
+core the workers are slower than the serial mode.
+
+The models are defined in this script, which relies on the fork start
+method (the default on Linux) for the workers to find them.
+
+Usage: python -m benchmarks.bench_parallel [number of records] [workers]
+"""
+import json
+import multiprocessing
+import pickle
+import sys
+
+import related
+
+from .timing import best
+
+
+@related.immutable
+class Day(object):
+    date = related.DateField()
+    open_at = related.TimeField()
+    closed_on = related.TimeField()
+    customers = related.IntegerField()
+    sales = related.FloatField(required=False)
+
+
+@related.immutable
+class Store(object):
+    name = related.StringField()
+    created_on = related.DateTimeField()
+    days = related.SequenceField(Day)
+
+
+def make_store(size):
+    days = [dict(date="2017-%02d-%02d" % (1 + i % 12, 1 + i % 28),
+                 open_at="08:%02d:00" % (i % 60),
+                 closed_on="19:%02d:00" % (i % 60),
+                 customers=i, sales=i * 1.5)
+            for i in range(size)]
+    return dict(name="store", created_on="2017-12-21T14:21:55", days=days)
+
+
+def main(size=200000, max_workers=None):
+    max_workers = max_workers or multiprocessing.cpu_count()
+    text = json.dumps(make_store(size))
+    store = related.from_json(text, Store)
+    lines = related.to_jsonl(store.days)
+
+    cases = [
+        ("from_json", lambda w: related.from_json(text, Store, workers=w)),
+        ("to_json", lambda w: related.to_json(store, workers=w)),
+        ("from_jsonl", lambda w: list(related.from_jsonl(lines, Day,
+                                                         workers=w))),
+        ("to_jsonl", lambda w: related.to_jsonl(store.days, workers=w)),
+    ]
+
+    workers = [None, 1]
+    while workers[-1] < max_workers:
+        workers.append(min(max_workers, 2 * workers[-1]))
+
+    print("%d records, %d cpus" % (size, multiprocessing.cpu_count()))
+
+    raw_days = json.loads(text)["days"]
+    days = list(store.days)
+    print("per record: to_model %.1f us, pickling record and model %.1f us"
+          % tuple(1e6 * seconds / size for seconds in (
+              best(lambda: list(related.to_models(Day, raw_days)), repeat=3),
+              best(lambda: (pickle.loads(pickle.dumps(raw_days)),
+                            pickle.loads(pickle.dumps(days))), repeat=3))))
+    print("%-12s" % "workers" +
+          "".join("%10s" % (w or "serial") for w in workers))
+    for name, func in cases:
+        times = [best(lambda: func(w), repeat=3) for w in workers]
+        print("%-12s" % name + "".join("%9.3fs" % t for t in times))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
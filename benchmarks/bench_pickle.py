@@ -0,0 +1,66 @@
+"""
+Benchmark of pickling models, as when sending them to worker processes.
+
+For the document of each scenario, compares the size and the time to
+pickle and unpickle the models with the previous way of sending them
+across processes (to_dict, then to_model on the other side). Then pickles
+a model holding a long float sequence with protocol 4, with protocol 5
+in-band and with protocol 5 out-of-band buffers.
+
+Usage: python -m benchmarks.bench_pickle [number of records]
+"""
+import pickle
+import sys
+
+import related
+
+from .scenarios import SCENARIOS
+from .timing import best
+
+
+@related.immutable
+class Series(object):
+    name = related.StringField()
+    values = related.SequenceField(float)
+
+
+def row(name, size, dump, load):
+    print("%-22s %10d %9.3fs %9.3fs" % (name, size, best(dump), best(load)))
+
+
+def main(size=20000):
+    print("%d records" % size)
+    print("%-22s %10s %10s %10s" % ("", "bytes", "dump", "load"))
+
+    for scenario in SCENARIOS:
+        cls = scenario.cls
+        obj = related.to_model(cls, scenario.build(size))
+
+        data = pickle.dumps(related.to_dict(obj), 4)
+        row(scenario.name + " dicts", len(data),
+            lambda: pickle.dumps(related.to_dict(obj), 4),
+            lambda: related.to_model(cls, pickle.loads(data)))
+
+        data = pickle.dumps(obj, 4)
+        assert pickle.loads(data) == obj
+        row(scenario.name + " models", len(data),
+            lambda: pickle.dumps(obj, 4), lambda: pickle.loads(data))
+
+    series = Series("series", [i / 7.0 for i in range(size * 50)])
+
+    for protocol in (4, 5):
+        data = pickle.dumps(series, protocol)
+        row("floats protocol %d" % protocol, len(data),
+            lambda: pickle.dumps(series, protocol),
+            lambda: pickle.loads(data))
+
+    buffers = []
+    data = pickle.dumps(series, 5, buffer_callback=buffers.append)
+    assert pickle.loads(data, buffers=buffers) == series
+    row("floats out-of-band", len(data),
+        lambda: pickle.dumps(series, 5, buffer_callback=list().append),
+        lambda: pickle.loads(data, buffers=buffers))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,82 @@
+"""
+Benchmark of string class references (e.g. self-referencing models).
+
+Compares the cached class resolution of the converters with the previous
+behaviour, where every converted element re-resolved its dotted path with
+rsplit + import_module + getattr.
+
+Usage: python -m benchmarks.bench_resolve_class [number of nodes]
+"""
+from importlib import import_module
+import sys
+
+import related
+from related import converters
+
+from .timing import best
+
+NODE_CLS = __name__ + ".Node"
+
+
+@related.mutable
+class Node(object):
+    name = related.StringField()
+    node_child = related.ChildField(NODE_CLS, required=False)
+    node_list = related.SequenceField(NODE_CLS, required=False)
+
+
+def uncached_resolve_class(cls):
+    if isinstance(cls, str):
+        module_name, model_name = cls.rsplit(".", 1)
+        module = import_module(module_name)
+        cls = getattr(module, model_name)
+    return cls
+
+
+def uncached_resolve(self):
+    cls = uncached_resolve_class(self._cls)
+    return (converters._generation, cls, converters.value_loader(cls),
+            converters.lazy_value_loader(cls),
+            converters.value_loader(cls, trusted=True))
+
+
+def make_tree(size, width=10):
+    count = [0]
+
+    def node(depth):
+        count[0] += 1
+        data = dict(name="node-%d" % count[0])
+        if count[0] < size and depth < 6:
+            data["node_child"] = dict(name="child-%d" % count[0])
+            data["node_list"] = [node(depth + 1) for _ in range(width)
+                                 if count[0] < size]
+        return data
+
+    return node(0)
+
+
+def main(size=20000):
+    tree = make_tree(size)
+
+    per_call = 100000
+    cached = best(lambda: converters.resolve_class(NODE_CLS), per_call)
+    uncached = best(lambda: uncached_resolve_class(NODE_CLS), per_call)
+    print("resolve_class   cached: %8.1f ns/call" % (cached * 1e9 / per_call))
+    print("resolve_class uncached: %8.1f ns/call" % (uncached * 1e9 /
+                                                     per_call))
+
+    cached = best(lambda: related.to_model(Node, tree))
+
+    original = converters.ClassConverter._resolve
+    converters.ClassConverter._resolve = uncached_resolve
+    try:
+        uncached = best(lambda: related.to_model(Node, tree))
+    finally:
+        converters.ClassConverter._resolve = original
+
+    print("to_model(Node)   cached: %8.4f s (%d nodes)" % (cached, size))
+    print("to_model(Node) uncached: %8.4f s (%d nodes)" % (uncached, size))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,61 @@
+"""
+Benchmark of loading documents with and without share=True.
+
+Loads a store document whose days repeat a few day templates (many
+duplicates) and the store document of the scenarios (no duplicates) with
+from_json, comparing the load time and the memory held by the models
+(traced allocations of the load that are still alive afterwards).
+
+Usage: python -m benchmarks.bench_sharing [number of records]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+
+import related
+
+from .scenarios import get_scenario
+from .timing import best
+
+
+def retained(load):
+    gc.collect()
+    tracemalloc.start()
+    obj = load()  # noqa F841 (kept alive while measured)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main(size=20000, templates=20):
+    scenario = get_scenario("store")
+    cls = scenario.cls
+
+    unique = scenario.build(size)
+    repeated = scenario.build(size)
+    days = repeated["days"][:templates]
+    repeated["days"] = [dict(days[i % templates]) for i in range(size)]
+
+    print("%d records" % size)
+
+    for name, document in (("%d templates" % templates, repeated),
+                           ("unique days", unique)):
+        text = json.dumps(document)
+
+        sharer = related.Sharer()
+        assert related.from_json(text, cls, share=sharer) == \
+            related.from_json(text, cls)
+        print("%s: %r" % (name, sharer.stats()[:2]))
+
+        for share in (False, True):
+            print("  share=%-5s %.3f s %8.1f KiB" % (
+                share,
+                best(lambda: related.from_json(text, cls, share=share)),
+                retained(lambda: related.from_json(text, cls,
+                                                   share=share)) / 1024.0))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,104 @@
+"""
+Benchmark of the memory held by slotted models and typed collections.
+
+Loads the same records into @mutable models with and without slots=True,
+each with a short sequence field, and measures the memory still allocated
+by the loaded models with tracemalloc. The typed collections are compared
+with subclasses adding a __dict__, as they were before they had __slots__.
+
+Usage: python -m benchmarks.bench_slots [number of records]
+"""
+import gc
+import sys
+import tracemalloc
+
+import related
+from related.types import TypedSequence, TypedMapping, TypedSet
+
+
+@related.mutable
+class Point(object):
+    x = related.IntegerField()
+    y = related.IntegerField()
+    label = related.StringField(required=False)
+
+
+@related.mutable(slots=True)
+class SlottedPoint(object):
+    x = related.IntegerField()
+    y = related.IntegerField()
+    label = related.StringField(required=False)
+
+
+@related.mutable
+class Path(object):
+    name = related.StringField()
+    points = related.SequenceField(Point)
+
+
+@related.mutable(slots=True)
+class SlottedPath(object):
+    name = related.StringField()
+    points = related.SequenceField(SlottedPoint)
+
+
+class DictTypedSequence(TypedSequence):
+    pass
+
+
+class DictTypedMapping(TypedMapping):
+    pass
+
+
+class DictTypedSet(TypedSet):
+    pass
+
+
+def retained_memory(func):
+    """ Bytes still allocated by the result of func once it returned. """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()  # noqa F841 (kept alive until measured)
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def make_paths(size):
+    return [dict(name="path-%d" % i,
+                 points=[dict(x=i, y=j) for j in range(3)])
+            for i in range(size)]
+
+
+def main(size=100000):
+    paths = make_paths(size)
+    print("%d paths of 3 points" % size)
+
+    for name, cls in (("mutable", Path), ("mutable(slots)", SlottedPath)):
+        memory = retained_memory(lambda: [related.to_model(cls, p)
+                                          for p in paths])
+        print("%-20s %8.1f MB" % (name, memory / 1e6))
+
+    collections = [
+        ("TypedSequence", DictTypedSequence, TypedSequence,
+         lambda cls: cls(int, [1], trusted=True)),
+        ("TypedMapping", DictTypedMapping, TypedMapping,
+         lambda cls: cls(int, {"a": 1})),
+        ("TypedSet", DictTypedSet, TypedSet,
+         lambda cls: cls(int, {1}, trusted=True)),
+    ]
+    print("%d collections of 1 item" % size)
+
+    for name, with_dict, slotted, build in collections:
+        before = retained_memory(lambda: [build(with_dict)
+                                          for _ in range(size)])
+        after = retained_memory(lambda: [build(slotted)
+                                         for _ in range(size)])
+        print("%-20s %8.1f MB -> %.1f MB" % (name, before / 1e6,
+                                             after / 1e6))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
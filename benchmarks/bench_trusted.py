@@ -0,0 +1,43 @@
+"""
+Benchmark of trusted loads on round trips of the benchmark scenarios.
+
+Loads the to_dict output of each scenario (as re-loaded from a cache)
+with the default, fully validated to_model and with trusted=True, and the
+to_json output with from_json and from_json(trusted=True).
+
+Usage: python -m benchmarks.bench_trusted [number of records]
+"""
+import sys
+
+import related
+
+from .scenarios import SCENARIOS
+from .timing import best
+
+
+def main(size=10000):
+    print("%-10s %-10s %10s %10s %8s" % ("scenario", "operation",
+                                         "validated", "trusted", "speedup"))
+
+    for scenario in SCENARIOS:
+        cls = scenario.cls
+        model = related.to_model(cls, scenario.build(size))
+        raw = related.to_dict(model)
+        text = related.to_json(model)
+        assert related.to_model(cls, raw, trusted=True) == model
+
+        cases = [
+            ("to_model", lambda t: related.to_model(cls, raw, trusted=t)),
+            ("from_json", lambda t: related.from_json(text, cls,
+                                                      trusted=t)),
+        ]
+        for name, func in cases:
+            validated = best(lambda: func(False))
+            trusted = best(lambda: func(True))
+            print("%-10s %-10s %9.3fs %9.3fs %7.2fx" % (
+                scenario.name, name, validated, trusted,
+                validated / trusted))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
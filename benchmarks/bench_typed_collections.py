@@ -0,0 +1,63 @@
+"""
+Benchmark of building typed collections from 100k elements.
+
+Compares the element by element construction (MutableSequence.extend ->
+append -> insert -> _check), the bulk checked construction and the trusted
+construction used by the converters.
+
+Usage: python -m benchmarks.bench_typed_collections [number of elements]
+"""
+import sys
+
+from related import TypedSequence, TypedSet, TypedMapping
+
+from collections import OrderedDict
+
+from .timing import best
+
+try:
+    from collections.abc import MutableSequence, MutableMapping
+except ImportError:  # pragma: no cover
+    from collections import MutableSequence, MutableMapping
+
+
+def one_by_one(cls, args):
+    seq = TypedSequence(cls, [])
+    MutableSequence.extend(seq, args)
+    return seq
+
+
+def one_by_one_mapping(cls, kwargs):
+    mapping = TypedMapping(cls, {})
+    MutableMapping.update(mapping, kwargs)
+    return mapping
+
+
+def main(size=100000):
+    values = list(range(size))
+    items = OrderedDict((str(i), i) for i in values)
+
+    results = [
+        ("TypedSequence one by one",
+         lambda: one_by_one(int, values)),
+        ("TypedSequence bulk checked",
+         lambda: TypedSequence(int, values)),
+        ("TypedSequence trusted",
+         lambda: TypedSequence(int, values, trusted=True)),
+        ("TypedSet bulk checked",
+         lambda: TypedSet(int, values)),
+        ("TypedSet trusted",
+         lambda: TypedSet(int, values, trusted=True)),
+        ("TypedMapping one by one",
+         lambda: one_by_one_mapping(int, items)),
+        ("TypedMapping bulk checked",
+         lambda: TypedMapping(int, items)),
+    ]
+
+    for name, func in results:
+        print("%-28s %8.2f ms (%d elements)" % (name, best(func) * 1000,
+                                                size))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,117 @@
+"""
+Synthetic, scaled up documents of the example models of the tests.
+
+Each scenario builds a raw document (as loaded from JSON) with a given
+number of records, deterministically so that results can be compared
+between runs and commits:
+
+- store: ex06 StoreData with one DayData record per day (long sequence)
+- compose: ex01 Compose with one Service per record (wide mapping)
+- node_tree: ex08 Node tree of records nodes (self reference, nested
+  children, lists and mappings, depth growing with the size)
+"""
+from collections import deque
+from datetime import date, timedelta
+from os.path import abspath, dirname, join
+import sys
+
+TESTS_DIR = join(dirname(dirname(abspath(__file__))), "tests")
+
+# the example models (and the dotted path of Node) live in tests/
+if TESTS_DIR not in sys.path:
+    sys.path.insert(0, TESTS_DIR)
+
+from ex01_compose_v2.models import Compose  # noqa E402
+from ex06_json.models import StoreData  # noqa E402
+from ex08_self_reference.models import Node  # noqa E402
+
+
+class Scenario(object):
+    """ A model class and a function building a raw document of it. """
+
+    def __init__(self, name, cls, build):
+        self.name = name
+        self.cls = cls
+        self.build = build
+
+    def __repr__(self):
+        return "Scenario(%s)" % self.name
+
+
+def store_document(records):
+    start = date(2017, 1, 1)
+    days = []
+
+    for i in range(records):
+        day = dict(date=(start + timedelta(days=i % 3650)).isoformat(),
+                   logged_on="%02d:%02d" % (17 + i % 3, i % 60),
+                   open_at="%02d:00:00" % (7 + i % 3),
+                   closed_on="%02d:30:00" % (17 + i % 4),
+                   customers=100 + i % 400,
+                   day_type="Holiday" if i % 7 == 6 else "Normal")
+        if i % 5:
+            day["sales"] = round(1000 + (i % 997) * 13.37, 2)
+        days.append(day)
+
+    return dict(name="Acme store", id=982,
+                created_on="12/21/2017 14:21:55",
+                data_from="2017-01-01T00:00:00",
+                data_to="2026-12-31T23:59:59",
+                days=days, price="98237.448")
+
+
+def compose_document(records):
+    services = {}
+
+    for i in range(records):
+        service = dict(ports=["%d:%d" % (5000 + i % 1000, 80)],
+                       volumes=[".:/code/%d" % i, "/data/%d" % (i % 10)])
+        if i % 2:
+            service["image"] = "image-%d:latest" % (i % 50)
+        else:
+            service["build"] = "./service-%d" % i
+            service["command"] = "run --id %d" % i
+        services["service-%d" % i] = service
+
+    return dict(version="2", services=services)
+
+
+def node_tree_document(records, width=4):
+    root = dict(name="node-1")
+    parents = deque([(root, 0)])
+    count = 1
+
+    # breadth first, so that the depth is about log(records, width)
+    while parents and count < records:
+        parent, depth = parents.popleft()
+        children = []
+
+        for _ in range(min(width, records - count)):
+            count += 1
+            child = dict(name="node-%d" % count)
+            children.append(child)
+            parents.append((child, depth + 1))
+
+        last = children.pop()
+        if children:
+            parent["node_list"] = children
+        if depth % 2:
+            parent["node_child"] = last
+        else:
+            parent["node_map"] = {last["name"]: last}
+
+    return root
+
+
+SCENARIOS = [
+    Scenario("store", StoreData, store_document),
+    Scenario("compose", Compose, compose_document),
+    Scenario("node_tree", Node, node_tree_document),
+]
+
+
+def get_scenario(name):
+    for scenario in SCENARIOS:
+        if scenario.name == name:
+            return scenario
+    raise ValueError("Unknown scenario: %s" % name)
@@ -0,0 +1,177 @@
+"""
+Throughput and peak memory of the related functions on the scenarios.
+
+For each scenario and number of records, every operation is timed (best of
+``repeat`` runs) and run once more under tracemalloc to record its peak
+memory allocation. Results are plain dictionaries written as JSON, so that
+the results of two commits can be compared with ``compare``.
+"""
+from datetime import datetime
+import gc
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+
+import related
+
+from .scenarios import SCENARIOS
+from .timing import best
+
+DEFAULT_RECORDS = (1000, 10000)
+
+OPERATIONS = ("to_model", "to_dict", "to_json", "from_json", "to_yaml",
+              "from_yaml")
+
+
+def operations(scenario, raw):
+    """
+    Return the functions measured for a scenario as (name, function) pairs,
+    with their inputs prepared outside of the measurement.
+    """
+    cls = scenario.cls
+    model = related.to_model(cls, raw)
+    json_text = related.to_json(model)
+    yaml_text = related.to_yaml(model)
+
+    return [
+        ("to_model", lambda: related.to_model(cls, raw)),
+        ("to_dict", lambda: related.to_dict(model)),
+        ("to_json", lambda: related.to_json(model)),
+        ("from_json", lambda: related.from_json(json_text, cls)),
+        ("to_yaml", lambda: related.to_yaml(model)),
+        ("from_yaml", lambda: related.from_yaml(yaml_text, cls)),
+    ]
+
+
+def peak_memory(func):
+    """ Peak number of bytes allocated by python while running func. """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(records=DEFAULT_RECORDS, scenarios=None, only=None, repeat=3,
+        memory=True, log=None):
+    """
+    Run the benchmarks and return the results document.
+
+    :param records: numbers of records of each scenario
+    :param scenarios: names of the scenarios to run (default: all)
+    :param only: names of the operations to run (default: all)
+    :param repeat: number of timed runs of each operation (best is kept)
+    :param memory: measure peak memory (one additional run)
+    :param log: callable receiving each result as it is measured
+    """
+    results = []
+
+    for scenario in SCENARIOS:
+        if scenarios and scenario.name not in scenarios:
+            continue
+
+        for count in records:
+            raw = scenario.build(count)
+
+            for name, func in operations(scenario, raw):
+                if only and name not in only:
+                    continue
+
+                seconds = best(func, repeat=repeat)
+                result = dict(scenario=scenario.name, records=count,
+                              operation=name, seconds=seconds,
+                              records_per_second=count / seconds,
+                              peak_bytes=peak_memory(func) if memory
+                              else None)
+                results.append(result)
+
+                if log:
+                    log(result)
+
+    return dict(meta=metadata(repeat), results=results)
+
+
+def metadata(repeat):
+    return dict(created=datetime.now().isoformat(timespec="seconds"),
+                commit=git_commit(), related=related.__version__,
+                python=platform.python_version(),
+                implementation=platform.python_implementation(),
+                platform=platform.platform(), repeat=repeat)
+
+
+def git_commit():
+    try:
+        output = subprocess.check_output(["git", "rev-parse", "--short",
+                                          "HEAD"], stderr=subprocess.DEVNULL)
+        return output.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(document, path):
+    with open(path, "w") as stream:
+        json.dump(document, stream, indent=2, sort_keys=True)
+        stream.write("\n")
+
+
+def load(path):
+    with open(path) as stream:
+        return json.load(stream)
+
+
+def compare(base, new, threshold=0.1):
+    """
+    Compare two results documents. Return a list of rows of the operations
+    measured in both with the time ratio (new / base), the peak memory
+    ratio and whether the change is a regression beyond the threshold.
+    """
+    def key(result):
+        return result["scenario"], result["records"], result["operation"]
+
+    base_results = dict((key(result), result) for result in base["results"])
+    rows = []
+
+    for result in new["results"]:
+        before = base_results.get(key(result))
+        if before is None:
+            continue
+
+        time_ratio = result["seconds"] / before["seconds"]
+        memory_ratio = None
+        if result.get("peak_bytes") and before.get("peak_bytes"):
+            memory_ratio = result["peak_bytes"] / before["peak_bytes"]
+
+        regression = time_ratio > 1 + threshold or \
+            (memory_ratio or 0) > 1 + threshold
+        rows.append(dict(scenario=result["scenario"],
+                         records=result["records"],
+                         operation=result["operation"],
+                         time_ratio=time_ratio, memory_ratio=memory_ratio,
+                         regression=regression))
+
+    return rows
+
+
+def format_result(result):
+    memory = result["peak_bytes"]
+    return "%-10s %8d %-10s %9.4f s %12.0f rec/s %10s" % (
+        result["scenario"], result["records"], result["operation"],
+        result["seconds"], result["records_per_second"],
+        "-" if memory is None else "%.1f MB" % (memory / 1e6))
+
+
+def format_row(row):
+    memory = row["memory_ratio"]
+    return "%-10s %8d %-10s time x%.2f  memory %s%s" % (
+        row["scenario"], row["records"], row["operation"], row["time_ratio"],
+        "-" if memory is None else "x%.2f" % memory,
+        "  REGRESSION" if row["regression"] else "")
+
+
+def print_line(line):
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
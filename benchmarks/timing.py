@@ -0,0 +1,9 @@
+"""
+Timing helper shared by the benchmarks.
+"""
+import timeit
+
+
+def best(func, number=1, repeat=5):
+    """ Best time in seconds of repeat runs of number calls of func. """
+    return min(timeit.repeat(func, number=number, repeat=repeat))
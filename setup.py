@@ -28,13 +28,17 @@ setup(
     include_package_data=True,
 
     install_requires=[
-        "attrs>=19.3.0",
+        "attrs>=20.3.0",
         "PyYAML",
         "future",
         "singledispatch;python_version<'3.4'",
         "python-dateutil",
     ],
 
+    extras_require={
+        "numpy": ["numpy"],
+    },
+
     setup_requires=[
         'pytest-runner',
     ],
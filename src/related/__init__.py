@@ -11,6 +11,9 @@ from .types import (
     TypedSequence,
     TypedMapping,
     TypedSet,
+    FrozenSequence,
+    FrozenMapping,
+    FrozenSet,
 )
 
 from .fields import (
@@ -33,14 +36,31 @@ from .fields import (
 
 from .functions import (
     from_json,
+    from_jsonl,
     from_yaml,
     is_model,
     to_dict,
+    to_dicts,
     to_json,
+    to_jsonl,
     to_model,
+    to_models,
     to_yaml,
+    RecordError,
 )
 
+from .binary import from_bytes, to_bytes
+
+from .columns import from_columns, to_columns
+
+from .interning import Interner
+
+from .profiler import profile
+
+from .sharing import Sharer
+
+from .tabular import from_csv, to_csv
+
 from . import dispatchers  # noqa F401
 
 __all__ = [
@@ -54,6 +74,9 @@ __all__ = [
     "TypedSequence",
     "TypedMapping",
     "TypedSet",
+    "FrozenSequence",
+    "FrozenMapping",
+    "FrozenSet",
 
     # fields.py
     "BooleanField",
@@ -74,12 +97,38 @@ __all__ = [
 
     # functions.py
     "from_json",
+    "from_jsonl",
     "from_yaml",
     "is_model",
     "to_dict",
+    "to_dicts",
     "to_json",
+    "to_jsonl",
     "to_model",
+    "to_models",
     "to_yaml",
+    "RecordError",
+
+    # binary.py
+    "from_bytes",
+    "to_bytes",
+
+    # columns.py
+    "from_columns",
+    "to_columns",
+
+    # interning.py
+    "Interner",
+
+    # profiler.py
+    "profile",
+
+    # sharing.py
+    "Sharer",
+
+    # tabular.py
+    "from_csv",
+    "to_csv",
 ]
 
 
@@ -0,0 +1,509 @@
+"""
+Compact positional binary encoding of related models.
+
+``to_bytes`` writes the fields of a model in declaration order, without
+their names, with a codec per field type:
+
+- int: zigzag varint (any size), bool: one byte, float: 8 bytes
+- str, Decimal, URL: varint length and UTF-8 bytes
+- date: varint ordinal, datetime and time: ordinal varint (datetime),
+  hour, minute and second bytes, microsecond varint and a fixed UTC
+  offset (time zones are restored as offsets)
+- UUID: 16 bytes, Enum: varint index of the member
+- child models: their fields, sequences and sets: varint count and items,
+  mappings: varint count and key/item pairs
+- fields of no known type: tagged JSON-like values
+
+Fields accepting None are preceded by a presence byte. The payload starts
+with a header made of a format marker and a fingerprint of the schema (the
+field names, types and nullability of the model and of its children), so
+``from_bytes`` refuses data written for another version of a model.
+
+Models are decoded like pickle restores them: every attribute (init=False
+ones included) is set from the data, without calling __init__, the
+converters, the validators or __attrs_post_init__.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from hashlib import sha1
+from uuid import UUID
+import struct
+
+from attr._make import fields
+from future.moves.urllib.parse import ParseResult, urlparse
+
+from . import functions, lazy, plans
+from .converters import ClassConverter
+from .types import TypedMapping
+
+MAGIC = b"RB\x01"
+FINGERPRINT_SIZE = 8
+HEADER_SIZE = len(MAGIC) + FINGERPRINT_SIZE
+
+CODEC_ATTR = "__related_binary_codec__"
+
+DOUBLE = struct.Struct("<d")
+
+
+def write_varint(out, value):
+    """ Append an unsigned integer to out, 7 bits per byte. """
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(buf, pos):
+    """ Return (unsigned integer, position after it) read at pos. """
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+
+    result, shift = byte & 0x7f, 7
+    while True:
+        pos += 1
+        byte = buf[pos]
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos + 1
+        shift += 7
+
+
+def write_int(out, value):
+    write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+def read_int(buf, pos):
+    value, pos = read_varint(buf, pos)
+    return (value >> 1) ^ -(value & 1), pos
+
+
+def write_float(out, value):
+    out += DOUBLE.pack(value)
+
+
+def read_float(buf, pos):
+    return DOUBLE.unpack_from(buf, pos)[0], pos + 8
+
+
+def write_bool(out, value):
+    out.append(1 if value else 0)
+
+
+def read_bool(buf, pos):
+    return buf[pos] == 1, pos + 1
+
+
+def write_str(out, value):
+    data = value.encode("utf-8")
+    write_varint(out, len(data))
+    out += data
+
+
+def read_str(buf, pos):
+    size, pos = read_varint(buf, pos)
+    end = pos + size
+    return str(buf[pos:end], "utf-8"), end
+
+
+def write_decimal(out, value):
+    write_str(out, str(value))
+
+
+def read_decimal(buf, pos):
+    value, pos = read_str(buf, pos)
+    return Decimal(value), pos
+
+
+def write_url(out, value):
+    write_str(out, value.geturl())
+
+
+def read_url(buf, pos):
+    value, pos = read_str(buf, pos)
+    return urlparse(value), pos
+
+
+def write_uuid(out, value):
+    out += value.bytes
+
+
+def read_uuid(buf, pos):
+    return UUID(bytes=bytes(buf[pos:pos + 16])), pos + 16
+
+
+def write_date(out, value):
+    write_varint(out, value.toordinal())
+
+
+def read_date(buf, pos):
+    ordinal, pos = read_varint(buf, pos)
+    return date.fromordinal(ordinal), pos
+
+
+def write_offset(out, offset):
+    if offset is None:
+        out.append(0)
+    else:
+        out.append(1)
+        write_int(out, offset // timedelta(microseconds=1))
+
+
+def read_offset(buf, pos):
+    if buf[pos] == 0:
+        return None, pos + 1
+    offset, pos = read_int(buf, pos + 1)
+    return timezone(timedelta(microseconds=offset)) if offset \
+        else timezone.utc, pos
+
+
+def write_clock(out, value):
+    out += bytes((value.hour, value.minute, value.second))
+    write_varint(out, value.microsecond)
+
+
+def write_datetime(out, value):
+    write_varint(out, value.toordinal())
+    write_clock(out, value)
+    write_offset(out, value.utcoffset())
+
+
+def read_datetime(buf, pos):
+    ordinal, pos = read_varint(buf, pos)
+    day = date.fromordinal(ordinal)
+    microsecond, end = read_varint(buf, pos + 3)
+    tzinfo, end = read_offset(buf, end)
+    return datetime(day.year, day.month, day.day, buf[pos], buf[pos + 1],
+                    buf[pos + 2], microsecond, tzinfo), end
+
+
+def write_time(out, value):
+    write_clock(out, value)
+    write_offset(out, value.utcoffset())
+
+
+def read_time(buf, pos):
+    microsecond, end = read_varint(buf, pos + 3)
+    tzinfo, end = read_offset(buf, end)
+    return time(buf[pos], buf[pos + 1], buf[pos + 2], microsecond,
+                tzinfo), end
+
+
+# tags of the values of the fields of no known type
+NONE, FALSE, TRUE, INT, FLOAT, STR, LIST, DICT = range(8)
+
+
+def write_any(out, value):
+    if value is None:
+        out.append(NONE)
+    elif value is True or value is False:
+        out.append(TRUE if value else FALSE)
+    elif isinstance(value, int):
+        out.append(INT)
+        write_int(out, value)
+    elif isinstance(value, float):
+        out.append(FLOAT)
+        write_float(out, value)
+    elif isinstance(value, str):
+        out.append(STR)
+        write_str(out, value)
+    elif isinstance(value, (list, tuple)):
+        out.append(LIST)
+        write_varint(out, len(value))
+        for item in value:
+            write_any(out, item)
+    elif isinstance(value, dict):
+        out.append(DICT)
+        write_varint(out, len(value))
+        for key, item in value.items():
+            write_any(out, key)
+            write_any(out, item)
+    else:
+        raise TypeError("Cannot encode value {!r} of a field of no known "
+                        "type".format(value))
+
+
+def read_any(buf, pos):
+    tag = buf[pos]
+    pos += 1
+
+    if tag <= TRUE:
+        return (None, False, True)[tag], pos
+    if tag == INT:
+        return read_int(buf, pos)
+    if tag == FLOAT:
+        return read_float(buf, pos)
+    if tag == STR:
+        return read_str(buf, pos)
+
+    size, pos = read_varint(buf, pos)
+    if tag == LIST:
+        items = []
+        for _ in range(size):
+            item, pos = read_any(buf, pos)
+            items.append(item)
+        return items, pos
+
+    items = {}
+    for _ in range(size):
+        key, pos = read_any(buf, pos)
+        items[key], pos = read_any(buf, pos)
+    return items, pos
+
+
+class Codec(object):
+    """
+    Binary encoder and decoder of the values of one type, described by a
+    name (part of the schema fingerprint).
+    """
+
+    def __init__(self, name, encode, decode):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+    def describe(self, seen):
+        return self.name
+
+
+# validated field type => codec
+CODECS = dict((cls, Codec(name, encode, decode)) for cls, name, encode, decode
+              in [(int, "int", write_int, read_int),
+                  (float, "float", write_float, read_float),
+                  (bool, "bool", write_bool, read_bool),
+                  (str, "str", write_str, read_str),
+                  (Decimal, "decimal", write_decimal, read_decimal),
+                  (ParseResult, "url", write_url, read_url),
+                  (UUID, "uuid", write_uuid, read_uuid),
+                  (date, "date", write_date, read_date),
+                  (datetime, "datetime", write_datetime, read_datetime),
+                  (time, "time", write_time, read_time)])
+
+ANY_CODEC = Codec("any", write_any, read_any)
+
+
+class EnumCodec(Codec):
+    """ Codec of the members of an Enum class, by index. """
+
+    def __init__(self, cls):
+        members = list(cls)
+        indexes = dict((member, index) for index, member in
+                       enumerate(members))
+
+        def encode(out, value):
+            write_varint(out, indexes[value])
+
+        def decode(buf, pos):
+            index, pos = read_varint(buf, pos)
+            return members[index], pos
+
+        name = "enum %s(%s)" % (cls.__name__,
+                                ",".join(m.name for m in members))
+        super(EnumCodec, self).__init__(name, encode, decode)
+
+
+class CollectionCodec(Codec):
+    """
+    Codec of TypedSequence, TypedSet and TypedMapping values (decoded as
+    value_cls, e.g. the FrozenSequence of the fields of immutable models).
+    """
+
+    def __init__(self, collection_cls, item_cls, item_codec, key=None,
+                 value_cls=None):
+        self.collection_cls = collection_cls
+        self.value_cls = value_cls or collection_cls
+        self.item_cls = item_cls
+        self.item_codec = item_codec
+        self.key = key
+        super(CollectionCodec, self).__init__(
+            collection_cls.__name__, self.encode_items, self.decode_items)
+
+    def describe(self, seen):
+        return "%s<%s>" % (self.name, self.item_codec.describe(seen))
+
+    def encode_items(self, out, value):
+        item_codec = self.item_codec
+        write_varint(out, len(value))
+        is_mapping = self.collection_cls is TypedMapping
+
+        for item in (value.items() if is_mapping else value):
+            if is_mapping:
+                key, item = item
+                write_any(out, key)
+            if item is None:
+                out.append(0)
+            else:
+                out.append(1)
+                item_codec.encode(out, item)
+
+    def decode_items(self, buf, pos):
+        decode = self.item_codec.decode
+        size, pos = read_varint(buf, pos)
+        is_mapping = self.collection_cls is TypedMapping
+        keys, items = [], []
+
+        for _ in range(size):
+            if is_mapping:
+                key, pos = read_any(buf, pos)
+                keys.append(key)
+            if buf[pos]:
+                item, pos = decode(buf, pos + 1)
+            else:
+                item, pos = None, pos + 1
+            items.append(item)
+
+        if is_mapping:
+            return self.value_cls(self.item_cls, zip(keys, items),
+                                  key=self.key, trusted=True), pos
+        return self.value_cls(self.item_cls, items, trusted=True), pos
+
+
+class ModelCodec(Codec):
+    """ Codec of the instances of a related model class. """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.new = plans.instance_factory(cls)
+        self._fields = None
+        self._encoders = None
+        self._decoders = None
+        self._fingerprint = None
+        super(ModelCodec, self).__init__(cls.__name__, self.encode_model,
+                                         self.decode_model)
+
+    @property
+    def fields(self):
+        """ (attribute name, nullable, codec) of each field. """
+        if self._fields is None:
+            self._fields = tuple(
+                (a.name, plans.allows_none(a.validator), field_codec(a))
+                for a in fields(self.cls))
+        return self._fields
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            description = self.describe(set()).encode("utf-8")
+            self._fingerprint = sha1(description).digest()[:FINGERPRINT_SIZE]
+        return self._fingerprint
+
+    def describe(self, seen):
+        if self.cls in seen:
+            return self.name  # self reference
+
+        seen = seen | {self.cls}
+        return "%s{%s}" % (self.name, ",".join(
+            "%s%s:%s" % (name, "?" if nullable else "", codec.describe(seen))
+            for name, nullable, codec in self.fields))
+
+    def encode_model(self, out, obj):
+        if self._encoders is None:
+            self._encoders = tuple((name, nullable, codec.encode)
+                                   for name, nullable, codec in self.fields)
+
+        for name, nullable, encode in self._encoders:
+            value = getattr(obj, name)
+            if nullable:
+                if value is None:
+                    out.append(0)
+                    continue
+                out.append(1)
+            encode(out, value)
+
+    def decode_model(self, buf, pos):
+        if self._decoders is None:
+            self._decoders = tuple((name, nullable, codec.decode)
+                                   for name, nullable, codec in self.fields)
+
+        obj = self.new()
+        set_value = object.__setattr__
+
+        for name, nullable, decode in self._decoders:
+            if nullable:
+                pos += 1
+                if not buf[pos - 1]:
+                    set_value(obj, name, None)
+                    continue
+            value, pos = decode(buf, pos)
+            set_value(obj, name, value)
+
+        return obj, pos
+
+
+def model_codec(cls):
+    """
+    Return the ModelCodec of a related model class, cached on the class.
+
+    :param cls: related model class.
+    :return: ModelCodec instance
+    """
+    codec = cls.__dict__.get(CODEC_ATTR)
+    if codec is None:
+        codec = ModelCodec(cls)
+        setattr(cls, CODEC_ATTR, codec)
+    return codec
+
+
+def class_codec(cls):
+    """ Codec of the instances of a class (model, Enum or value type). """
+    if functions.is_model(cls):
+        return model_codec(cls)
+    if issubclass(cls, Enum):
+        return EnumCodec(cls)
+    return CODECS.get(cls, ANY_CODEC)
+
+
+def field_codec(a):
+    """ Codec of the values of an attrs field. """
+    converter = a.converter
+
+    if isinstance(converter, ClassConverter):
+        item_codec = class_codec(converter.cls)
+        if converter.child:
+            return item_codec
+
+        return CollectionCodec(plans.validated_type(a.validator),
+                               converter.cls, item_codec,
+                               getattr(converter, "key", None),
+                               converter.collection_cls)
+
+    target = plans.validated_type(a.validator)
+    return class_codec(target) if isinstance(target, type) else ANY_CODEC
+
+
+def to_bytes(obj):
+    """
+    Encode a related model instance in the compact binary format.
+
+    :param obj: related model instance.
+    :return: bytes
+    """
+    codec = model_codec(lazy.eager_class(obj.__class__))
+    out = bytearray(MAGIC)
+    out += codec.fingerprint
+    codec.encode(out, obj)
+    return bytes(out)
+
+
+def from_bytes(data, cls):
+    """
+    Decode an instance of cls from bytes written by to_bytes.
+
+    :param data: bytes (or bytearray, memoryview).
+    :param cls: related model class, with the schema used to write data.
+    :return: cls instance
+    """
+    codec = model_codec(cls)
+
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not related binary data")
+    if bytes(data[len(MAGIC):HEADER_SIZE]) != codec.fingerprint:
+        raise ValueError("Schema fingerprint mismatch: data was not "
+                         "written for this version of {}".format(
+                             cls.__name__))
+
+    obj, pos = codec.decode(data, HEADER_SIZE)
+    if pos != len(data):
+        raise ValueError("Unexpected data after the encoded model")
+    return obj
@@ -0,0 +1,299 @@
+"""
+Columnar export of sequences of related models to NumPy arrays.
+
+``to_columns`` reads the fields of every model of a sequence in one pass
+and returns one masked array per field, typed after the field validators:
+
+- IntegerField: int64
+- FloatField: float64
+- BooleanField: bool
+- DateField: datetime64[D]
+- DateTimeField: datetime64[us] (time zone aware values in UTC)
+- any other field (strings, decimals, times, enums, children...): object
+
+Missing (None) values are masked, so numeric post-processing can be
+vectorised (e.g. ``columns["sales"].mean()`` ignores the missing sales).
+
+``from_columns`` is the reverse: numeric, boolean and datetime64 columns of
+the int, float, bool, date and datetime fields are checked and converted a
+whole column at a time (masked and None values being missing), and their
+per value converters and type validators are skipped. The other columns go
+through the field converters value by value and their validators once the
+models are created.
+
+NumPy is an optional dependency (``pip install related[numpy]``).
+"""
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from operator import attrgetter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from attr import NOTHING, Factory, get_run_validators
+from attr._make import fields
+from attr.validators import _InstanceOfValidator, _OptionalValidator
+
+from . import plans
+
+# validated field type => (dtype, fill value of the missing values)
+COLUMN_TYPES = {
+    int: ("int64", 0),
+    float: ("float64", 0.0),
+    bool: ("bool", False),
+    date: ("datetime64[D]", None),
+    datetime: ("datetime64[us]", None),
+}
+
+OBJECT_COLUMN = (object, None)
+
+# validated field type => dtype kinds converted as a whole column
+COLUMN_KINDS = {
+    int: "iubf",
+    float: "iubf",
+    bool: "b",
+    date: "M",
+    datetime: "M",
+}
+
+INT64_BOUND = 2.0 ** 63
+
+
+def to_columns(seq, cls=None):
+    """
+    Convert a sequence of models of the same class into a dictionary of
+    column arrays (numpy.ma.MaskedArray) keyed like to_dict output.
+
+    :param seq: sequence or iterable of models.
+    :param cls: class of the models (default: class of the first model).
+    :return: OrderedDict of output key => masked array
+    """
+    if np is None:  # pragma: no cover
+        raise ImportError("to_columns requires numpy "
+                          "(pip install related[numpy])")
+
+    seq = seq if isinstance(seq, (list, tuple)) else list(seq)
+    if cls is None:
+        if not seq:
+            raise ValueError("cls is required for an empty sequence")
+        cls = seq[0].__class__
+
+    specs = column_specs(cls)
+    names = [name for name, _, _ in specs]
+
+    # one pass over the models, transposed into one tuple per field
+    if len(names) == 1:
+        columns = [tuple(map(attrgetter(names[0]), seq))]
+    else:
+        columns = list(zip(*map(attrgetter(*names), seq))) or \
+            [()] * len(names)
+
+    return OrderedDict((key_name, column_array(values, *column_type))
+                       for (_, key_name, column_type), values
+                       in zip(specs, columns))
+
+
+def column_specs(cls):
+    """
+    Return (attribute name, output key, (dtype, fill value)) for each field
+    of a model class.
+    """
+    types = dict((a.name, plans.validated_type(a.validator))
+                 for a in fields(cls))
+    return [(name, key_name, COLUMN_TYPES.get(types[name], OBJECT_COLUMN))
+            for name, key_name, _ in plans.compile_fields(cls)]
+
+
+def column_array(values, dtype, fill):
+    """ Masked array of values, with None values masked. """
+    mask = np.ma.nomask
+
+    if None in values:
+        mask = np.fromiter((value is None for value in values), dtype=bool,
+                           count=len(values))
+        if fill is not None:
+            values = [fill if value is None else value for value in values]
+
+    if dtype is object:
+        data = np.fromiter(values, dtype=object, count=len(values))
+    else:
+        if dtype == COLUMN_TYPES[datetime][0]:
+            values = [to_utc(value) for value in values]
+        data = np.array(values, dtype=dtype)
+
+    return np.ma.MaskedArray(data, mask=mask)
+
+
+def to_utc(value):
+    """ Naive UTC datetime of a time zone aware datetime. """
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def from_columns(cls, columns, lazy=False):
+    """
+    Create models from a dictionary of columns (arrays, masked arrays or
+    lists of the same length) keyed like to_dict output, e.g. the output of
+    to_columns. Missing columns get the default value of their field.
+
+    :param cls: related model class.
+    :param columns: mapping of output key => column.
+    :param lazy: return a generator creating the models on iteration (the
+                 columns are still checked and converted first).
+    :return: list (or generator) of cls instances
+    """
+    if np is None:  # pragma: no cover
+        raise ImportError("from_columns requires numpy "
+                          "(pip install related[numpy])")
+
+    plans.model_loader(cls).check_keys(columns)
+
+    lengths = set(len(column) for column in columns.values())
+    if len(lengths) > 1:
+        raise ValueError("Columns of different lengths: {}".format(
+            sorted(lengths)))
+    size = lengths.pop() if lengths else 0
+
+    names, value_lists, self_defaults, checks = [], [], [], []
+
+    for a in fields(cls):
+        key_name = a.metadata.get('key') or a.name
+        if a.init and key_name in columns:
+            values, checked = column_values(a, columns[key_name])
+        elif a.default is NOTHING:
+            raise TypeError("{}() missing required column: '{}'".format(
+                cls.__name__, key_name))
+        elif isinstance(a.default, Factory) and a.default.takes_self:
+            self_defaults.append(a)
+            continue
+        else:
+            values, checked = default_values(a, size), False
+
+        names.append(a.name)
+        value_lists.append(values)
+        if a.validator is not None and not checked:
+            checks.append(a)
+
+    models = create_models(cls, names, value_lists, self_defaults, checks)
+    return models if lazy else list(models)
+
+
+def column_values(a, column):
+    """
+    Return the converted values of the column of a field and whether they
+    were checked against the field type.
+    """
+    if np.ma.isMaskedArray(column):
+        data, mask = column.data, np.ma.getmaskarray(column)
+    else:
+        data = np.asarray(column)
+        mask = np.equal(data, None) if data.dtype == object else None
+
+    if data.dtype.kind == "M":
+        nat = np.isnat(data)
+        mask = nat if mask is None else mask | nat
+
+    if mask is not None and not mask.any():
+        mask = None
+
+    target = plans.validated_type(a.validator)
+
+    if mask is not None and not plans.allows_none(a.validator):
+        raise TypeError("'{}' must be {!r} (got None at row {})".format(
+            a.name, target, int(np.argmax(mask))))
+
+    values = None
+    if data.dtype.kind in COLUMN_KINDS.get(target, "") and \
+            is_type_check(a.validator):
+        values = convert_column(data, mask, target)
+
+    if values is None:
+        # converted one value at a time, validated once the models exist
+        values = data.tolist()
+        if mask is not None:
+            values = [None if missing else value
+                      for value, missing in zip(values, mask.tolist())]
+        if a.converter is not None:
+            values = [a.converter(value) for value in values]
+        return values, False
+
+    if mask is not None:
+        values = [None if missing else value
+                  for value, missing in zip(values, mask.tolist())]
+
+    return values, True
+
+
+def convert_column(data, mask, target):
+    """
+    Convert a numeric, boolean or datetime64 column into a list of python
+    values of the target type, None if that cannot be done as a whole.
+    """
+    if target is date:
+        return data.astype("datetime64[D]").tolist()
+
+    if target is datetime:
+        return data.astype("datetime64[us]").tolist()
+
+    if target is int and data.dtype.kind == "f":
+        present = data if mask is None else data[~mask]
+        if not np.isfinite(present).all():
+            raise ValueError("cannot convert float NaN or infinity to "
+                             "integer")
+        if len(present) and np.abs(present).max() >= INT64_BOUND:
+            return None  # python integers, one value at a time
+        data = np.trunc(data if mask is None else np.where(mask, 0, data))
+
+    return data.astype(np.dtype(target)).tolist()
+
+
+def default_values(a, size):
+    """ Converted default value of a field for size models. """
+    default = a.default
+    if isinstance(default, Factory):
+        values = [default.factory() for _ in range(size)]
+    else:
+        values = [default] * size
+
+    if a.converter is not None:
+        values = [a.converter(value) for value in values]
+
+    return values
+
+
+def is_type_check(validator):
+    """ True if the validator only checks the class of the value. """
+    if isinstance(validator, _OptionalValidator):
+        validator = validator.validator
+    return isinstance(validator, _InstanceOfValidator)
+
+
+def create_models(cls, names, value_lists, self_defaults, checks):
+    """ Generator of the models of the converted column values. """
+    new = plans.instance_factory(cls)
+    post_init = getattr(cls, "__attrs_post_init__", None)
+    run_validators = get_run_validators()
+
+    for row in zip(*value_lists):
+        obj = new()
+
+        for name, value in zip(names, row):
+            object.__setattr__(obj, name, value)
+
+        for a in self_defaults:
+            value = a.default.factory(obj)
+            if a.converter is not None:
+                value = a.converter(value)
+            object.__setattr__(obj, a.name, value)
+
+        if run_validators:
+            for a in checks:
+                a.validator(obj, a, getattr(obj, a.name))
+
+        if post_init is not None:
+            post_init(obj)
+
+        yield obj
@@ -1,19 +1,85 @@
 from collections import OrderedDict
+from decimal import Decimal
 from uuid import UUID
 from future.moves.urllib.parse import urlparse
 from six import string_types, callable
 from datetime import datetime
 from inspect import isfunction
-from dateutil import parser
 from importlib import import_module
 
-from .types import TypedSequence, TypedMapping, TypedSet
-from .functions import to_model
+from .dates import parse_date, parse_datetime, parse_time
+from .types import (TypedSequence, TypedMapping, TypedSet, FrozenSequence,
+                    FrozenMapping, FrozenSet)
+from .plans import value_loader
+from .lazy import (LazyTypedSequence, FrozenLazyTypedSequence,
+                   lazy_value_loader)
 
 CHILD_ERROR_MSG = "Failed to convert value ({}) to child object class ({}). " \
                   + "... [Original error message: {}]"
 
 
+# dotted path => class, see resolve_class and invalidate_class_cache
+_resolved_classes = {}
+_generation = 0
+
+
+class ClassConverter(object):
+    """
+    Base class of the converters that coerce values into instances of a
+    class given as a type or as a dotted path string. The class and its
+    loader are resolved once and kept until invalidate_class_cache is called.
+    """
+
+    # True for the converters of sequences and sets of cls instances
+    collection = False
+
+    # True for the converters of single cls instances (ChildField)
+    child = False
+
+    # True for the collection fields of immutable models (set by the
+    # immutable decorator): values are FrozenSequence, FrozenSet...
+    frozen = False
+
+    def __init__(self, cls):
+        self._cls = cls
+        self._resolved = None
+
+    def _resolve(self):
+        resolved = self._resolved
+        if resolved is None or resolved[0] != _generation:
+            cls = resolve_class(self._cls)
+            # [generation, cls, loader, lazy loader, trusted loader], the
+            # last two built on first use (lazy_class creates a subclass)
+            resolved = self._resolved = [_generation, cls, value_loader(cls),
+                                         None, None]
+        return resolved
+
+    @property
+    def cls(self):
+        return self._resolve()[1]
+
+    @property
+    def loader(self):
+        """ Callable that coerces a single value into cls (see to_model). """
+        return self._resolve()[2]
+
+    @property
+    def lazy_loader(self):
+        """ Same as loader, but creates lazy models from dictionaries. """
+        resolved = self._resolve()
+        if resolved[3] is None:
+            resolved[3] = lazy_value_loader(resolved[1])
+        return resolved[3]
+
+    @property
+    def trusted_loader(self):
+        """ Same as loader, for trusted input (see plans.TrustedLoader). """
+        resolved = self._resolve()
+        if resolved[4] is None:
+            resolved[4] = value_loader(resolved[1], trusted=True)
+        return resolved[4]
+
+
 def to_child_field(cls):
     """
     Returns an callable instance that will convert a value to a Child object.
@@ -22,22 +88,26 @@ def to_child_field(cls):
     :return: instance of ChildConverter.
     """
 
-    class ChildConverter(object):
-
-        def __init__(self, cls):
-            self._cls = cls
+    class ChildConverter(ClassConverter):
 
-        @property
-        def cls(self):
-            return resolve_class(self._cls)
+        child = True
 
         def __call__(self, value):
+            return self.convert(value, self.loader)
+
+        def lazy(self, value):
+            return self.convert(value, self.lazy_loader)
+
+        def trusted(self, value):
+            return self.convert(value, self.trusted_loader)
+
+        def convert(self, value, load):
             try:
                 # Issue #33: if value is the class and callable, then invoke
                 if value == self._cls and callable(value):
                     value = value()
 
-                return to_model(self.cls, value)
+                return load(value)
             except ValueError as e:
                 error_msg = CHILD_ERROR_MSG.format(value, self.cls, str(e))
                 raise ValueError(error_msg)
@@ -52,19 +122,32 @@ def to_sequence_field(cls):
     :param cls: Valid class type of the items in the Sequence.
     :return: instance of the SequenceConverter.
     """
-    class SequenceConverter(object):
+    class SequenceConverter(ClassConverter):
+
+        collection = True
+
+        def __call__(self, values):
+            return self.convert(values, self.loader)
+
+        def lazy(self, values):
+            lazy_cls = FrozenLazyTypedSequence if self.frozen \
+                else LazyTypedSequence
+            return lazy_cls(self.cls, values or [], self.lazy_loader)
 
-        def __init__(self, cls):
-            self._cls = cls
+        def trusted(self, values):
+            return self.convert(values, self.trusted_loader)
 
         @property
-        def cls(self):
-            return resolve_class(self._cls)
+        def collection_cls(self):
+            return FrozenSequence if self.frozen else TypedSequence
 
-        def __call__(self, values):
-            values = values or []
-            args = [to_model(self.cls, value) for value in values]
-            return TypedSequence(cls=self.cls, args=args)
+        def convert(self, values, load):
+            if values.__class__ is FrozenSequence and self.frozen \
+                    and values.cls is self.cls:
+                return values  # shared as is (not the lazy ones)
+
+            args = [load(value) for value in values or []]
+            return self.collection_cls(cls=self.cls, args=args, trusted=True)
 
     return SequenceConverter(cls)
 
@@ -76,19 +159,27 @@ def to_set_field(cls):
     :param cls: Valid class type of the items in the Sequence.
     :return: instance of the SequenceConverter.
     """
-    class SetConverter(object):
+    class SetConverter(ClassConverter):
+
+        collection = True
 
-        def __init__(self, cls):
-            self._cls = cls
+        def __call__(self, values):
+            return self.convert(values, self.loader)
+
+        def trusted(self, values):
+            return self.convert(values, self.trusted_loader)
 
         @property
-        def cls(self):
-            return resolve_class(self._cls)
+        def collection_cls(self):
+            return FrozenSet if self.frozen else TypedSet
 
-        def __call__(self, values):
-            values = values or set()
-            args = {to_model(self.cls, value) for value in values}
-            return TypedSet(cls=self.cls, args=args)
+        def convert(self, values, load):
+            if isinstance(values, FrozenSet) and self.frozen \
+                    and values.cls is self.cls:
+                return values  # shared as is
+
+            args = {load(value) for value in values or set()}
+            return self.collection_cls(cls=self.cls, args=args, trusted=True)
 
     return SetConverter(cls)
 
@@ -101,33 +192,45 @@ def to_mapping_field(cls, key):  # pragma: no mccabe
     :param key: Attribute name of the key value in each item of cls instance.
     :return: instance of the MappingConverter.
     """
-    class MappingConverter(object):
+    class MappingConverter(ClassConverter):
 
         def __init__(self, cls, key):
-            self._cls = cls
+            super(MappingConverter, self).__init__(cls)
             self.key = key
 
+        def __call__(self, values):
+            return self.convert(values, self.loader)
+
+        def lazy(self, values):
+            return self.convert(values, self.lazy_loader)
+
+        def trusted(self, values):
+            return self.convert(values, self.trusted_loader)
+
         @property
-        def cls(self):
-            return resolve_class(self._cls)
+        def collection_cls(self):
+            return FrozenMapping if self.frozen else TypedMapping
 
-        def __call__(self, values):
+        def convert(self, values, load):
             kwargs = OrderedDict()
 
-            if isinstance(values, TypedMapping):
+            # kept as is, unless it is (or must be) frozen and is not
+            if isinstance(values, TypedMapping) and \
+                    isinstance(values, FrozenMapping) == self.frozen:
                 return values
 
-            if not isinstance(values, (type({}), type(None))):
+            if not isinstance(values, (type({}), type(None), TypedMapping)):
                 raise TypeError("Invalid type : {}".format(type(values)))
 
             if values:
                 for key_value, item in values.items():
                     if isinstance(item, dict):
                         item[self.key] = key_value
-                        item = to_model(self.cls, item)
+                        item = load(item)
                     kwargs[key_value] = item
 
-            return TypedMapping(cls=self.cls, kwargs=kwargs, key=self.key)
+            return self.collection_cls(cls=self.cls, kwargs=kwargs,
+                                       key=self.key)
 
     return MappingConverter(cls, key)
 
@@ -165,6 +268,16 @@ def float_if_not_none(value):
     return None if value is None else float(value)
 
 
+def decimal_if_not_none(value):
+    """
+    Returns an Decimal(value) if the value is not None.
+
+    :param value: None or a value that can be converted to a Decimal.
+    :return: None or Decimal(value)
+    """
+    return None if value is None else Decimal(value)
+
+
 def str_to_url(value):
     """
     Returns a UUID(value) if the value provided is a str.
@@ -202,7 +315,7 @@ def to_date_field(formatter):
 
         def __call__(self, value):
             if isinstance(value, string_types):
-                value = datetime.strptime(value, self.formatter).date()
+                value = parse_date(value, self.formatter)
 
             if isinstance(value, datetime):
                 value = value.date()
@@ -226,7 +339,7 @@ def to_datetime_field(formatter):
 
         def __call__(self, value):
             if isinstance(value, string_types):
-                value = parser.parse(value)
+                value = parse_datetime(value, self.formatter)
 
             return value
 
@@ -247,7 +360,7 @@ def to_time_field(formatter):
 
         def __call__(self, value):
             if isinstance(value, string_types):
-                value = datetime.strptime(value, self.formatter).time()
+                value = parse_time(value, self.formatter)
 
             return value
 
@@ -255,8 +368,35 @@ def to_time_field(formatter):
 
 
 def resolve_class(cls):
+    """
+    Returns the class for a dotted path string (e.g. "package.module.Model"),
+    caching the result. Classes are returned unchanged.
+
+    :param cls: class or dotted path string.
+    :return: class
+    """
     if isinstance(cls, str):
-        module_name, model_name = cls.rsplit(".", 1)
-        module = import_module(module_name)
-        cls = getattr(module, model_name)
+        resolved = _resolved_classes.get(cls)
+        if resolved is None:
+            module_name, model_name = cls.rsplit(".", 1)
+            module = import_module(module_name)
+            resolved = _resolved_classes[cls] = getattr(module, model_name)
+        cls = resolved
     return cls
+
+
+def invalidate_class_cache(path=None):
+    """
+    Forget resolved class references, e.g. after reloading a module with
+    importlib.reload. Every converter resolves its class again on next use.
+
+    :param path: dotted path to forget (default: all of them).
+    """
+    global _generation
+
+    if path is None:
+        _resolved_classes.clear()
+    else:
+        _resolved_classes.pop(path, None)
+
+    _generation += 1
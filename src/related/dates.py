@@ -0,0 +1,155 @@
+"""
+Parsing and formatting of date, datetime and time values.
+
+Strings in the default (ISO 8601) formats are parsed with the
+``fromisoformat`` constructors and strings in other formats with ``strptime``
+and the field formatter. dateutil is only used for datetime strings that do
+not match the formatter, as DateTimeField always accepted any string
+dateutil understands.
+
+Records such as time series repeat the same dates and times constantly, so
+the results of parsing and formatting are memoised in bounded LRU caches
+(parsed values are immutable and safe to share). Timezone aware values are
+not memoised when formatting since equal aware values may have different
+offsets and therefore different text.
+"""
+from datetime import date, datetime, time
+from functools import lru_cache
+
+from dateutil import parser
+
+from .types import (DEFAULT_DATE_FORMAT, DEFAULT_DATETIME_FORMAT,
+                    DEFAULT_TIME_FORMAT)
+
+# number of recent results kept by each of the parse and format caches
+CACHE_SIZE = 4096
+
+ISO_FORMAT = DEFAULT_DATETIME_FORMAT
+
+# fromisoformat is not available before python 3.7
+_date_fromisoformat = getattr(date, "fromisoformat", None)
+_datetime_fromisoformat = getattr(datetime, "fromisoformat", None)
+_time_fromisoformat = getattr(time, "fromisoformat", None)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(value, formatter=DEFAULT_DATE_FORMAT):
+    """
+    Convert a string to a date.
+
+    :param str value: date string, e.g. "2017-12-18"
+    :param str formatter: strptime format of the string
+    :return: date
+    """
+    if formatter == DEFAULT_DATE_FORMAT and _date_fromisoformat and \
+            len(value) == 10 and value[4] == value[7] == "-":
+        return _date_fromisoformat(value)
+
+    return datetime.strptime(value, formatter).date()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_datetime(value, formatter=DEFAULT_DATETIME_FORMAT):
+    """
+    Convert a string to a datetime, falling back to dateutil if the string
+    does not match the formatter.
+
+    :param str value: datetime string, e.g. "2017-12-18T08:00:00"
+    :param str formatter: strptime format of the string or "ISO_FORMAT"
+    :return: datetime
+    """
+    try:
+        if formatter != ISO_FORMAT:
+            return datetime.strptime(value, formatter)
+        if _datetime_fromisoformat:
+            return _datetime_fromisoformat(value)
+    except ValueError:
+        pass
+
+    return parser.parse(value)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_time(value, formatter=DEFAULT_TIME_FORMAT):
+    """
+    Convert a string to a time.
+
+    :param str value: time string, e.g. "08:00:00"
+    :param str formatter: strptime format of the string
+    :return: time
+    """
+    if formatter == DEFAULT_TIME_FORMAT and _time_fromisoformat and \
+            len(value) == 8 and value[2] == value[5] == ":":
+        return _time_fromisoformat(value)
+
+    return datetime.strptime(value, formatter).time()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def format_date(value, formatter=None):
+    """
+    Convert a date to a string.
+
+    :param date value: date to format
+    :param str formatter: strftime format (default: "%Y-%m-%d")
+    :return: str
+    """
+    return value.strftime(formatter or DEFAULT_DATE_FORMAT)
+
+
+def format_datetime(value, formatter=None):
+    """
+    Convert a datetime to a string.
+
+    :param datetime value: datetime to format
+    :param str formatter: strftime format (default: "ISO_FORMAT")
+    :return: str
+    """
+    if value.tzinfo is None:
+        return _cached_format_datetime(value, formatter)
+    return _format_datetime(value, formatter)
+
+
+def format_time(value, formatter=None):
+    """
+    Convert a time to a string.
+
+    :param time value: time to format
+    :param str formatter: strftime format (default: "%H:%M:%S")
+    :return: str
+    """
+    if value.tzinfo is None:
+        return _cached_format_time(value, formatter)
+    return value.strftime(formatter or DEFAULT_TIME_FORMAT)
+
+
+def _format_datetime(value, formatter):
+    formatter = formatter or DEFAULT_DATETIME_FORMAT
+    return (value.isoformat() if formatter == ISO_FORMAT
+            else value.strftime(formatter))
+
+
+_cached_format_datetime = lru_cache(maxsize=CACHE_SIZE)(_format_datetime)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached_format_time(value, formatter):
+    return value.strftime(formatter or DEFAULT_TIME_FORMAT)
+
+
+_caches = dict(parse_date=parse_date, parse_datetime=parse_datetime,
+               parse_time=parse_time, format_date=format_date,
+               format_datetime=_cached_format_datetime,
+               format_time=_cached_format_time)
+
+
+def clear_caches():
+    """ Empty the parse and format caches. """
+    for cached in _caches.values():
+        cached.cache_clear()
+
+
+def cache_info():
+    """ Return the lru_cache statistics of each cache by function name. """
+    return dict((name, cached.cache_info())
+                for name, cached in _caches.items())
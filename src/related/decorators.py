@@ -1,30 +1,95 @@
+from copy import copy
+from operator import attrgetter
 import inspect
 
-from attr import attrs
+from attr import attrs, fields
 
 from .functions import to_model, to_dict, is_model
+from .converters import ClassConverter
+from .plans import CACHE_HASH_ATTR, HASH_CACHE_FIELD
 
 
-def mutable(maybe_cls=None, strict=False):
+def mutable(maybe_cls=None, strict=False, trusted=False, slots=False):
 
     def wrap(cls):
-        wrapped = attrs(cls)
+        wrapped = attrs(cls, slots=slots)
+        wrapped.__related_frozen__ = False
         wrapped.__related_strict__ = strict
+        wrapped.__related_trusted__ = trusted
+        if slots:
+            _set_pickle_state(wrapped)
         return wrapped
 
     return wrap(maybe_cls) if maybe_cls is not None else wrap
 
 
-def immutable(maybe_cls=None, strict=False):
+def immutable(maybe_cls=None, strict=False, trusted=False, cache_dict=False,
+              cache_hash=False, frozen_collections=True):
 
     def wrap(cls):
-        wrapped = attrs(cls, frozen=True, slots=True)
+        wrapped = attrs(cls, frozen=True, slots=True, cache_hash=cache_hash,
+                        field_transformer=_freeze_collections
+                        if frozen_collections else None)
+        if cache_hash and HASH_CACHE_FIELD not in wrapped.__slots__:
+            raise TypeError("cache_hash: no %s slot in %s, not supported "
+                            "with this attrs version" % (HASH_CACHE_FIELD,
+                                                         cls.__name__))
+        wrapped.__related_frozen__ = True
         wrapped.__related_strict__ = strict
+        wrapped.__related_trusted__ = trusted
+        wrapped.__related_cache_dict__ = cache_dict
+        wrapped.__related_cache_hash__ = cache_hash
+        _set_pickle_state(wrapped)
         return wrapped
 
     return wrap(maybe_cls) if maybe_cls is not None else wrap
 
 
+def _freeze_collections(cls, attributes):
+    """
+    attrs field transformer giving the sequence, set and mapping fields of
+    a class their own converters returning FrozenSequence, FrozenSet and
+    FrozenMapping values. The converters of the fields are copied, as the
+    fields inherited from a base class share them with the base class.
+    """
+    transformed = []
+    for a in attributes:
+        converter = a.converter
+        if isinstance(converter, ClassConverter) and not converter.child \
+                and not converter.frozen:
+            converter = copy(converter)
+            converter.frozen = True
+            a = a.evolve(converter=converter)
+        transformed.append(a)
+    return transformed
+
+
+def _set_pickle_state(cls):
+    """
+    Pickle the instances of a slotted class as the tuple of their field
+    values, in declaration order, and restore them without running
+    __init__ (converters and validators), like attrs but with the values
+    read in a C loop.
+    """
+    names = tuple(a.name for a in fields(cls))
+    get_values = attrgetter(*names) if len(names) > 1 else \
+        lambda obj: tuple(getattr(obj, name) for name in names)
+    set_value = object.__setattr__
+    cache_hash = getattr(cls, CACHE_HASH_ATTR, False)
+
+    def __getstate__(self):
+        return get_values(self)
+
+    def __setstate__(self, state):
+        for name, value in zip(names, state):
+            set_value(self, name, value)
+        if cache_hash:
+            set_value(self, HASH_CACHE_FIELD, None)
+
+    cls.__getstate__ = __getstate__
+    cls.__setstate__ = __setstate__
+
+
 def _get_annotation_map(func, **kwargs):
     annotation_map = kwargs.copy()
 
@@ -5,15 +5,15 @@ from enum import Enum
 from uuid import UUID
 from datetime import date, datetime, time
 
+from .dates import format_date, format_datetime, format_time
 from .functions import to_dict
-from .types import (
-    TypedSequence, TypedMapping, TypedSet, DEFAULT_DATE_FORMAT,
-    DEFAULT_DATETIME_FORMAT, DEFAULT_TIME_FORMAT
-)
+from .plans import DictOptions, without_key
+from .types import TypedSequence, TypedMapping, TypedSet
 
 
 @to_dict.register(list)  # noqa F811
 @to_dict.register(set)
+@to_dict.register(frozenset)
 @to_dict.register(tuple)
 def _(obj, **kwargs):
     suppress_empty_values = kwargs.get("suppress_empty_values", False)
@@ -55,12 +55,16 @@ def _(obj, **kwargs):
     suppress_empty_values = kwargs.get("suppress_empty_values", False)
     rv = kwargs.get("dict_factory", OrderedDict)()
 
+    options = DictOptions(dict((name, value) for name, value
+                               in kwargs.items() if name != "formatter"))
+
     items = obj.items()
 
     for key_value, item in items:
         sub_dict = to_dict(item, **kwargs)
         if suppress_map_key_values:
-            sub_dict.pop(obj.key)
+            sub_dict = without_key(sub_dict, options.key_name(item, obj.key),
+                                   options.dict_factory)
         rv[key_value] = sub_dict
 
     if not suppress_empty_values or len(items):
@@ -84,21 +88,17 @@ def _(obj, **kwargs):
 
 @to_dict.register(date)  # noqa F811
 def _(obj, **kwargs):
-    formatter = kwargs.get('formatter') or DEFAULT_DATE_FORMAT
-    return obj.strftime(formatter)
+    return format_date(obj, kwargs.get('formatter'))
 
 
 @to_dict.register(datetime)  # noqa F811
 def _(obj, **kwargs):
-    formatter = kwargs.get('formatter') or DEFAULT_DATETIME_FORMAT
-    return (obj.isoformat() if formatter == "ISO_FORMAT"
-            else obj.strftime(formatter))
+    return format_datetime(obj, kwargs.get('formatter'))
 
 
 @to_dict.register(time)  # noqa F811
 def _(obj, **kwargs):
-    formatter = kwargs.get('formatter') or DEFAULT_TIME_FORMAT
-    return obj.strftime(formatter)
+    return format_time(obj, kwargs.get('formatter'))
 
 
 @to_dict.register(Decimal)  # noqa F811
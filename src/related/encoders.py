@@ -0,0 +1,159 @@
+"""
+Model-aware JSON encoding.
+
+``ModelJSONEncoder`` writes JSON text straight from related model instances
+instead of first building the complete ``to_dict`` tree. Models and scalar
+values are encoded with the same plans and encoders as ``to_dict`` while
+sequences are only expanded item by item as the ``json`` module writes them,
+so memory use is bounded by the size of one item rather than the size of
+the whole graph when writing to a stream.
+"""
+import json
+from collections import OrderedDict
+
+from . import plans
+
+WRITE_CHUNK_SIZE = 64 * 1024
+
+
+class LazySequence(list):
+    """
+    List stand-in handed to the json module that encodes the items of a
+    sequence one by one while they are being written.
+    """
+
+    __slots__ = ("items", "formatter", "options")
+
+    def __init__(self, items, formatter, options):
+        super(LazySequence, self).__init__()
+        self.items = items
+        self.formatter = formatter
+        self.options = options
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        formatter, options = self.formatter, self.options
+        for item in self.items:
+            yield lazy_value(item, formatter, options)
+
+
+def lazy_value(value, formatter, options):
+    """
+    Encode a value like to_dict, but leave the items of sequences to be
+    encoded when they are written.
+    """
+    encoder = plans.value_encoder(value.__class__)
+
+    if encoder is plans.encode_model:
+        return lazy_dict(value, options)
+
+    if encoder is plans.encode_typed_sequence:
+        return lazy_value(value.list, formatter, options)
+
+    if encoder is plans.encode_typed_set:
+        return lazy_value(value.set, formatter, options)
+
+    if encoder is plans.encode_sequence:
+        if options.suppress_empty_values and not len(value):
+            return None
+        return LazySequence(value, formatter, options)
+
+    if encoder is plans.encode_typed_mapping:
+        if options.suppress_empty_values and not len(value):
+            return None
+        return lazy_mapping(value, formatter, options)
+
+    return encoder(value, formatter, options)
+
+
+def lazy_mapping(value, formatter, options):
+    """ Shallow dictionary of a TypedMapping. """
+    items = OrderedDict()
+
+    for key_value, item in value.items():
+        if not options.suppress_map_key_values:
+            item = lazy_value(item, formatter, options)
+        elif plans.value_encoder(item.__class__) is plans.encode_model:
+            item = lazy_dict(item, options, omit=value.key)
+        else:
+            item = plans.without_key(
+                plans.encode_value(item, formatter, options),
+                options.key_name(item, value.key), options.dict_factory)
+        items[key_value] = item
+
+    return items
+
+
+def lazy_dict(obj, options, omit=None):
+    """
+    Shallow dictionary of a model instance with lazy values, without the
+    field omit (attribute name) if given.
+    """
+    plan = options.plan_for(obj.__class__)
+    suppress_empty_values = plan.suppress_empty_values
+    items = OrderedDict()
+
+    for key_name, formatter, value in plan.field_values(obj):
+        value = lazy_value(value, formatter, plan)
+
+        if suppress_empty_values and value is None:
+            continue
+
+        items[key_name] = value
+
+    if omit is not None:
+        items.pop(plan.key_names.get(omit, omit), None)
+
+    return items
+
+
+class ModelJSONEncoder(json.JSONEncoder):
+    """
+    JSONEncoder that serializes related models, typed collections and the
+    values registered with to_dict without an intermediate dictionary tree.
+
+    :param dict to_dict_kwargs: options as accepted by to_dict.
+    :param kwargs: arguments of json.JSONEncoder (indent, sort_keys...)
+    """
+
+    def __init__(self, to_dict_kwargs=None, **kwargs):
+        super(ModelJSONEncoder, self).__init__(**kwargs)
+        self.tree_encoder = json.JSONEncoder(**kwargs)
+        to_dict_kwargs = dict(to_dict_kwargs or {})
+        self.formatter = to_dict_kwargs.pop("formatter", None)
+        self.options = plans.DictOptions(to_dict_kwargs)
+
+    def iterencode(self, o, _one_shot=False):
+        """ Encode an object, yielding the JSON text in small pieces. """
+        o = lazy_value(o, self.formatter, self.options)
+        return super(ModelJSONEncoder, self).iterencode(o)
+
+    def encode(self, o):
+        """
+        Encode an object to a string. The whole text is kept in memory
+        anyway, so the dictionary tree is built first to let the json
+        module use its fastest code path.
+        """
+        o = plans.encode_value(o, self.formatter, self.options)
+        return self.tree_encoder.encode(o)
+
+    def dump(self, o, stream, chunk_size=WRITE_CHUNK_SIZE):
+        """ Write an object to a writable stream in chunks of text. """
+        write_chunks(self.iterencode(o), stream, chunk_size)
+
+
+def write_chunks(pieces, stream, chunk_size=WRITE_CHUNK_SIZE):
+    """ Write pieces of text to a stream, joined in chunks of chunk_size. """
+    buffer, size = [], 0
+
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            stream.write("".join(buffer))
+            buffer, size = [], 0
+
+    if buffer:
+        stream.write("".join(buffer))
@@ -287,6 +287,6 @@ def DecimalField(default=NOTHING, required=True, repr=True, cmp=True,
     """
     default = _init_fields.init_default(required, default, None)
     validator = _init_fields.init_validator(required, Decimal)
-    return attrib(default=default, converter=lambda x: Decimal(x),
+    return attrib(default=default, converter=converters.decimal_if_not_none,
                   validator=validator, repr=repr, cmp=cmp,
                   metadata=dict(key=key))
@@ -1,18 +1,36 @@
 from __future__ import absolute_import, division, print_function
 
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 from enum import Enum
+from six import string_types
 
 import yaml
 import json
 
-from attr._make import fields
+from . import encoders, parallel, plans
+from .interning import get_interner, intern_tree
+from .lazy import lazy_model, lazy_value_loader
+from .sharing import get_sharer
+from .types import (TypedSequence, TypedMapping, TypedSet, FrozenSequence,
+                    FrozenMapping, FrozenSet)
 
 try:
     from functools import singledispatch
 except ImportError:
     from singledispatch import singledispatch
 
+RAISE, SKIP, COLLECT = "raise", "skip", "collect"
+ERROR_POLICIES = (RAISE, SKIP, COLLECT)
+
+RecordError = namedtuple("RecordError", "index value error")
+
+# libyaml based classes are much faster, pure python ones are the fallback
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# base yaml class (and object_pairs_hook) => ordered subclass
+_yaml_classes = {}
+
 
 @singledispatch
 def to_dict(obj, **kwargs):
@@ -44,54 +62,52 @@ def related_obj_to_dict(obj, **kwargs):
     # Explicitly discard formatter kwarg, should not be cascaded down.
     kwargs.pop('formatter', None)
 
-    # If True, remove fields that start with an underscore (e.g. _secret)
-    suppress_private_attr = kwargs.get("suppress_private_attr", False)
-
-    # if True, don't store fields with None values into dictionary.
-    suppress_empty_values = kwargs.get("suppress_empty_values", False)
-
-    # get list of attrs fields
-    attrs = fields(obj.__class__)
+    # fields, keys, formatters and flags are compiled once per class/options
+    return plans.dict_plan(obj.__class__, kwargs)(obj)
 
-    # instantiate return dict, use OrderedDict type by default
-    return_dict = kwargs.get("dict_factory", OrderedDict)()
 
-    for a in attrs:
+_register_to_dict = to_dict.register
 
-        # skip if private attr and flag tells you to skip
-        if suppress_private_attr and a.name.startswith("_"):
-            continue
 
-        metadata = a.metadata or {}
-
-        # formatter is a related-specific `attrs` meta field
-        #   see fields.DateField
-        formatter = metadata.get('formatter')
-
-        # get value and call to_dict on it, passing the kwargs/formatter
-        value = getattr(obj, a.name)
-        value = to_dict(value, formatter=formatter, **kwargs)
-
-        # check flag, skip None values
-        if suppress_empty_values and value is None:
-            continue
+def register_to_dict(cls, func=None):
+    """
+    Register a to_dict implementation for a class (same signature as the
+    singledispatch register) and reset the value encoders cached by plans.
+    """
+    if func is None and isinstance(cls, type):
+        return lambda f: register_to_dict(cls, f)
 
-        # field name can be overridden by the metadata field
-        key_name = a.metadata.get('key') or a.name
+    plans.clear_encoders()
+    return _register_to_dict(cls, func)
 
-        # store converted / formatted value into return dictionary
-        return_dict[key_name] = value
 
-    return return_dict
+to_dict.register = register_to_dict
 
 
-def to_model(cls, value):
+def to_model(cls, value, lazy=False, trusted=False, intern=False,
+             share=False):
     """
     Coerce a value into a model object based on a class-type (cls).
     :param cls: class type to coerce into
     :param value: value to be coerced
+    :param lazy: convert the fields of a model on first access (see lazy.py)
+    :param trusted: value is known to be valid (e.g. produced by to_dict):
+                    skip validators and converters returning their input
+                    (see plans.TrustedLoader)
+    :param intern: True or an Interner: share equal strings and numbers of
+                   the value (see interning.py)
+    :param share: True or a Sharer: create identical immutable sub-objects
+                  once and share them (see sharing.py)
     :return: original value or coerced value (value')
     """
+    if intern:
+        value = intern_tree(value, intern)
+
+    if share and lazy:
+        raise ValueError("share cannot be combined with lazy")
+
+    if lazy:
+        return lazy_model(cls, value)
 
     if isinstance(value, cls) or value is None:
         pass  # skip if right type or value is None
@@ -100,8 +116,13 @@ def to_model(cls, value):
         value = cls(value)
 
     elif is_model(cls) and isinstance(value, dict):
-        value = convert_key_to_attr_names(cls, value)
-        value = cls(**value)
+        if share:
+            sharer = get_sharer(share)
+            value = sharer.load(cls, value, trusted)
+            if share is True:
+                sharer.clear()  # free the table now (loaders cycle)
+        else:
+            value = plans.loader_for(cls, trusted).load(value)
 
     else:
         value = cls(value)
@@ -111,22 +132,7 @@ def to_model(cls, value):
 
 def convert_key_to_attr_names(cls, original):
     """ convert key names to their corresponding attribute names """
-    attrs = fields(cls)
-    updated = {}
-    keys_pulled = set()
-
-    for a in attrs:
-        key_name = a.metadata.get('key') or a.name
-        if key_name in original:
-            updated[a.name] = original.get(key_name)
-            keys_pulled.add(key_name)
-
-    if getattr(cls, '__related_strict__', False):
-        extra = set(original.keys()) - keys_pulled
-        if len(extra):
-            raise ValueError("Extra keys (strict mode): {}".format(extra))
-
-    return updated
+    return plans.model_loader(cls).arguments(original)
 
 
 def is_model(cls):
@@ -141,8 +147,8 @@ def is_model(cls):
     return getattr(cls, "__attrs_attrs__", None) is not None
 
 
-def to_yaml(obj, stream=None, dumper_cls=yaml.Dumper, default_flow_style=False,
-            **kwargs):
+def to_yaml(obj, stream=None, dumper_cls=YAML_DUMPER,
+            default_flow_style=False, **kwargs):
     """
     Serialize a Python object into a YAML stream with OrderedDict and
     default_flow_style defaulted to False.
@@ -154,67 +160,339 @@ def to_yaml(obj, stream=None, dumper_cls=yaml.Dumper, default_flow_style=False,
 
     :param data: python object to be serialized
     :param stream: to be serialized to
-    :param Dumper: base Dumper class to extend.
+    :param Dumper: base Dumper class to extend (libyaml CSafeDumper if
+                   available, otherwise SafeDumper)
     :param kwargs: arguments to pass to to_dict
     :return: stream if provided, string if stream is None
     """
+    formatter = kwargs.pop("formatter", None)
+    options = plans.DictOptions(kwargs)
+    data = encoders.lazy_value(obj, formatter, options)
 
-    class OrderedDumper(dumper_cls):
-        pass
+    return yaml.dump(data, stream, yaml_dumper(dumper_cls),
+                     default_flow_style=default_flow_style)
 
-    def dict_representer(dumper, data):
-        return dumper.represent_mapping(
-            yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
-            data.items())
 
-    OrderedDumper.add_representer(OrderedDict, dict_representer)
+def from_yaml(stream, cls=None, loader_cls=YAML_LOADER,
+              object_pairs_hook=OrderedDict, lazy=False, trusted=False,
+              intern=False, share=False, **extras):
+    """
+    Convert a YAML stream into a class via the OrderedLoader class.
+    The libyaml CSafeLoader is used by default if available, otherwise
+    the SafeLoader. With lazy=True the model fields are converted on first
+    access, with trusted=True (or a trusted class) the validators are
+    skipped, with intern=True (or an Interner) equal values are shared and
+    with share=True (or a Sharer) identical immutable sub-objects are
+    created once (see to_model).
+
+    By default the YAML keys (and extras) are the constructor arguments of
+    cls, i.e. attribute names. The lazy, trusted and shared loads go
+    through to_model, which matches the key= names of fields like
+    from_json.
+    """
+    loader = yaml_loader(loader_cls, object_pairs_hook)
+    yaml_dict = yaml.load(stream, loader) or {}
+    yaml_dict.update(extras)
+    if intern:
+        yaml_dict = intern_tree(yaml_dict, intern)
+    if cls and (lazy or trusted or share or plans.is_trusted(cls)):
+        return to_model(cls, yaml_dict, lazy, trusted, share=share)
+    return cls(**yaml_dict) if cls else yaml_dict
+
 
-    obj_dict = to_dict(obj, **kwargs)
+def yaml_dumper(dumper_cls=YAML_DUMPER):
+    """
+    Return the OrderedDumper subclass of a dumper class (built once and
+    cached) that represents OrderedDict in insertion order and the typed
+    collections as plain sequences and mappings.
+    """
+    dumper = _yaml_classes.get(dumper_cls)
 
-    return yaml.dump(obj_dict, stream, OrderedDumper,
-                     default_flow_style=default_flow_style)
+    if dumper is None:
+
+        class OrderedDumper(dumper_cls):
+            pass
+
+        def dict_representer(dumper, data):
+            return dumper.represent_mapping(
+                yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
+                data.items())
+
+        def sequence_representer(dumper, data):
+            return dumper.represent_sequence(
+                yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG,
+                data)
+
+        OrderedDumper.add_representer(OrderedDict, dict_representer)
+        OrderedDumper.add_representer(TypedMapping, dict_representer)
+        OrderedDumper.add_representer(TypedSequence, sequence_representer)
+        OrderedDumper.add_representer(TypedSet, sequence_representer)
+        OrderedDumper.add_representer(FrozenMapping, dict_representer)
+        OrderedDumper.add_representer(FrozenSequence, sequence_representer)
+        OrderedDumper.add_representer(FrozenSet, sequence_representer)
+        OrderedDumper.add_representer(encoders.LazySequence,
+                                      sequence_representer)
+
+        dumper = _yaml_classes[dumper_cls] = OrderedDumper
 
+    return dumper
 
-def from_yaml(stream, cls=None, loader_cls=yaml.Loader,
-              object_pairs_hook=OrderedDict, **extras):
+
+def yaml_loader(loader_cls=YAML_LOADER, object_pairs_hook=OrderedDict):
     """
-    Convert a YAML stream into a class via the OrderedLoader class.
+    Return the OrderedLoader subclass of a loader class (built once per
+    loader class and object_pairs_hook and cached) that constructs mappings
+    with object_pairs_hook.
     """
+    loader = _yaml_classes.get((loader_cls, object_pairs_hook))
 
-    class OrderedLoader(loader_cls):
-        pass
+    if loader is None:
 
-    def construct_mapping(loader, node):
-        loader.flatten_mapping(node)
-        return object_pairs_hook(loader.construct_pairs(node))
+        class OrderedLoader(loader_cls):
+            pass
 
-    OrderedLoader.add_constructor(
-        yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
-        construct_mapping)
+        def construct_mapping(loader, node):
+            loader.flatten_mapping(node)
+            return object_pairs_hook(loader.construct_pairs(node))
 
-    yaml_dict = yaml.load(stream, OrderedLoader) or {}
-    yaml_dict.update(extras)
-    return cls(**yaml_dict) if cls else yaml_dict
+        OrderedLoader.add_constructor(
+            yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
+            construct_mapping)
+
+        loader = _yaml_classes[(loader_cls, object_pairs_hook)] = \
+            OrderedLoader
 
+    return loader
 
-def to_json(obj, indent=4, sort_keys=True, **kwargs):
+
+def to_json(obj, indent=4, sort_keys=True, stream=None, workers=None,
+            **kwargs):
     """
+    Serialize an object to JSON. Models are written directly without first
+    building the full to_dict tree (see encoders.ModelJSONEncoder).
+
     :param obj: object to convert to dictionary and then output to json
     :param indent: indent json by number of spaces
     :param sort_keys: sort json output by key if true
+    :param stream: writable stream the json is written to in chunks
+    :param workers: number of processes converting long sequences (the
+                    object or the sequence fields of a model) to dicts
     :param kwargs: arguments to pass to to_dict
-    :return: json string
+    :return: json string if stream is None
     """
-    obj_dict = to_dict(obj, **kwargs)
-    return json.dumps(obj_dict, indent=indent, sort_keys=sort_keys)
+    encoder = encoders.ModelJSONEncoder(kwargs, indent=indent,
+                                        sort_keys=sort_keys)
+    if workers:
+        obj = parallel.dict_tree(obj, encoder.formatter, encoder.options,
+                                 workers)
+        encoder = encoder.tree_encoder
+
+    if stream is None:
+        return encoder.encode(obj)
+
+    encoders.write_chunks(encoder.iterencode(obj), stream)
 
 
-def from_json(stream, cls=None, object_pairs_hook=OrderedDict, **extras):
+def from_json(stream, cls=None, object_pairs_hook=OrderedDict, lazy=False,
+              workers=None, trusted=False, intern=False, share=False,
+              **extras):
     """
-    Convert a JSON string or stream into specified class.
+    Convert a JSON string or stream into specified class. With lazy=True
+    the model fields are converted on first access. With workers=N the long
+    sequence fields of the model are converted by N processes. With
+    trusted=True the validators are skipped, with intern=True (or an
+    Interner) equal values are shared and with share=True (or a Sharer)
+    identical immutable sub-objects are created once (see to_model).
     """
     stream = stream.read() if hasattr(stream, 'read') else stream
+    if intern:
+        interner = get_interner(intern)
+        object_pairs_hook = interner.object_pairs_hook(object_pairs_hook)
     json_dict = json.loads(stream, object_pairs_hook=object_pairs_hook)
+    if intern and isinstance(json_dict, list):
+        interner.intern_list(json_dict)
     if extras:
         json_dict.update(extras)  # pragma: no cover
-    return to_model(cls, json_dict) if cls else json_dict
+    if cls and workers:
+        if share:
+            raise ValueError("share cannot be combined with workers")
+        return parallel.load_model(cls, json_dict, workers, trusted=trusted)
+    return to_model(cls, json_dict, lazy, trusted, share=share) if cls \
+        else json_dict
+
+
+def from_jsonl(stream, cls=None, batch_size=None, on_error=RAISE,
+               errors=None, object_pairs_hook=OrderedDict, workers=None,
+               trusted=False):
+    """
+    Lazily convert a JSON Lines string or stream (one JSON document per
+    line) into dictionaries or instances of the specified class.
+
+    :param stream: JSON Lines string or iterable of lines (e.g. a file)
+    :param cls: class to convert each record into (optional)
+    :param batch_size: yield lists of up to batch_size records if set
+    :param on_error: "raise", "skip" or "collect" invalid records
+    :param errors: list receiving RecordError(line number, line, error)
+                   for each invalid record when on_error is "collect"
+    :param object_pairs_hook: mapping type used for JSON objects
+    :param workers: number of processes converting chunks of lines
+    :param trusted: records are known to be valid (see to_model)
+    :return: generator of records (or of lists of records)
+    """
+    check_error_policy(on_error, errors)
+    lines = stream.splitlines() if isinstance(stream, string_types) \
+        else stream
+
+    numbered = ((number, line) for number, line in enumerate(lines, 1)
+                if line.strip())
+    records = convert_items(json_line_loader,
+                            (cls, object_pairs_hook, trusted), numbered,
+                            on_error, errors, workers)
+    return records if batch_size is None else batches(records, batch_size)
+
+
+def json_line_loader(cls, object_pairs_hook=OrderedDict, trusted=False):
+    """ Return a function converting one JSON line (to a cls instance). """
+    load = plans.value_loader(cls, trusted) if cls else None
+
+    def convert(line):
+        value = json.loads(line, object_pairs_hook=object_pairs_hook)
+        return load(value) if load else value
+
+    return convert
+
+
+def to_jsonl(iterable, stream=None, batch_size=1000, sort_keys=False,
+             on_error=RAISE, errors=None, workers=None, **kwargs):
+    """
+    Serialize each object of an iterable as one compact JSON line.
+
+    :param iterable: objects (e.g. models) to serialize
+    :param stream: writable stream, lines are written batch_size at a time
+    :param batch_size: number of lines joined per write to the stream
+    :param sort_keys: sort json output by key if true
+    :param on_error: "raise", "skip" or "collect" unserializable objects
+    :param errors: list receiving RecordError(index, object, error)
+                   for each failed object when on_error is "collect"
+    :param workers: number of processes serializing chunks of objects
+    :param kwargs: arguments to pass to to_dict
+    :return: JSON Lines string if stream is None
+    """
+    check_error_policy(on_error, errors)
+    lines = convert_items(json_line_dumper, (sort_keys, kwargs),
+                          enumerate(iterable), on_error, errors, workers)
+
+    if stream is None:
+        return "".join(line + "\n" for line in lines)
+
+    for batch in batches(lines, batch_size):
+        stream.write("\n".join(batch) + "\n")
+
+
+def json_line_dumper(sort_keys=False, kwargs=None):
+    """ Return a function serializing one object as a compact JSON line. """
+    encoder = encoders.ModelJSONEncoder(kwargs, sort_keys=sort_keys,
+                                        separators=(",", ":"))
+    return encoder.encode
+
+
+def to_models(cls, iterable, batch_size=None, on_error=RAISE, errors=None,
+              lazy=False, workers=None, trusted=False):
+    """
+    Lazily convert each value of an iterable (e.g. dictionaries) into an
+    instance of cls. The loader of the class is looked up once and used for
+    every value.
+
+    :param cls: class type to coerce each value into
+    :param iterable: values to convert
+    :param batch_size: yield lists of up to batch_size models if set
+    :param on_error: "raise", "skip" or "collect" invalid values
+    :param errors: list receiving RecordError(index, value, error) for each
+                   invalid value when on_error is "collect"
+    :param lazy: convert the fields of each model on first access
+    :param workers: number of processes converting chunks of values (lazy
+                    is ignored since models are sent back pickled)
+    :param trusted: values are known to be valid (see to_model)
+    :return: generator of models (or of lists of models)
+    """
+    check_error_policy(on_error, errors)
+    if lazy and not workers:
+        factory, args = lazy_value_loader, (cls,)
+    else:
+        factory, args = plans.value_loader, (cls, trusted)
+    models = convert_items(factory, args, enumerate(iterable), on_error,
+                           errors, workers)
+    return models if batch_size is None else batches(models, batch_size)
+
+
+def to_dicts(iterable, batch_size=None, on_error=RAISE, errors=None,
+             workers=None, **kwargs):
+    """
+    Lazily convert each object of an iterable (e.g. models) into a
+    dictionary. The plan of each class is looked up once for the options
+    and used for every object.
+
+    :param iterable: objects to convert
+    :param batch_size: yield lists of up to batch_size dictionaries if set
+    :param on_error: "raise", "skip" or "collect" unconvertible objects
+    :param errors: list receiving RecordError(index, object, error) for
+                   each failed object when on_error is "collect"
+    :param workers: number of processes converting chunks of objects
+    :param kwargs: arguments to pass to to_dict
+    :return: generator of dictionaries (or of lists of dictionaries)
+    """
+    check_error_policy(on_error, errors)
+    formatter = kwargs.pop("formatter", None)
+    items = convert_items(plans.value_dumper, (formatter, kwargs),
+                          enumerate(iterable), on_error, errors, workers)
+    return items if batch_size is None else batches(items, batch_size)
+
+
+def check_error_policy(on_error, errors):
+    """ Validate the on_error/errors arguments of the batch functions. """
+    if on_error not in ERROR_POLICIES:
+        raise ValueError("Invalid on_error value: {}".format(on_error))
+
+    if on_error == COLLECT and errors is None:
+        raise ValueError("An errors list is required to collect errors.")
+
+
+def convert_each(items, convert, on_error=RAISE, errors=None):
+    """
+    Generator applying convert to each (index, value) item according to an
+    error policy (see check_error_policy).
+    """
+    for index, value in items:
+        try:
+            yield convert(value)
+        except Exception as e:
+            if on_error == RAISE:
+                raise
+            if on_error == COLLECT:
+                errors.append(RecordError(index, value, e))
+
+
+def convert_items(factory, args, items, on_error=RAISE, errors=None,
+                  workers=None):
+    """
+    Generator converting (index, value) items with the function returned by
+    factory(*args), in worker processes if workers is set (see parallel).
+    """
+    if workers:
+        return parallel.convert_chunks(factory, args, items, workers,
+                                       on_error, errors)
+    return convert_each(items, factory(*args), on_error, errors)
+
+
+def batches(items, batch_size):
+    """ Generator of lists of up to batch_size items. """
+    batch = []
+
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
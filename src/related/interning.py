@@ -0,0 +1,120 @@
+"""
+Interning of the values of loaded documents.
+
+Documents often repeat the same strings (names, status codes, enum values,
+keys) and numbers many times, and every occurrence loaded from JSON or YAML
+is a separate object kept alive by the models. An Interner replaces equal
+values by a single canonical instance before the models are created, so
+that large model graphs (and the raw dictionaries of lazy models) share
+them.
+
+    interner = related.Interner()
+    store = related.from_json(text, StoreData, intern=interner)
+    print(interner.stats())
+
+from_json interns the values while decoding (see object_pairs_hook),
+from_yaml and to_model intern a copy of the loaded tree. An Interner can be
+shared by several loads to deduplicate values across them (it keeps its
+values alive as long as it is referenced), intern=True uses a new one for a
+single load. Enum members and the dates parsed by the
+field converters (see dates.py) are shared already.
+"""
+from collections import namedtuple
+from datetime import date, datetime, time
+import sys
+
+# exact classes of the interned values (bool and None are singletons)
+INTERNED_TYPES = frozenset([str, int, float, date, datetime, time])
+
+InternStats = namedtuple("InternStats", "values hits bytes_saved")
+
+
+class Interner(object):
+    """
+    Table of canonical instances of immutable values.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.hits = 0
+        self.bytes_saved = 0
+
+    def __call__(self, value):
+        """ Return the canonical instance of a value equal to value. """
+        cls = value.__class__
+        if cls not in INTERNED_TYPES or \
+                (cls is float and (not value or value != value)):
+            return value  # 0.0 == -0.0 and nan != nan
+
+        # keyed by class too, since 1 == 1.0
+        key = (cls, value)
+        canonical = self.values.setdefault(key, value)
+
+        if canonical is not value:
+            self.hits += 1
+            self.bytes_saved += sys.getsizeof(value)
+
+        return canonical
+
+    def intern_tree(self, value):
+        """
+        Return a copy of a tree of dictionaries and lists (as loaded from
+        JSON or YAML) with interned keys and values.
+        """
+        if isinstance(value, dict):
+            return value.__class__([(self(key), self.intern_tree(item))
+                                    for key, item in value.items()])
+
+        if isinstance(value, list):
+            return [self.intern_tree(item) for item in value]
+
+        return self(value)
+
+    def object_pairs_hook(self, object_pairs_hook):
+        """
+        Return a json object_pairs_hook interning the keys and values of
+        the objects while they are decoded, before passing their pairs to
+        object_pairs_hook (single pass, unlike intern_tree).
+        """
+        def hook(pairs):
+            return object_pairs_hook([
+                (self(key), self.intern_list(value)
+                 if value.__class__ is list else self(value))
+                for key, value in pairs])
+
+        return hook
+
+    def intern_list(self, values):
+        """ Intern the values of a decoded list in place (not its dicts). """
+        values[:] = [self.intern_list(value) if value.__class__ is list
+                     else self(value) for value in values]
+        return values
+
+    def stats(self):
+        """
+        Return InternStats: number of distinct values, number of values
+        replaced by a canonical instance and bytes no longer allocated.
+        """
+        return InternStats(len(self.values), self.hits, self.bytes_saved)
+
+    def clear(self):
+        """ Forget the canonical values and reset the statistics. """
+        self.values.clear()
+        self.hits = 0
+        self.bytes_saved = 0
+
+
+def get_interner(intern):
+    """ Return an Interner for intern=True or the Interner given. """
+    return Interner() if intern is True else intern
+
+
+def intern_tree(value, intern):
+    """
+    Intern a loaded tree of dictionaries and lists.
+
+    :param value: tree to intern.
+    :param intern: True (use a new Interner) or an Interner instance.
+    :return: interned copy of the tree
+    """
+    return get_interner(intern).intern_tree(value)
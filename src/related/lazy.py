@@ -0,0 +1,358 @@
+"""
+Lazy model views over raw dictionaries.
+
+``to_model(cls, value, lazy=True)`` returns an instance of a lazy subclass of
+the model class that keeps the raw input dictionary and only converts and
+validates a field the first time it is read, caching the result on the
+instance. Child models, the items of mapping fields and the items of
+sequence fields (on first access by index or iteration) are created lazily
+as well, so reading a handful of fields of a large document only pays for
+those fields.
+
+Serializing a lazy model (to_dict, to_json, to_yaml) writes the raw input of
+fields and sequence items that were never read as is, without converting
+them first.
+"""
+from attr import NOTHING, Factory
+from attr._make import fields
+
+from . import functions, plans
+from .types import FrozenSequence, TypedSequence
+
+LAZY_LOADER_ATTR = "__related_lazy_loader__"
+RAW_ATTR = "__related_raw__"
+
+
+class LazyDictPlan(plans.DictPlan):
+    """
+    DictPlan of a lazy model class that passes the raw value of fields that
+    were not read yet through to_dict instead of converting them.
+    """
+
+    def __init__(self, cls, kwargs):
+        super(LazyDictPlan, self).__init__(cls, kwargs)
+        self.cache = None  # never cached (see cache_dict)
+
+    def encode_fields(self, obj):
+        return_dict = self.dict_factory()
+        suppress_empty_values = self.suppress_empty_values
+
+        for key_name, formatter, value in self.field_values(obj):
+            value = plans.encode_value(value, formatter, self)
+
+            if suppress_empty_values and value is None:
+                continue
+
+            return_dict[key_name] = value
+
+        return return_dict
+
+    def field_values(self, obj):
+        raw = raw_dict(obj)
+
+        for name, key_name, formatter in self.fields:
+            try:
+                value = object.__getattribute__(obj, name)
+            except AttributeError:
+                if key_name in raw:
+                    value = raw[key_name]
+                else:
+                    value = getattr(obj, name)  # default value
+
+            yield key_name, formatter, value
+
+
+class LazyLoader(object):
+    """
+    Callable that coerces values into instances of a related model class
+    like ModelLoader, except that dictionaries become lazy instances.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.model_loader = plans.model_loader(cls)
+        self.required = tuple(a.metadata.get('key') or a.name
+                              for a in fields(cls) if a.default is NOTHING)
+        self.lazy_cls = lazy_class(cls)
+        self.new = plans.instance_factory(self.lazy_cls)
+        self.post_init = getattr(cls, "__attrs_post_init__", None)
+
+    def load(self, original):
+        """ Create a lazy model instance backed by a dictionary. """
+        self.model_loader.check_keys(original)
+
+        missing = [key for key in self.required if key not in original]
+        if missing:
+            raise TypeError("{}() missing required arguments: {}".format(
+                self.cls.__name__, ", ".join(missing)))
+
+        obj = self.new()
+        object.__setattr__(obj, RAW_ATTR, original)
+
+        if self.post_init is not None:
+            self.post_init(obj)
+
+        return obj
+
+    def __call__(self, value):
+        if isinstance(value, dict):
+            return self.load(value)
+
+        return self.model_loader(value)
+
+
+def raw_dict(obj):
+    """
+    Raw input dictionary of a lazy model, empty for the instances created by
+    the attrs __init__ of the lazy class (e.g. attr.evolve of a lazy model).
+    """
+    try:
+        return object.__getattribute__(obj, RAW_ATTR)
+    except AttributeError:
+        return {}
+
+
+def lazy_class(cls):
+    """
+    Create the lazy subclass of a related model class. Fields missing from
+    an instance are read from its raw dictionary (or default), converted,
+    validated and stored the first time they are accessed.
+
+    :param cls: related model class.
+    :return: subclass of cls
+    """
+    lazy_fields = {}
+    for a in fields(cls):
+        convert = getattr(a.converter, "lazy", a.converter)
+        lazy_fields[a.name] = (a.metadata.get('key') or a.name, a.default,
+                               convert, a.validator, a)
+    __eq__ = _lazy_eq(cls, tuple(a.name for a in fields(cls) if a.eq))
+
+    def __ne__(self, other):
+        result = __eq__(self, other)
+        return result if result is NotImplemented else not result
+
+    def __reduce_ex__(self, protocol):
+        # pickle (and copy) the eager model
+        return _unpickle_eager, (materialize(self),)
+
+    body = dict(__slots__=(RAW_ATTR,), __module__=cls.__module__,
+                __qualname__=cls.__qualname__,
+                __getattr__=_lazy_getattr(lazy_fields), __eq__=__eq__,
+                __ne__=__ne__, __hash__=cls.__hash__,
+                __reduce_ex__=__reduce_ex__, __related_plan__=LazyDictPlan)
+
+    return type(cls.__name__, (cls,), body)
+
+
+def _lazy_getattr(lazy_fields):
+    """
+    __getattr__ of a lazy class: converts, validates and stores a field
+    missing from an instance.
+
+    :param lazy_fields: field name => (key name, default, lazy converter,
+                        validator, attribute)
+    """
+
+    def __getattr__(self, name):
+        try:
+            key_name, default, convert, validator, a = lazy_fields[name]
+        except KeyError:
+            raise AttributeError(name)
+
+        raw = raw_dict(self)
+        if key_name in raw:
+            value = raw[key_name]
+        elif isinstance(default, Factory):
+            value = default.factory(self) if default.takes_self \
+                else default.factory()
+        else:
+            value = default
+
+        if convert is not None:
+            value = convert(value)
+
+        if validator is not None:
+            validator(self, a, value)
+
+        object.__setattr__(self, name, value)
+        return value
+
+    return __getattr__
+
+
+def _lazy_eq(cls, eq_names):
+    """ __eq__ of a lazy class, comparing the fields eq_names. """
+
+    def __eq__(self, other):
+        if not isinstance(other, cls):
+            return NotImplemented
+
+        for name in eq_names:
+            if getattr(self, name) != getattr(other, name):
+                return False
+
+        return True
+
+    return __eq__
+
+
+def lazy_loader(cls):
+    """
+    Return the LazyLoader of a related model class, cached on the class.
+
+    :param cls: related model class.
+    :return: LazyLoader instance
+    """
+    loader = cls.__dict__.get(LAZY_LOADER_ATTR)
+    if loader is None:
+        loader = LazyLoader(cls)
+        setattr(cls, LAZY_LOADER_ATTR, loader)
+    return loader
+
+
+def lazy_value_loader(cls):
+    """
+    Return a callable that coerces a value into *cls* like to_model does
+    with lazy=True.
+
+    :param cls: class type to coerce into (model or not).
+    """
+    if functions.is_model(cls):
+        return lazy_loader(cls)
+    return plans.value_loader(cls)
+
+
+def lazy_model(cls, value):
+    """
+    Coerce a value into a model object like to_model, creating a lazy
+    instance backed by the value if it is a dictionary.
+
+    :param cls: class type to coerce into
+    :param value: value to be coerced
+    :return: original value or coerced value (value')
+    """
+    return lazy_value_loader(cls)(value)
+
+
+def materialize(obj):
+    """
+    Return an eager copy of a lazy model with every field converted, or the
+    object itself if it is not a lazy model.
+    """
+    base = eager_class(obj.__class__)
+    if base is obj.__class__:
+        return obj
+
+    return base(**dict((a.name.lstrip("_"), getattr(obj, a.name))
+                       for a in fields(base) if a.init))
+
+
+def eager_class(cls):
+    """ Return the model class of a lazy subclass, else cls itself. """
+    if LazyDictPlan is getattr(cls, "__related_plan__", None):
+        return cls.__mro__[1]
+    return cls
+
+
+def _unpickle_eager(obj):
+    return obj
+
+
+class LazyTypedSequence(TypedSequence):
+    """
+    TypedSequence over raw items that are converted with a loader (and
+    replaced by the result) the first time they are read.
+    """
+
+    __slots__ = ("loader",)
+
+    def __init__(self, cls, args, loader, allow_none=True):
+        super(LazyTypedSequence, self).__init__(cls, args,
+                                                allow_none=allow_none,
+                                                trusted=True)
+        self.loader = loader
+
+    def __str__(self):
+        return str(self.materialize())
+
+    def __repr__(self):
+        return repr(self.materialize())
+
+    def __eq__(self, other):
+        self.materialize()
+        return super(LazyTypedSequence, self).__eq__(other)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.list)))]
+
+        value = self.list[i]
+        if not isinstance(value, self.allowed_types):
+            value = self.loader(value)
+            self._check(value)
+            self.list[i] = value
+        return value
+
+    def __iter__(self):
+        for i in range(len(self.list)):
+            yield self[i]
+
+    def __reduce__(self):
+        return TypedSequence, (self.cls, self.materialize(),
+                               self.allowed_types != self.cls, True)
+
+    def materialize(self):
+        """ Convert all the remaining raw items and return the list. """
+        for _ in self:
+            pass
+        return self.list
+
+
+class FrozenLazyTypedSequence(LazyTypedSequence, FrozenSequence):
+    """
+    LazyTypedSequence of the sequence fields of immutable models: cannot be
+    modified and is backed by a tuple like FrozenSequence. Converted items
+    are kept aside until the sequence is materialized (e.g. hashed).
+    """
+
+    __slots__ = ("loaded",)
+
+    def __init__(self, cls, args, loader, allow_none=True):
+        super(FrozenLazyTypedSequence, self).__init__(cls, args, loader,
+                                                      allow_none=allow_none)
+        self.loaded = {}
+
+    def __str__(self):
+        return str(list(self.materialize()))
+
+    def __repr__(self):
+        return repr(list(self.materialize()))
+
+    def __hash__(self):
+        return hash(self.materialize())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.list)))]
+
+        value = self.list[i]
+        if not isinstance(value, self.allowed_types):
+            i %= len(self.list)
+            try:
+                value = self.loaded[i]
+            except KeyError:
+                value = self.loaded[i] = self.loader(value)
+                self._check(value)
+        return value
+
+    def __reduce__(self):
+        return FrozenSequence, (self.cls, self.materialize(),
+                                self.allowed_types != self.cls, True)
+
+    def materialize(self):
+        """ Convert all the remaining raw items and return the tuple. """
+        if self.loaded is not None:
+            self.list = tuple(self)
+            self.loaded = None
+        return self.list
@@ -0,0 +1,149 @@
+"""
+Multi-process conversion of large record collections.
+
+Functions accepting ``workers=N`` split their input into chunks that are
+converted by a pool of N processes and reassemble the results in input
+order. Each worker builds its converter once per chunk from a picklable
+factory (e.g. ``plans.value_loader`` and a model class) and keeps the plans
+and loaders it compiles cached on the classes of its process, so only the
+chunks of raw values and of results cross process boundaries.
+
+Model classes must be importable by the worker processes (defined at
+module level), as with any object sent to a process pool. Only a bounded
+number of chunks is in flight at a time, so iterables are consumed as
+results are read.
+
+The values and results of the chunks are pickled, so workers only pay off
+on several cores when converting a value costs more than pickling it and
+its result (see benchmarks/bench_parallel.py); otherwise the serial mode is
+faster.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from attr._make import fields
+
+from . import functions, plans
+from .converters import ClassConverter
+from .types import TypedSequence
+
+# number of values sent to a worker at a time
+CHUNK_SIZE = 1000
+
+# chunks in flight per worker
+PREFETCH = 2
+
+
+def convert_chunks(factory, args, items, workers, on_error, errors=None,
+                   chunk_size=None):
+    """
+    Generator converting (index, value) items in a pool of worker processes
+    with the error policy of convert_each.
+
+    :param factory: picklable callable returning the convert function
+    :param tuple args: picklable arguments of factory
+    :param items: iterable of (index, value) pairs
+    :param int workers: number of worker processes
+    :param on_error: "raise", "skip" or "collect" invalid values
+    :param errors: list receiving the RecordError of each invalid value
+    :param chunk_size: number of values per chunk (default: CHUNK_SIZE)
+    """
+    chunks = functions.batches(items, chunk_size or CHUNK_SIZE)
+    pending = deque()
+
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(convert_chunk, factory, args, chunk,
+                                       on_error))
+            if len(pending) >= workers * PREFETCH:
+                for result in _chunk_results(pending.popleft(), errors):
+                    yield result
+
+        while pending:
+            for result in _chunk_results(pending.popleft(), errors):
+                yield result
+
+
+def _chunk_results(future, errors):
+    results, chunk_errors = future.result()
+    if chunk_errors:
+        errors.extend(chunk_errors)
+    return results
+
+
+def convert_chunk(factory, args, chunk, on_error):
+    """ Worker function: convert one chunk, return (results, errors). """
+    errors = []
+    convert = factory(*args)
+    results = list(functions.convert_each(chunk, convert, on_error, errors))
+    return results, errors
+
+
+def convert_all(factory, args, values, workers, chunk_size=None):
+    """ Convert a list of values in worker processes, return a list. """
+    return list(convert_chunks(factory, args, enumerate(values), workers,
+                               functions.RAISE, chunk_size=chunk_size))
+
+
+def load_model(cls, value, workers, chunk_size=None, trusted=False):
+    """
+    to_model for a dictionary in which the values of the sequence and set
+    fields of models longer than a chunk are loaded in worker processes.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+
+    if isinstance(value, dict) and functions.is_model(cls):
+        value = value.copy()
+        for key_name, converter in _collection_fields(cls):
+            items = value.get(key_name)
+            if isinstance(items, list) and len(items) > chunk_size:
+                value[key_name] = convert_all(
+                    plans.value_loader, (converter.cls, trusted), items,
+                    workers, chunk_size)
+
+    return functions.to_model(cls, value, trusted=trusted)
+
+
+def _collection_fields(cls):
+    for a in fields(cls):
+        converter = a.converter
+        if isinstance(converter, ClassConverter) and converter.collection \
+                and functions.is_model(converter.cls):
+            yield a.metadata.get('key') or a.name, converter
+
+
+def dict_tree(obj, formatter, options, workers, chunk_size=None):
+    """
+    to_dict of an object in which sequences longer than a chunk (the object
+    itself or the sequence fields of a model) are encoded in worker
+    processes.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+
+    if not functions.is_model(obj.__class__):
+        return _encode_sequence(obj, formatter, options, workers, chunk_size)
+
+    plan = options.plan_for(obj.__class__)
+    return_dict = plan.dict_factory()
+
+    for key_name, field_formatter, value in plan.field_values(obj):
+        value = _encode_sequence(value, field_formatter, plan, workers,
+                                 chunk_size)
+
+        if plan.suppress_empty_values and value is None:
+            continue
+
+        return_dict[key_name] = value
+
+    return return_dict
+
+
+def _encode_sequence(value, formatter, options, workers, chunk_size):
+    items = value.list if isinstance(value, TypedSequence) else value
+
+    if not isinstance(items, (list, tuple)) or len(items) <= chunk_size:
+        return plans.encode_value(value, formatter, options)
+
+    cf = items.__class__ if options.retain_collection_types else list
+    return cf(convert_all(plans.value_dumper, (formatter, options.kwargs),
+                          items, workers, chunk_size))
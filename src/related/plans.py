@@ -0,0 +1,561 @@
+"""
+Compiled serialization plans and loaders for related models.
+
+A DictPlan captures everything ``to_dict`` needs to know about a model class
+for one set of keyword options (output keys, formatters and which fields are
+skipped) so that serializing an instance is a single loop over precomputed
+field entries. Plans are built on first use and cached on the model class.
+
+Values are encoded through per-type encoders that honour the ``to_dict``
+singledispatch registry: types with a registered ``to_dict`` are handed to
+that implementation, models are encoded by their own plan and everything
+else is returned as is.
+
+The plans of a class decorated with ``@immutable(cache_dict=True)`` keep
+the dictionary of each instance they serialize until the instance is
+garbage collected: the same options return a shallow copy of the same
+dictionary, and serializing a parent reuses the dictionaries of its cached
+children.
+
+A ModelLoader is the reverse: the key to attribute name mapping and strict
+mode check of a model class, computed once and cached on the class, so that
+``to_model`` maps an input dictionary to constructor arguments in one pass.
+A TrustedLoader loads input known to be valid (e.g. produced by to_dict)
+without running validators or converters that would return their input.
+"""
+from collections import OrderedDict
+from copy import copy
+from datetime import date, datetime, time
+from functools import partial
+from weakref import ref
+
+from attr import NOTHING, Factory
+from attr._make import fields
+from attr.validators import _OptionalValidator
+
+from . import dates, functions
+from .types import TypedSequence, TypedSet, TypedMapping
+
+PLANS_ATTR = "__related_dict_plans__"
+LOADER_ATTR = "__related_loader__"
+TRUSTED_LOADER_ATTR = "__related_trusted_loader__"
+CACHE_DICT_ATTR = "__related_cache_dict__"
+CACHE_HASH_ATTR = "__related_cache_hash__"
+
+# slot of the hash cached by attrs (cache_hash=True), not a public attrs
+# name: checked by the immutable decorator and tests/test_cache_hash.py
+HASH_CACHE_FIELD = "_attrs_cached_hash"
+
+_DISPATCHERS_MODULE = __name__.rsplit(".", 1)[0] + ".dispatchers"
+
+# value class => encoder(value, formatter, options)
+_encoders = {}
+
+
+class DictOptions(object):
+    """
+    to_dict keyword arguments shared by the plans of one serialization.
+    """
+
+    def __init__(self, kwargs):
+        self.kwargs = kwargs
+        self.dict_factory = kwargs.get("dict_factory", OrderedDict)
+        self.suppress_empty_values = kwargs.get("suppress_empty_values",
+                                                False)
+        self.suppress_map_key_values = kwargs.get("suppress_map_key_values",
+                                                  False)
+        self.retain_collection_types = kwargs.get("retain_collection_types",
+                                                  False)
+        self._plans = {}
+
+    def plan_for(self, cls):
+        """ Return the plan for a model class with the same options. """
+        plan = self._plans.get(cls)
+        if plan is None:
+            plan = self._plans[cls] = dict_plan(cls, self.kwargs)
+        return plan
+
+    def key_name(self, item, name):
+        """
+        Output key of the field *name* of a mapping item (e.g. its key=
+        metadata), name itself if the item is not a model.
+        """
+        if value_encoder(item.__class__) is encode_model:
+            return self.plan_for(item.__class__).key_names.get(name, name)
+        return name
+
+
+class DictPlan(DictOptions):
+    """
+    Serialization plan of a related model class for one set of to_dict
+    keyword arguments.
+    """
+
+    def __init__(self, cls, kwargs):
+        super(DictPlan, self).__init__(kwargs)
+        self.cls = cls
+        self.fields = compile_fields(cls, kwargs.get("suppress_private_attr",
+                                                     False))
+        self.key_names = dict((name, key_name)
+                              for name, key_name, _ in self.fields)
+        # id(obj) => (weak reference to obj, dict), see cache_dict
+        self.cache = {} if getattr(cls, CACHE_DICT_ATTR, False) else None
+
+    def __call__(self, obj):
+        """
+        Dictionary of obj, a shallow copy of the one kept for the classes
+        declared with cache_dict (the nested dictionaries are shared).
+        """
+        return_dict = self.encode(obj)
+        return copy(return_dict) if self.cache is not None else return_dict
+
+    def encode(self, obj):
+        """
+        Dictionary of obj, kept and returned again for the classes declared
+        with cache_dict: shared, not to be modified (see __call__).
+        """
+        cache = self.cache
+        if cache is not None:
+            entry = cache.get(id(obj))
+            if entry is not None and entry[0]() is obj:
+                return entry[1]
+
+        return_dict = self.encode_fields(obj)
+
+        if cache is not None:
+            key = id(obj)
+            cache[key] = (ref(obj, partial(_forget, cache, key)), return_dict)
+
+        return return_dict
+
+    def encode_fields(self, obj):
+        """ New dictionary of the encoded field values of obj. """
+        return_dict = self.dict_factory()
+        suppress_empty_values = self.suppress_empty_values
+
+        for name, key_name, formatter in self.fields:
+            value = encode_value(getattr(obj, name), formatter, self)
+
+            if suppress_empty_values and value is None:
+                continue
+
+            return_dict[key_name] = value
+
+        return return_dict
+
+    def field_values(self, obj):
+        """ Generator of (key name, formatter, value) for each field. """
+        for name, key_name, formatter in self.fields:
+            yield key_name, formatter, getattr(obj, name)
+
+
+def _forget(cache, key, obj_ref):
+    """ Weak reference callback removing the dict of a collected model. """
+    entry = cache.get(key)
+    if entry is not None and entry[0] is obj_ref:
+        del cache[key]
+
+
+def compile_fields(cls, suppress_private_attr=False):
+    """
+    Return a tuple of (attribute name, output key, formatter) entries for
+    the attrs fields of a model class.
+
+    :param cls: related model class.
+    :param bool suppress_private_attr: skip fields starting with underscore.
+    """
+    entries = []
+
+    for a in fields(cls):
+        if suppress_private_attr and a.name.startswith("_"):
+            continue
+
+        metadata = a.metadata or {}
+        key_name = metadata.get('key') or a.name
+        entries.append((a.name, key_name, metadata.get('formatter')))
+
+    return tuple(entries)
+
+
+def dict_plan(cls, kwargs):
+    """
+    Return the cached DictPlan of a model class for the to_dict kwargs.
+
+    :param cls: related model class.
+    :param dict kwargs: to_dict keyword arguments (without formatter).
+    :return: DictPlan instance
+    """
+    plan_cls = getattr(cls, "__related_plan__", DictPlan)
+
+    try:
+        options = tuple(sorted(kwargs.items()))
+        hash(options)
+    except TypeError:
+        return plan_cls(cls, kwargs)
+
+    plans = cls.__dict__.get(PLANS_ATTR)
+    if plans is None:
+        plans = {}
+        setattr(cls, PLANS_ATTR, plans)
+
+    plan = plans.get(options)
+    if plan is None:
+        plan = plans[options] = plan_cls(cls, kwargs)
+
+    return plan
+
+
+def value_encoder(cls):
+    """
+    Return the cached encoder(value, formatter, options) for a value class.
+    """
+    try:
+        return _encoders[cls]
+    except KeyError:
+        encoder = _encoders[cls] = _build_encoder(cls)
+        return encoder
+
+
+def encode_value(value, formatter, options):
+    """ Encode a single value the way to_dict would. """
+    cls = value.__class__
+    try:
+        encoder = _encoders[cls]
+    except KeyError:
+        encoder = _encoders[cls] = _build_encoder(cls)
+    return encoder(value, formatter, options)
+
+
+def value_dumper(formatter, kwargs):
+    """
+    Return a function encoding values like to_dict(value, formatter=...,
+    **kwargs), e.g. for the worker processes of parallel.
+    """
+    options = DictOptions(kwargs)
+    return partial(encode_value, formatter=formatter, options=options)
+
+
+def clear_encoders():
+    """ Forget cached value encoders (called when to_dict is registered). """
+    _encoders.clear()
+
+
+def _build_encoder(cls):
+    to_dict = functions.to_dict
+    impl = to_dict.dispatch(cls)
+
+    if impl is to_dict.dispatch(object):
+        return encode_model if functions.is_model(cls) else encode_same
+
+    if getattr(impl, "__module__", None) == _DISPATCHERS_MODULE:
+        registered = _registered_type(cls, impl)
+        if registered in (list, set, frozenset, tuple):
+            return encode_sequence
+        if registered is dict:
+            return encode_dict
+        if registered in DATE_ENCODERS:
+            return DATE_ENCODERS[registered]
+        if registered is TypedSequence:
+            return encode_typed_sequence
+        if registered is TypedSet:
+            return encode_typed_set
+        if registered is TypedMapping:
+            return encode_typed_mapping
+
+    def encode(value, formatter, options):
+        return impl(value, formatter=formatter, **options.kwargs)
+
+    return encode
+
+
+def _registered_type(cls, impl):
+    registry = functions.to_dict.registry
+    for base in cls.__mro__:
+        if registry.get(base) is impl:
+            return base
+    return object  # pragma: no cover
+
+
+def encode_same(value, formatter, options):
+    """ Encoder of values that to_dict returns unchanged. """
+    return value
+
+
+def encode_model(value, formatter, options):
+    """ Encoder of related model instances (formatter is not cascaded). """
+    return options.plan_for(value.__class__).encode(value)
+
+
+def encode_sequence(value, formatter, options):
+    """ Encoder of list, set, frozenset and tuple values. """
+    if options.suppress_empty_values and not len(value):
+        return None
+
+    cf = value.__class__ if options.retain_collection_types else list
+    return cf([encode_value(item, formatter, options) for item in value])
+
+
+def encode_dict(value, formatter, options):
+    """ Encoder of dict values (e.g. raw input of lazy models). """
+    suppress_empty_values = options.suppress_empty_values
+    items = []
+
+    for key, item in value.items():
+        item = encode_value(item, formatter, options)
+        if not suppress_empty_values or item is not None:
+            items.append((encode_value(key, formatter, options), item))
+
+    if not suppress_empty_values or len(items):
+        return options.dict_factory(items)
+
+
+def encode_date(value, formatter, options):
+    """ Encoder of date values. """
+    return dates.format_date(value, formatter)
+
+
+def encode_datetime(value, formatter, options):
+    """ Encoder of datetime values. """
+    return dates.format_datetime(value, formatter)
+
+
+def encode_time(value, formatter, options):
+    """ Encoder of time values. """
+    return dates.format_time(value, formatter)
+
+
+DATE_ENCODERS = {date: encode_date, datetime: encode_datetime,
+                 time: encode_time}
+
+
+def encode_typed_sequence(value, formatter, options):
+    """ Encoder of TypedSequence values. """
+    return encode_value(value.list, formatter, options)
+
+
+def encode_typed_set(value, formatter, options):
+    """ Encoder of TypedSet values. """
+    return encode_value(value.set, formatter, options)
+
+
+def without_key(sub_dict, key, dict_factory):
+    """
+    Copy of the dictionary of a mapping item without its key field, given
+    by its output key (the dictionary itself may be shared, see
+    cache_dict). A missing key is ignored.
+    """
+    return dict_factory((name, item) for name, item in sub_dict.items()
+                        if name != key)
+
+
+def encode_typed_mapping(value, formatter, options):
+    """ Encoder of TypedMapping values. """
+    return_dict = options.dict_factory()
+
+    for key_value, item in value.items():
+        sub_dict = encode_value(item, formatter, options)
+        if options.suppress_map_key_values:
+            sub_dict = without_key(sub_dict,
+                                   options.key_name(item, value.key),
+                                   options.dict_factory)
+        return_dict[key_value] = sub_dict
+
+    if not options.suppress_empty_values or len(value):
+        return return_dict
+
+
+class ModelLoader(object):
+    """
+    Callable that coerces values (typically dictionaries) into instances of
+    a related model class.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.strict = getattr(cls, '__related_strict__', False)
+        self.keys = tuple((a.metadata.get('key') or a.name, a.name)
+                          for a in fields(cls))
+        self.key_names = frozenset(key_name for key_name, _ in self.keys)
+
+    def arguments(self, original):
+        """ Map the keys of a dictionary to constructor argument names. """
+        kwargs = {}
+
+        for key_name, name in self.keys:
+            if key_name in original:
+                kwargs[name] = original[key_name]
+
+        if self.strict:
+            self.check_keys(original)
+
+        return kwargs
+
+    def check_keys(self, original):
+        """ Raise ValueError for unknown keys if the class is strict. """
+        if self.strict and not self.key_names.issuperset(original):
+            extra = set(original.keys()) - self.key_names
+            raise ValueError("Extra keys (strict mode): {}".format(extra))
+
+    def load(self, original):
+        """ Create a model instance from a dictionary. """
+        return self.cls(**self.arguments(original))
+
+    def __call__(self, value):
+        cls = self.cls
+
+        if value is None or isinstance(value, cls):
+            return value
+
+        if isinstance(value, dict):
+            return cls(**self.arguments(value))
+
+        return cls(value)
+
+
+def model_loader(cls):
+    """
+    Return the ModelLoader of a related model class, cached on the class.
+
+    :param cls: related model class.
+    :return: ModelLoader instance
+    """
+    loader = cls.__dict__.get(LOADER_ATTR)
+    if loader is None:
+        loader = ModelLoader(cls)
+        setattr(cls, LOADER_ATTR, loader)
+    return loader
+
+
+class TrustedLoader(ModelLoader):
+    """
+    ModelLoader for trusted input: instances are created without calling
+    __init__, so the attrs validators are not run and extra keys are not
+    checked, and the converter of a field is skipped when the value already
+    is of the validated type. Child models are loaded the same way.
+    """
+
+    def __init__(self, cls):
+        super(TrustedLoader, self).__init__(cls)
+        self.fields = tuple(
+            (a.metadata.get('key') or a.name if a.init else None, a.name,
+             a.default, getattr(a.converter, "trusted", a.converter),
+             validated_type(a.validator))
+            for a in fields(cls))
+        self.post_init = getattr(cls, "__attrs_post_init__", None)
+        self.new = instance_factory(cls)
+
+    def load(self, original):
+        """ Create a model instance from a trusted dictionary. """
+        obj = self.new()
+
+        for key_name, name, default, convert, target in self.fields:
+            if key_name in original:
+                value = original[key_name]
+            elif default is NOTHING:
+                raise TypeError("{}() missing required argument: '{}'".format(
+                    self.cls.__name__, key_name))
+            elif isinstance(default, Factory):
+                value = default.factory(obj) if default.takes_self \
+                    else default.factory()
+            else:
+                value = default
+
+            if convert is not None and value.__class__ is not target:
+                value = convert(value)
+
+            object.__setattr__(obj, name, value)
+
+        if self.post_init is not None:
+            self.post_init(obj)
+
+        return obj
+
+    def __call__(self, value):
+        if isinstance(value, dict):
+            return self.load(value)
+
+        return super(TrustedLoader, self).__call__(value)
+
+
+def validated_type(validator):
+    """
+    Return the class an attrs validator checks values against (through
+    optional and composite validators), None if there is none.
+    """
+    cls = getattr(validator, "type", None)
+    if isinstance(cls, tuple) and len(cls) == 1:
+        cls = cls[0]  # e.g. six.string_types
+    if isinstance(cls, type):
+        return cls
+
+    inner = getattr(validator, "validator", None)
+    if inner is not None:
+        return validated_type(inner)
+
+    for inner in getattr(validator, "validators", ()):
+        cls = validated_type(inner)
+        if cls is not None:
+            return cls
+
+
+def instance_factory(cls):
+    """
+    Return a function creating an instance of a model class without calling
+    __init__ (the caller sets the fields). The hash cache of the classes
+    declared with cache_hash=True is cleared, like __init__ does.
+    """
+    if not getattr(cls, CACHE_HASH_ATTR, False):
+        return partial(object.__new__, cls)
+
+    def new():
+        obj = object.__new__(cls)
+        object.__setattr__(obj, HASH_CACHE_FIELD, None)
+        return obj
+
+    return new
+
+
+def allows_none(validator):
+    """ True if the validator accepts None (no or optional validator). """
+    return validator is None or isinstance(validator, _OptionalValidator)
+
+
+def is_trusted(cls):
+    """ True if the model class was declared with trusted=True. """
+    return getattr(cls, "__related_trusted__", False)
+
+
+def trusted_loader(cls):
+    """
+    Return the TrustedLoader of a related model class, cached on the class.
+
+    :param cls: related model class.
+    :return: TrustedLoader instance
+    """
+    loader = cls.__dict__.get(TRUSTED_LOADER_ATTR)
+    if loader is None:
+        loader = TrustedLoader(cls)
+        setattr(cls, TRUSTED_LOADER_ATTR, loader)
+    return loader
+
+
+def loader_for(cls, trusted=False):
+    """
+    Return the loader of a related model class: the TrustedLoader if
+    trusted is True or the class is trusted, the ModelLoader otherwise.
+    """
+    if trusted or is_trusted(cls):
+        return trusted_loader(cls)
+    return model_loader(cls)
+
+
+def value_loader(cls, trusted=False):
+    """
+    Return a callable that coerces a value into *cls* like to_model does.
+
+    :param cls: class type to coerce into (model or not).
+    :param bool trusted: load models from trusted input (see TrustedLoader)
+    """
+    if functions.is_model(cls):
+        return loader_for(cls, trusted)
+    return partial(functions.to_model, cls)
@@ -0,0 +1,271 @@
+"""
+Per model and field profiling of conversions.
+
+``related.profile()`` is a context manager that records, for each model
+class and field, the number of calls, the cumulative time and the number of
+errors of loading (the converter of the field while creating a model with
+to_model, from_json...) and of dumping (to_dict, to_json). The whole model
+is recorded as field "*". Times are cumulative: the time of a child field
+includes the time spent loading or dumping the child model.
+
+Profiling wraps the loader and plan methods while a profile is active, the
+regular code paths are untouched (no overhead) otherwise. Models are still
+created by their own __init__ and dumped by their plan (with its to_dict
+cache). Per field, the converters related creates for the child,
+collection and date/time fields are timed by wrapping the __call__ of
+their classes from the first profiled load of a model class until the last
+profile ends; the other converters and the validators are timed with the
+model ("*"). Models created from trusted input or by calling the class
+directly are not profiled, nor are the fields of lazy models or the
+streaming encoders (to_json with a stream, to_yaml).
+While any profile is active, all threads are profiled.
+"""
+from collections import namedtuple
+from threading import local
+from time import perf_counter
+
+from attr import fields
+
+from . import converters, lazy, plans
+
+LOAD, DUMP = "load", "dump"
+ALL_FIELDS = "*"
+
+FieldStats = namedtuple("FieldStats",
+                        "model field operation calls seconds errors")
+
+# profiles being recorded, innermost last
+_active = []
+
+
+class Profile(object):
+    """
+    Statistics collected by related.profile(), keyed by model class, field
+    name and operation ("load" or "dump").
+
+    :param bool enabled: collect statistics (if False the context manager
+                         does nothing).
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stats = {}
+
+    def __enter__(self):
+        if self.enabled:
+            if not _active:
+                _install()
+            _active.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.enabled:
+            _active.remove(self)
+            if not _active:
+                _uninstall()
+
+    def add(self, cls, field, operation, seconds, error=False):
+        """ Record one call. """
+        key = (cls, field, operation)
+        entry = self.stats.get(key)
+        if entry is None:
+            entry = self.stats[key] = [0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += seconds
+        if error:
+            entry[2] += 1
+
+    def reset(self):
+        """ Forget the statistics collected so far. """
+        self.stats.clear()
+
+    def results(self):
+        """ List of FieldStats sorted by decreasing cumulative time. """
+        results = [FieldStats(model_name(cls), field, operation, calls,
+                              seconds, errors)
+                   for (cls, field, operation), (calls, seconds, errors)
+                   in self.stats.items()]
+        return sorted(results, key=lambda s: (-s.seconds, s.model, s.field,
+                                              s.operation))
+
+    def to_dict(self):
+        """ Statistics as a list of dictionaries (e.g. for metrics). """
+        return [s._asdict() for s in self.results()]
+
+    def report(self, limit=None):
+        """ Text table of the statistics, slowest first. """
+        lines = ["%-40s %-20s %-4s %10s %12s %8s" % (
+            "model", "field", "op", "calls", "seconds", "errors")]
+
+        for s in self.results()[:limit]:
+            lines.append("%-40s %-20s %-4s %10d %12.6f %8d" % (
+                s.model, s.field, s.operation, s.calls, s.seconds,
+                s.errors))
+
+        return "\n".join(lines)
+
+
+def profile(enabled=True):
+    """
+    Context manager profiling the conversions made in its block.
+
+        with related.profile() as stats:
+            related.from_json(text, StoreData)
+        print(stats.report())
+
+    :param bool enabled: set to False to disable profiling.
+    :return: Profile instance
+    """
+    return Profile(enabled)
+
+
+def model_name(cls):
+    return "%s.%s" % (cls.__module__, cls.__qualname__)
+
+
+def _record(cls, field, operation, seconds, error=False):
+    for active in _active:
+        active.add(cls, field, operation, seconds, error)
+
+
+def _timed(cls, field, operation, func, *args):
+    start = perf_counter()
+    try:
+        result = func(*args)
+    except Exception:
+        _record(cls, field, operation, perf_counter() - start, True)
+        raise
+    _record(cls, field, operation, perf_counter() - start)
+    return result
+
+
+# (cls, converter) => field name, see _instrument
+_converter_fields = {}
+_instrumented_classes = set()
+
+# converter class => original __call__
+_converter_calls = {}
+
+# models being loaded by the current thread, innermost last
+_loading = local()
+
+
+def _instrument(cls):
+    """
+    Time the converters that related created for the fields of cls by
+    wrapping the __call__ of their classes (restored when the last profile
+    ends). The constructor itself is left as it is.
+    """
+    if cls in _instrumented_classes:
+        return
+    _instrumented_classes.add(cls)
+
+    for a in fields(cls):
+        converter_cls = a.converter.__class__
+        if converter_cls.__module__ != converters.__name__:
+            continue  # functions and converters of other libraries
+
+        _converter_fields[(cls, a.converter)] = a.name
+        if converter_cls not in _converter_calls:
+            original = converter_cls.__dict__["__call__"]
+            _converter_calls[converter_cls] = original
+            converter_cls.__call__ = _profiled_convert(original)
+
+
+def _restore():
+    for converter_cls, original in _converter_calls.items():
+        converter_cls.__call__ = original
+    _converter_calls.clear()
+    _converter_fields.clear()
+    _instrumented_classes.clear()
+
+
+def _models_loading():
+    models = getattr(_loading, "models", None)
+    if models is None:
+        models = _loading.models = []
+    return models
+
+
+def _profiled_convert(original):
+
+    def __call__(converter, value):
+        models = _models_loading()
+        cls = models[-1] if models else None
+        name = _converter_fields.get((cls, converter))
+        if name is None:
+            return original(converter, value)
+        return _timed(cls, name, LOAD, original, converter, value)
+
+    return __call__
+
+
+def _profiled_load(loader, original):
+    cls = loader.cls
+    _instrument(cls)
+    models = _models_loading()
+    models.append(cls)
+    try:
+        return _timed(cls, ALL_FIELDS, LOAD, _original_load, loader,
+                      original)
+    finally:
+        models.pop()
+
+
+def _profiled_loader_call(loader, value):
+    if isinstance(value, dict):
+        return _profiled_load(loader, value)
+    return _original_loader_call(loader, value)
+
+
+def _profiled_dump(original):
+
+    def encode(plan, obj):
+        return _timed(obj.__class__, ALL_FIELDS, DUMP, original, plan, obj)
+
+    return encode
+
+
+def _profiled_encode_fields(plan, obj):
+    cls = obj.__class__
+    return_dict = plan.dict_factory()
+    values = plan.field_values(obj)
+
+    for (name, _, _), (key_name, formatter, value) in zip(plan.fields,
+                                                          values):
+        value = _timed(cls, name, DUMP, plans.encode_value, value, formatter,
+                       plan)
+
+        if plan.suppress_empty_values and value is None:
+            continue
+
+        return_dict[key_name] = value
+
+    return return_dict
+
+
+_original_load = plans.ModelLoader.__dict__["load"]
+_original_loader_call = plans.ModelLoader.__dict__["__call__"]
+
+_PATCHES = [
+    (plans.ModelLoader, "load", _profiled_load),
+    (plans.ModelLoader, "__call__", _profiled_loader_call),
+    (plans.DictPlan, "encode",
+     _profiled_dump(plans.DictPlan.__dict__["encode"])),
+    (plans.DictPlan, "encode_fields", _profiled_encode_fields),
+    (lazy.LazyDictPlan, "encode_fields", _profiled_encode_fields),
+]
+
+_ORIGINALS = [(owner, name, owner.__dict__[name])
+              for owner, name, _ in _PATCHES]
+
+
+def _install():
+    for owner, name, method in _PATCHES:
+        setattr(owner, name, method)
+
+
+def _uninstall():
+    for owner, name, method in _ORIGINALS:
+        setattr(owner, name, method)
+    _restore()
@@ -0,0 +1,207 @@
+"""
+Structural sharing (hash-consing) of the immutable models of loaded
+documents.
+
+Documents often repeat identical sub-objects (the same service definition,
+the same day template...). With a Sharer, the input of every immutable
+model is looked up in a table before the model is created: identical input
+returns the model created the first time, so the duplicates are neither
+converted nor validated again and the loaded graph holds a single instance.
+
+    sharer = related.Sharer()
+    store = related.from_json(text, StoreData, share=sharer)
+    print(sharer.stats())
+
+Children are loaded first, so a model is keyed by the input of its own
+fields and by the identity of its (already shared) children. Instances of
+mutable models (and of attrs classes not declared with @immutable) are
+never shared, their immutable children are. Shared
+models are used by several parents: the collections of models declared
+with frozen_collections=False must not be modified.
+
+Like an Interner, a Sharer keeps its models alive as long as it is
+referenced and can be used for several loads, share=True uses a new one
+for a single load. Lazy loads are not shared.
+"""
+from collections import namedtuple
+
+from attr._make import fields
+
+from . import functions, plans
+from .converters import ClassConverter
+from .types import TypedMapping, TypedSequence, TypedSet
+
+SharingStats = namedtuple("SharingStats", "models duplicates by_class")
+
+
+class Sharer(object):
+    """
+    Table of the canonical instances of immutable models, keyed by their
+    input.
+    """
+
+    def __init__(self):
+        self.models = {}
+        self.duplicates = {}
+        self.loaders = {}
+
+    def loader(self, cls, trusted=False):
+        """ Return the SharedLoader of a model class. """
+        loader = self.loaders.get((cls, trusted))
+        if loader is None:
+            loader = self.loaders[cls, trusted] = SharedLoader(cls, self,
+                                                               trusted)
+        return loader
+
+    def load(self, cls, original, trusted=False):
+        """
+        Create (or find) the model of a dictionary.
+
+        :param cls: related model class.
+        :param original: dictionary of the input of the model.
+        :param trusted: load with the TrustedLoader (see to_model).
+        :return: cls instance
+        """
+        return self.loader(cls, trusted).load(original)
+
+    def stats(self):
+        """
+        Return SharingStats: number of distinct shared models, number of
+        duplicates collapsed into them and the duplicates per class name.
+        """
+        by_class = dict((cls.__name__, count)
+                        for cls, count in self.duplicates.items())
+        return SharingStats(len(self.models), sum(by_class.values()),
+                            by_class)
+
+    def clear(self):
+        """ Forget the shared models and reset the statistics. """
+        self.models.clear()
+        self.duplicates.clear()
+        self.loaders.clear()
+
+
+class SharedLoader(object):
+    """
+    Loader of a model class creating its child models with the loaders of
+    a Sharer and sharing the instances of the class if it is frozen.
+    """
+
+    def __init__(self, cls, sharer, trusted=False):
+        self.cls = cls
+        self.sharer = sharer
+        self.trusted = trusted
+        self.frozen = getattr(cls, "__related_frozen__", False)
+        self.base = plans.loader_for(cls, trusted)
+        self.children = tuple(
+            (a.metadata.get('key') or a.name, a.converter)
+            for a in fields(cls) if isinstance(a.converter, ClassConverter)
+            and functions.is_model(a.converter.cls))
+
+    def load(self, original):
+        if self.children:
+            original = original.copy()
+            for key_name, converter in self.children:
+                value = original.get(key_name)
+                if value is not None:
+                    original[key_name] = converter.convert(
+                        value, self.sharer.loader(converter.cls,
+                                                  self.trusted))
+
+        if not self.frozen:
+            return self.base.load(original)
+
+        try:
+            # the class of the input dictionary itself does not matter
+            key = (self.cls,) + freeze(original)[1:]
+        except TypeError:
+            return self.base.load(original)  # e.g. unhashable values
+
+        models = self.sharer.models
+        obj = models.get(key)
+
+        if obj is None:
+            obj = models[key] = self.base.load(original)
+        else:
+            duplicates = self.sharer.duplicates
+            duplicates[self.cls] = duplicates.get(self.cls, 0) + 1
+
+        return obj
+
+    def __call__(self, value):
+        if isinstance(value, dict):
+            return self.load(value)
+        return self.base(value)
+
+
+# classes of the values frozen item by item
+SEQUENCE_TYPES = (list, tuple, TypedSequence)
+SET_TYPES = (set, frozenset, TypedSet)
+MAPPING_TYPES = (dict, TypedMapping)
+
+SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+MAPPING, SEQUENCE, SET, MODEL, VALUE = range(5)
+
+# value class => kind of value (see value_kind)
+_kinds = dict((cls, VALUE) for cls in (str, int, bool, type(None)))
+
+
+def value_kind(cls):
+    kind = _kinds.get(cls)
+    if kind is None:
+        if issubclass(cls, MAPPING_TYPES):
+            kind = MAPPING
+        elif issubclass(cls, SEQUENCE_TYPES):
+            kind = SEQUENCE
+        elif issubclass(cls, SET_TYPES):
+            kind = SET
+        elif functions.is_model(cls):
+            kind = MODEL
+        else:
+            kind = VALUE
+        _kinds[cls] = kind
+    return kind
+
+
+def freeze(value):
+    """
+    Return a hashable key of a loaded value: equal keys for equal values of
+    the same classes, models (shared already) by identity. Raise TypeError
+    for unhashable values.
+    """
+    cls = value.__class__
+    kind = _kinds.get(cls)
+    if kind is None:
+        kind = value_kind(cls)
+
+    if kind == VALUE:
+        if cls is float and not value:
+            return cls, repr(value)  # 0.0 == -0.0
+        hash(value)  # TypeError for unhashable values
+        return cls, value
+
+    if kind == MODEL:
+        return cls, id(value)  # kept alive by the model created
+
+    if kind == MAPPING:
+        # fast path: dictionaries of scalars (e.g. the leaves of a document)
+        key_types = tuple(map(type, value))
+        types = tuple(map(type, value.values()))
+        if SCALAR_TYPES.issuperset(key_types) and \
+                SCALAR_TYPES.issuperset(types) and \
+                not (float in types and 0.0 in value.values()):
+            return cls, tuple(value.items()), key_types + types
+
+        return cls, tuple([(freeze(key), freeze(item))
+                           for key, item in value.items()])
+
+    if kind == SEQUENCE:
+        return cls, tuple([freeze(item) for item in value])
+
+    return cls, frozenset([freeze(item) for item in value])
+
+
+def get_sharer(share):
+    """ Return a Sharer for share=True or the Sharer given. """
+    return Sharer() if share is True else share
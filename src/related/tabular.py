@@ -0,0 +1,300 @@
+"""
+Streaming CSV reader and writer of related models.
+
+The columns of a model class are derived from its fields once: the header
+of a column is the output key of its field (``key`` override included) and
+the fields of child models are flattened into dotted paths (e.g.
+``address.city``). Sequence, set and mapping fields, and children of a
+class already being flattened (self references), are written as JSON text.
+
+Each column gets a parser built from the field type, so cells are converted
+once into values the field converters keep as is: int, float, bool and
+Decimal values, dates, datetimes and times with the field formatter. An
+empty cell is a missing value (None, or "" for a required string field).
+
+Rows are read and written one at a time: from_csv is a generator and
+to_csv writes each row to the stream, so memory stays bounded.
+"""
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import partial
+from itertools import chain
+from six import string_types
+import csv
+import io
+import json
+
+from attr._make import fields
+
+from . import dates, functions, plans
+from .converters import ClassConverter
+
+COLUMNS_ATTR = "__related_csv_columns__"
+
+Column = namedtuple("Column", "header path parse")
+
+TRUE_VALUES = frozenset(["true", "1", "yes", "y", "t"])
+FALSE_VALUES = frozenset(["false", "0", "no", "n", "f"])
+
+
+def parse_bool(value):
+    """ Return the bool of a CSV cell such as "True", "false", "1"... """
+    lowered = value.strip().lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError("Invalid boolean value: {!r}".format(value))
+
+
+# validated field type => parser of its cells
+PARSERS = {
+    int: int,
+    float: float,
+    bool: parse_bool,
+    Decimal: Decimal,
+}
+
+# validated field type => date parser taking the field formatter
+DATE_PARSERS = {
+    date: dates.parse_date,
+    datetime: dates.parse_datetime,
+    time: dates.parse_time,
+}
+
+
+def csv_columns(cls):
+    """
+    Return the Columns of a related model class, cached on the class.
+
+    :param cls: related model class.
+    :return: tuple of Column(header, path of output keys, cell parser)
+    """
+    columns = cls.__dict__.get(COLUMNS_ATTR)
+    if columns is None:
+        columns = tuple(compile_columns(cls, (), ()))
+        setattr(cls, COLUMNS_ATTR, columns)
+    return columns
+
+
+def compile_columns(cls, prefix, parents):
+    for a in fields(cls):
+        if not a.init:
+            continue
+
+        path = prefix + (a.metadata.get('key') or a.name,)
+        child = child_class(a.converter)
+
+        if child is not None and child not in parents + (cls,):
+            for column in compile_columns(child, path, parents + (cls,)):
+                yield column
+        else:
+            yield Column(".".join(path), path, cell_parser(a))
+
+
+def child_class(converter):
+    """ Model class of a ChildField converter, None for other fields. """
+    if isinstance(converter, ClassConverter) and converter.child and \
+            functions.is_model(converter.cls):
+        return converter.cls
+
+
+def cell_parser(a):
+    """ Return the function converting a (not empty) cell of a field. """
+    converter = a.converter
+    if isinstance(converter, ClassConverter) and \
+            (not converter.child or child_class(converter)):
+        return json.loads  # collections and self referencing children
+
+    target = plans.validated_type(a.validator)
+
+    if target in DATE_PARSERS:
+        formatter = a.metadata.get('formatter')
+        return partial(DATE_PARSERS[target], formatter=formatter) \
+            if formatter else DATE_PARSERS[target]
+
+    return PARSERS.get(target)
+
+
+def csv_row_loader(cls, header):
+    """
+    Return a function converting one CSV row (list of cells in the order of
+    header) into an instance of cls.
+    """
+    flat, nested = row_entries(cls, header)
+    width = len(header)
+
+    def convert(row):
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+
+        kwargs = {}
+        for index, (name,), parse, required in flat:
+            cell = row[index]
+            if cell:
+                kwargs[name] = parse(cell) if parse else cell
+            elif required:
+                kwargs[name] = ""
+
+        if nested:
+            set_children(kwargs, row, nested)
+
+        return cls(**kwargs)
+
+    return convert
+
+
+def row_entries(cls, header):
+    """
+    Return the (cell index, __init__ argument path, parser, required string)
+    entries of the columns of header as the lists of the fields of cls and
+    of the fields of its children.
+    """
+    by_header = dict((column.header, column) for column in csv_columns(cls))
+
+    if plans.model_loader(cls).strict:
+        extra = set(header) - set(by_header)
+        if extra:
+            raise ValueError("Extra columns (strict mode): {}".format(extra))
+
+    # output key => __init__ argument name
+    arguments = dict((a.metadata.get('key') or a.name, a.name.lstrip("_"))
+                     for a in fields(cls))
+    flat, nested = [], []
+
+    for index, name in enumerate(header):
+        column = by_header.get(name)
+        if column is not None:
+            path = (arguments[column.path[0]],) + column.path[1:]
+            entry = (index, path, column.parse,
+                     required_string(cls, column.path))
+            (nested if len(path) > 1 else flat).append(entry)
+
+    return flat, nested
+
+
+def set_children(kwargs, row, nested):
+    """ Set the dictionaries of the child models of a row. """
+    empty_strings = []
+
+    for index, path, parse, required in nested:
+        cell = row[index]
+        if cell:
+            set_path(kwargs, path, parse(cell) if parse else cell)
+        elif required:
+            empty_strings.append(path)
+
+    # a child with only empty cells is missing (e.g. None), not created
+    for path in empty_strings:
+        parent = get_path(kwargs, path[:-1])
+        if parent is not None:
+            parent[path[-1]] = ""
+
+
+def required_string(cls, path):
+    """ True if the field at the path of keys is a required string. """
+    for key in path:
+        for a in fields(cls):
+            if (a.metadata.get('key') or a.name) == key:
+                break
+        cls = child_class(a.converter)
+
+    return plans.validated_type(a.validator) is str and \
+        not plans.allows_none(a.validator)
+
+
+def get_path(value, path):
+    for key in path:
+        value = value.get(key)
+        if value is None:
+            break
+    return value
+
+
+def set_path(value, path, cell):
+    for key in path[:-1]:
+        value = value.setdefault(key, OrderedDict())
+    value[path[-1]] = cell
+
+
+def from_csv(stream, cls, batch_size=None, on_error=functions.RAISE,
+             errors=None, **fmtparams):
+    """
+    Lazily convert the rows of a CSV string or stream (with a header row)
+    into instances of cls.
+
+    :param stream: CSV string or iterable of lines (e.g. a file opened
+                   with newline="")
+    :param cls: related model class of the rows
+    :param batch_size: yield lists of up to batch_size models if set
+    :param on_error: "raise", "skip" or "collect" invalid rows
+    :param errors: list receiving RecordError(line number, row, error) for
+                   each invalid row when on_error is "collect"
+    :param fmtparams: csv.reader dialect and formatting parameters
+    :return: generator of models (or of lists of models)
+    """
+    functions.check_error_policy(on_error, errors)
+    if isinstance(stream, string_types):
+        stream = io.StringIO(stream)
+
+    reader = csv.reader(stream, **fmtparams)
+    header = next(reader, None)
+    if header is None:
+        return iter(())
+
+    numbered = ((reader.line_num, row) for row in reader if row)
+    models = functions.convert_items(csv_row_loader, (cls, header),
+                                     numbered, on_error, errors, None)
+    return models if batch_size is None else \
+        functions.batches(models, batch_size)
+
+
+def to_csv(iterable, stream=None, cls=None, **fmtparams):
+    """
+    Write models as CSV rows, after a header row of the columns of cls.
+
+    :param iterable: models to write (consumed one at a time)
+    :param stream: writable text stream (e.g. a file opened with
+                   newline="")
+    :param cls: class of the models (default: class of the first model)
+    :param fmtparams: csv.writer dialect and formatting parameters
+    :return: CSV string if stream is None
+    """
+    iterator = iter(iterable)
+    first = next(iterator, None)
+    cls = cls or (first.__class__ if first is not None else None)
+    if cls is None:
+        raise ValueError("cls is required for an empty iterable")
+
+    output = io.StringIO() if stream is None else stream
+    writer = csv.writer(output, **fmtparams)
+    columns = csv_columns(cls)
+    writer.writerow([column.header for column in columns])
+
+    if first is not None:
+        plan = plans.dict_plan(cls, {})
+        paths = [column.path for column in columns]
+        writer.writerows(csv_row(plan.encode(obj), paths)
+                         for obj in chain([first], iterator))
+
+    if stream is None:
+        return output.getvalue()
+
+
+def csv_row(value, paths):
+    """ Return the cells of the to_dict value of a model. """
+    row = []
+
+    for path in paths:
+        cell = value
+        for key in path:
+            cell = cell.get(key) if cell is not None else None
+
+        if cell is None:
+            cell = ""
+        elif isinstance(cell, (dict, list)):
+            cell = json.dumps(cell)
+        row.append(cell)
+
+    return row
@@ -1,19 +1,44 @@
 # -*- coding: utf-8 -*-
+from array import array
 from attr.exceptions import FrozenInstanceError
 from collections import OrderedDict
+import sys
 
 try:
-    from collections.abc import (MutableSequence, MutableMapping, MutableSet)
+    from pickle import PickleBuffer
+except ImportError:  # pragma: no cover (python < 3.8)
+    PickleBuffer = None
+
+try:
+    from collections.abc import (Mapping, MutableSequence, MutableMapping,
+                                 MutableSet)
 except ImportError:
-    from collections import (MutableSequence, MutableMapping, MutableSet)
+    from collections import (Mapping, MutableSequence, MutableMapping,
+                             MutableSet)
 
 
 DEFAULT_DATE_FORMAT = "%Y-%m-%d"
 DEFAULT_DATETIME_FORMAT = "ISO_FORMAT"
 DEFAULT_TIME_FORMAT = "%H:%M:%S"
 
+# float sequences at least this long are pickled as one buffer (protocol 5)
+BUFFER_MIN_LENGTH = 1024
+
 
 class ImmutableDict(dict):
+    """
+    dict that cannot be modified, hashable (its hash is computed once, from
+    its items, so its values must be hashable).
+    """
+
+    def __hash__(self):
+        cached = self.__dict__.get("_hash")
+        if cached is None:
+            cached = self.__dict__["_hash"] = hash(frozenset(self.items()))
+        return cached
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
 
     def __setitem__(self, key, value):
         raise FrozenInstanceError()
@@ -33,6 +58,18 @@ class ImmutableDict(dict):
     def clear(self):
         raise FrozenInstanceError()
 
+    def popitem(self):
+        raise FrozenInstanceError()
+
+    def setdefault(self, key, default=None):
+        raise FrozenInstanceError()
+
+    def update(self, *args, **kwargs):
+        raise FrozenInstanceError()
+
+    def __ior__(self, other):
+        raise FrozenInstanceError()
+
 
 class TypedSequence(MutableSequence):
     """
@@ -42,11 +79,38 @@ class TypedSequence(MutableSequence):
     http://stackoverflow.com/a/3488283
     """
 
-    def __init__(self, cls, args, allow_none=True):
+    __slots__ = ("cls", "allowed_types", "list")
+
+    def __init__(self, cls, args, allow_none=True, trusted=False):
         self.cls = cls
         self.allowed_types = (cls, type(None)) if allow_none else cls
-        self.list = []
-        self.extend(args)
+        if trusted:
+            # producer guarantees the types (e.g. converters via to_model)
+            self.list = list(args)
+        else:
+            self.list = []
+            self.extend(args)
+
+    def __reduce__(self):
+        return self.__class__, (self.cls, self.list,
+                                self.allowed_types != self.cls, True)
+
+    def __reduce_ex__(self, protocol):
+        reduced = self.__reduce__()
+        cls, values, allow_none, _ = reduced[1]
+
+        # pickle protocol 5: the floats as one (out-of-band) buffer
+        if protocol >= 5 and cls is float and PickleBuffer is not None \
+                and len(values) >= BUFFER_MIN_LENGTH:
+            try:
+                buffer = PickleBuffer(array("d", values))
+            except TypeError:  # None values
+                pass
+            else:
+                return _float_sequence, (buffer, allow_none, sys.byteorder,
+                                         reduced[0] is FrozenSequence)
+
+        return reduced
 
     def __str__(self):
         return str(self.list)
@@ -59,7 +123,10 @@ class TypedSequence(MutableSequence):
 
     def __eq__(self, other):
         if isinstance(other, TypedSequence):
-            return self.list == other.list and self.cls == other.cls
+            values = other.list
+            if values.__class__ is not list:
+                values = list(values)  # FrozenSequence
+            return self.list == values and self.cls == other.cls
         else:
             return self.list == other
 
@@ -77,11 +144,80 @@ class TypedSequence(MutableSequence):
         self._check(v)
         self.list.insert(i, v)
 
+    def extend(self, values):
+        values = list(values)
+        self._check_all(values)
+        self.list.extend(values)
+
     def _check(self, v):
         if not isinstance(v, self.allowed_types):
             raise TypeError("Invalid value %s (%s != %s)" %
                             (v, type(v), self.cls))
 
+    def _check_all(self, values):
+        allowed_types = self.allowed_types
+        for v in values:
+            if not isinstance(v, allowed_types):
+                self._check(v)
+
+
+class FrozenSequence(TypedSequence):
+    """
+    TypedSequence that cannot be modified, backed by a tuple. Hashable when
+    its items are (the sequence fields of immutable models).
+    """
+
+    __slots__ = ()
+
+    def __init__(self, cls, args, allow_none=True, trusted=False):
+        self.cls = cls
+        self.allowed_types = (cls, type(None)) if allow_none else cls
+        values = tuple(args)
+        if not trusted:
+            self._check_all(values)
+        self.list = values
+
+    def __copy__(self):
+        return self
+
+    def __str__(self):
+        return str(list(self.list))
+
+    def __repr__(self):
+        return repr(list(self.list))
+
+    def __eq__(self, other):
+        if isinstance(other, TypedSequence):
+            return self.list == tuple(other) and self.cls == other.cls
+        elif isinstance(other, list):
+            return self.list == tuple(other)
+        else:
+            return self.list == other
+
+    def __hash__(self):
+        return hash(self.list)
+
+    def __delitem__(self, i):
+        raise FrozenInstanceError()
+
+    def __setitem__(self, i, v):
+        raise FrozenInstanceError()
+
+    def insert(self, i, v):
+        raise FrozenInstanceError()
+
+    def extend(self, values):
+        raise FrozenInstanceError()
+
+
+def _float_sequence(buffer, allow_none, byteorder, frozen=False):
+    values = array("d")
+    values.frombytes(memoryview(buffer).cast("B"))
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    cls = FrozenSequence if frozen else TypedSequence
+    return cls(float, values.tolist(), allow_none, trusted=True)
+
 
 class TypedMapping(MutableMapping):
     """
@@ -91,12 +227,24 @@ class TypedMapping(MutableMapping):
     http://stackoverflow.com/a/3488283
     """
 
-    def __init__(self, cls, kwargs, key=None, allow_none=True):
+    __slots__ = ("cls", "allowed_types", "key", "dict")
+
+    def __init__(self, cls, kwargs, key=None, allow_none=True,
+                 trusted=False):
         self.cls = cls
         self.allowed_types = (cls, type(None)) if allow_none else cls
         self.key = key
-        self.dict = OrderedDict()
-        self.update(kwargs)
+        if trusted:
+            # producer guarantees the types (e.g. unpickling)
+            self.dict = OrderedDict(kwargs)
+        else:
+            self.dict = OrderedDict()
+            self.update(kwargs)
+
+    def __reduce__(self):
+        # a plain dict (ordered) pickles faster than an OrderedDict
+        return self.__class__, (self.cls, dict(self.dict), self.key,
+                                self.allowed_types != self.cls, True)
 
     def __str__(self):
         return str(self.dict)
@@ -126,6 +274,14 @@ class TypedMapping(MutableMapping):
         self._check(v)
         self.dict[i] = v
 
+    def update(self, *args, **kwargs):
+        if len(args) == 1 and not kwargs and isinstance(args[0], Mapping):
+            items = args[0]
+        else:
+            items = OrderedDict(*args, **kwargs)
+        self._check_all(items.values())
+        self.dict.update(items)
+
     def add(self, v, key=None):
         if key is not None:
             self[key] = v
@@ -140,6 +296,51 @@ class TypedMapping(MutableMapping):
         if not isinstance(v, self.allowed_types):
             raise TypeError("%s is not an instance of %s" % (v, self.cls))
 
+    def _check_all(self, values):
+        allowed_types = self.allowed_types
+        for v in values:
+            if not isinstance(v, allowed_types):
+                self._check(v)
+
+
+class FrozenMapping(TypedMapping):
+    """
+    TypedMapping that cannot be modified, backed by a dict. Hashable when
+    its items are (the mapping fields of immutable models), its hash is
+    computed once.
+    """
+
+    __slots__ = ("_hash",)
+
+    def __init__(self, cls, kwargs, key=None, allow_none=True,
+                 trusted=False):
+        self.cls = cls
+        self.allowed_types = (cls, type(None)) if allow_none else cls
+        self.key = key
+        values = dict(kwargs)
+        if not trusted:
+            self._check_all(values.values())
+        self.dict = values
+        self._hash = None
+
+    def __copy__(self):
+        return self
+
+    def __hash__(self):
+        cached = self._hash
+        if cached is None:
+            cached = self._hash = hash(frozenset(self.dict.items()))
+        return cached
+
+    def __delitem__(self, i):
+        raise FrozenInstanceError()
+
+    def __setitem__(self, i, v):
+        raise FrozenInstanceError()
+
+    def update(self, *args, **kwargs):
+        raise FrozenInstanceError()
+
 
 class TypedSet(MutableSet):
     """
@@ -149,12 +350,21 @@ class TypedSet(MutableSet):
     http://stackoverflow.com/a/3488283
     """
 
-    def __init__(self, cls, args, allow_none=True):
+    __slots__ = ("cls", "allowed_types", "set")
+
+    def __init__(self, cls, args, allow_none=True, trusted=False):
         self.cls = cls
         self.allowed_types = (cls, type(None)) if allow_none else cls
-        self.set = set()
-        for arg in args or []:
-            self.add(arg)
+        if trusted:
+            # producer guarantees the types (e.g. converters via to_model)
+            self.set = set(args or ())
+        else:
+            self.set = set()
+            self.update(args or ())
+
+    def __reduce__(self):
+        return self.__class__, (self.cls, self.set,
+                                self.allowed_types != self.cls, True)
 
     def __str__(self):
         return str(self.set)
@@ -181,6 +391,11 @@ class TypedSet(MutableSet):
         self._check(v)
         self.set.add(v)
 
+    def update(self, values):
+        values = list(values)
+        self._check_all(values)
+        self.set.update(values)
+
     def discard(self, value):
         self.set.discard(value)
 
@@ -188,3 +403,47 @@ class TypedSet(MutableSet):
         if not isinstance(v, self.allowed_types):
             raise TypeError("Invalid value %s (%s != %s)" %
                             (v, type(v), self.cls))
+
+    def _check_all(self, values):
+        allowed_types = self.allowed_types
+        for v in values:
+            if not isinstance(v, allowed_types):
+                self._check(v)
+
+
+class FrozenSet(TypedSet):
+    """
+    TypedSet that cannot be modified, backed by a frozenset. Hashable when
+    its items are (the set fields of immutable models).
+    """
+
+    __slots__ = ()
+
+    def __init__(self, cls, args, allow_none=True, trusted=False):
+        self.cls = cls
+        self.allowed_types = (cls, type(None)) if allow_none else cls
+        values = frozenset(args or ())
+        if not trusted:
+            self._check_all(values)
+        self.set = values
+
+    def __copy__(self):
+        return self
+
+    def __str__(self):
+        return str(set(self.set))
+
+    def __repr__(self):
+        return repr(set(self.set))
+
+    def __hash__(self):
+        return hash(self.set)
+
+    def add(self, v):
+        raise FrozenInstanceError()
+
+    def update(self, values):
+        raise FrozenInstanceError()
+
+    def discard(self, value):
+        raise FrozenInstanceError()
@@ -0,0 +1,26 @@
+import attr
+
+from related import converters
+from .models import Node, node_cls
+
+
+def test_resolved_class_cached():
+    assert converters.resolve_class(node_cls) is Node
+    assert converters._resolved_classes[node_cls] is Node
+    assert converters.resolve_class(Node) is Node
+
+
+def test_invalidate_class_cache():
+    converter = attr.fields(Node).node_child.converter
+    assert converter.cls is Node
+
+    converters.invalidate_class_cache(node_cls)
+    assert node_cls not in converters._resolved_classes
+    assert converter._resolved[0] != converters._generation
+
+    assert converter(dict(name="x")) == Node(name="x")
+    assert converter._resolved[0] == converters._generation
+
+    converters.invalidate_class_cache()
+    assert converters._resolved_classes == {}
+    assert converter.loader(dict(name="y")).name == "y"
@@ -1,12 +1,12 @@
 import related
 
 
-@related.immutable()
+@related.immutable(frozen_collections=False)
 class Child(object):
     name = related.StringField(default="!")
 
 
-@related.immutable()
+@related.immutable(frozen_collections=False)
 class Model(object):
     # non-child fields
     sequence_field = related.SequenceField(str, default=set())
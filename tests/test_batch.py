@@ -0,0 +1,70 @@
+from datetime import date
+
+import pytest
+
+import related
+from ex00_sets_hashes.models import Person
+
+ROWS = [
+    {"first_name": "Grace", "last_name": "Hopper"},
+    {"first_name": "Katherine", "last_name": "Johnson"},
+    {"first_name": "Ada", "nickname": "Countess"},
+    None,
+    "not a person",
+    {"first_name": "Margaret", "last_name": "Hamilton"},
+]
+
+
+def test_to_models():
+    people = related.to_models(Person, ROWS[:2])
+    assert list(people) == [related.to_model(Person, row)
+                            for row in ROWS[:2]]
+
+    with pytest.raises(ValueError):
+        list(related.to_models(Person, ROWS))
+
+
+def test_to_models_errors():
+    errors = []
+    batches = related.to_models(Person, ROWS, batch_size=2,
+                                on_error="collect", errors=errors)
+    assert [[p and p.first_name for p in b] for b in batches] == [
+        ["Grace", "Katherine"], [None, "Margaret"]]
+    assert [e.index for e in errors] == [2, 4]
+    assert errors[1].value == "not a person"
+
+    people = related.to_models(Person, ROWS, on_error="skip", lazy=True)
+    assert [p.last_name for p in people if p] == ["Hopper", "Johnson",
+                                                  "Hamilton"]
+
+    with pytest.raises(ValueError):
+        related.to_models(Person, ROWS, on_error="collect")
+
+
+def test_to_dicts():
+    people = list(related.to_models(Person, ROWS[:2]))
+    items = [people[0], date(2001, 2, 3), None, people[1]]
+    assert list(related.to_dicts(items, formatter="%Y")) == [
+        related.to_dict(people[0]), "2001", None, related.to_dict(people[1])]
+
+    batches = list(related.to_dicts(people * 3, batch_size=4,
+                                    suppress_empty_values=True))
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert batches[0][0] == ROWS[0]
+
+
+def test_to_dicts_errors():
+    errors = []
+
+    @related.immutable
+    class Broken(object):
+        value = related.IntegerField()
+
+    broken = Broken(1)
+    object.__delattr__(broken, "value")
+
+    items = [Person(first_name="Grace", last_name="Hopper"), broken]
+    assert len(list(related.to_dicts(items, on_error="collect",
+                                     errors=errors))) == 1
+    assert errors[0].index == 1
+    assert isinstance(errors[0].error, AttributeError)
@@ -0,0 +1,139 @@
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from os.path import join, dirname
+from uuid import UUID
+import pickle
+
+import attr
+import pytest
+
+import related
+from related.binary import read_int, read_varint, write_int, write_varint
+from ex01_compose_v2.models import Compose
+from ex06_json.models import DayType, StoreData
+from ex08_self_reference.models import Node
+
+JSON_FILE = join(dirname(__file__), "ex06_json", "store-data.json")
+
+NODES = {"name": "root",
+         "node_child": {"name": "child"},
+         "node_list": [{"name": "a"}, None],
+         "node_map": {"c": {"name": "c"}}}
+
+
+@related.mutable
+class Everything(object):
+    number = related.IntegerField()
+    ratio = related.FloatField(required=False)
+    flag = related.BooleanField(required=False)
+    text = related.StringField(required=False)
+    amount = related.DecimalField(required=False)
+    site = related.URLField(required=False)
+    uid = related.UUIDField(required=False)
+    day = related.DateField(required=False)
+    moment = related.DateTimeField(required=False)
+    clock = related.TimeField(required=False)
+    tags = related.SetField(str, required=False)
+    extra = attr.ib(default=None)
+    derived = attr.ib(init=False, default=0)
+    day_type = attr.ib(default=DayType.NORMAL,
+                       validator=attr.validators.instance_of(DayType))
+
+
+@related.mutable
+class Renamed(object):
+    number = related.IntegerField()
+    size = related.FloatField(required=False)
+
+
+def test_varints():
+    for value in [0, 1, 127, 128, 300, 2 ** 64 + 5]:
+        out = bytearray()
+        write_varint(out, value)
+        assert read_varint(out, 0) == (value, len(out))
+
+    for value in [0, -1, 1, -64, 64, -2 ** 70, 2 ** 70]:
+        out = bytearray()
+        write_int(out, value)
+        assert read_int(out, 0) == (value, len(out))
+
+
+def test_round_trip_store():
+    store = related.from_json(open(JSON_FILE), StoreData)
+    data = related.to_bytes(store)
+    assert len(data) < len(related.to_json(store, indent=None)) / 2
+
+    copy = related.from_bytes(data, StoreData)
+    assert copy == store
+    assert copy.days[0].day_type is store.days[0].day_type
+    assert type(copy.days) is related.FrozenSequence
+    assert isinstance(copy.days, related.TypedSequence)
+    assert related.to_json(copy) == related.to_json(store)
+
+
+def test_round_trip_collections():
+    node = related.to_model(Node, NODES)
+    copy = related.from_bytes(related.to_bytes(node), Node)
+    assert copy == node
+    assert copy.node_list[1] is None
+    assert type(copy.node_map) is type(node.node_map)
+    assert isinstance(copy.node_map, related.TypedMapping)
+
+    compose = related.to_model(Compose, {"services": {
+        "web": {"build": ".", "ports": ["5000:5000"]},
+        "redis": {"image": "redis:latest"}}})
+    copy = related.from_bytes(bytearray(related.to_bytes(compose)), Compose)
+    assert copy == compose
+    assert list(copy.services) == ["web", "redis"]
+    assert copy.services["web"].name == "web"
+
+    # lazy models are written like eager ones
+    lazy = related.to_model(Node, NODES, lazy=True)
+    assert related.to_bytes(lazy) == related.to_bytes(node)
+
+
+def test_round_trip_values():
+    obj = Everything(
+        number=-2 ** 80, ratio=float("inf"), flag=False, text=u"été",
+        amount=Decimal("-1.50"), site="https://example.com/a?b=1",
+        uid="8c2c8a36-64f4-4b0d-9a4d-8a2b3d3b6c1e", day=date(1, 1, 1),
+        moment=datetime(2017, 12, 21, 14, 21, 55, 123456,
+                        timezone(timedelta(hours=-5))),
+        clock=time(23, 59, 59, 999999), tags={"a", "b"},
+        extra={"list": [1, 2.5, None, True, "x"], "n": -3},
+        day_type=DayType.HOLIDAY)
+    obj.derived = 42
+
+    copy = related.from_bytes(memoryview(related.to_bytes(obj)), Everything)
+    assert copy == obj
+    assert copy.derived == 42
+    assert copy.uid == UUID("8c2c8a36-64f4-4b0d-9a4d-8a2b3d3b6c1e")
+    assert copy.moment.utcoffset() == timedelta(hours=-5)
+    assert isinstance(copy.tags, related.TypedSet)
+
+    obj = Everything(number=0, clock=time(8, 30),
+                     moment=datetime(2017, 1, 1, tzinfo=timezone.utc))
+    copy = related.from_bytes(related.to_bytes(obj), Everything)
+    assert copy == obj
+    assert copy.moment.tzinfo is timezone.utc
+    assert copy.clock.tzinfo is None and copy.ratio is None
+
+    # decoded models are usable (and picklable) like loaded ones
+    assert pickle.loads(pickle.dumps(copy)) == copy
+
+
+def test_errors():
+    data = related.to_bytes(Renamed(1, 2.0))
+    assert related.from_bytes(data, Renamed) == Renamed(1, 2.0)
+
+    with pytest.raises(ValueError):
+        related.from_bytes(data, Everything)  # other schema
+
+    with pytest.raises(ValueError):
+        related.from_bytes(b"{}", Renamed)
+
+    with pytest.raises(ValueError):
+        related.from_bytes(data + b"\x00", Renamed)
+
+    with pytest.raises(TypeError):
+        related.to_bytes(Everything(number=1, extra=object()))
@@ -0,0 +1,106 @@
+import pickle
+
+from attr.exceptions import FrozenInstanceError
+import pytest
+
+import related
+from related import decorators
+from related.plans import HASH_CACHE_FIELD
+from related.types import ImmutableDict
+
+
+@related.immutable(cache_hash=True)
+class Address(object):
+    street = related.StringField()
+    city = related.StringField()
+
+
+@related.immutable(cache_hash=True)
+class Person(object):
+    name = related.StringField()
+    address = related.ChildField(Address)
+    age = related.IntegerField(required=False)
+
+
+@related.immutable
+class Team(object):
+    members = related.SetField(Person)
+
+
+PERSON = {"name": "Grace", "age": 85,
+          "address": {"street": "1 Main St", "city": "Arlington"}}
+
+
+def cached_hash(obj):
+    return object.__getattribute__(obj, HASH_CACHE_FIELD)
+
+
+def test_hash_cached():
+    person = related.to_model(Person, PERSON)
+    assert cached_hash(person) is None
+    assert cached_hash(person.address) is None
+
+    value = hash(person)
+    assert cached_hash(person) == value
+    assert cached_hash(person.address) == hash(person.address)
+    assert hash(related.to_model(Person, PERSON)) == value
+
+    team = related.to_model(Team, {"members": [PERSON, PERSON]})
+    assert len(team.members) == 1
+    assert person in team.members.set
+
+
+def test_constructed_without_init():
+    person = related.to_model(Person, PERSON)
+    value = hash(person)
+
+    copies = [
+        related.to_model(Person, PERSON, trusted=True),
+        related.to_model(Person, PERSON, lazy=True),
+        related.from_bytes(related.to_bytes(person), Person),
+        pickle.loads(pickle.dumps(person)),
+    ]
+
+    with related.profile():
+        copies.append(related.to_model(Person, PERSON))
+
+    np = pytest.importorskip("numpy")  # noqa F841
+    copies.extend(related.from_columns(Address, related.to_columns(
+        [person.address])))
+
+    for copy in copies:
+        assert cached_hash(copy) is None
+        assert hash(copy) in (value, hash(person.address))
+        assert copy in (person, person.address)
+
+
+def test_immutable_dict_hash():
+    first = ImmutableDict(a=1, b=(2, 3))
+    second = ImmutableDict([("b", (2, 3)), ("a", 1)])
+
+    assert hash(first) == hash(second)
+    assert {first: "x"}[second] == "x"
+    assert pickle.loads(pickle.dumps(first)) == first
+
+    for method, args in [("update", ({"a": 2},)), ("setdefault", ("c",)),
+                         ("popitem", ()), ("__ior__", ({"a": 2},))]:
+        with pytest.raises(FrozenInstanceError):
+            getattr(first, method)(*args)
+    assert first == {"a": 1, "b": (2, 3)}
+
+    with pytest.raises(TypeError):
+        hash(ImmutableDict(a=[1]))
+
+
+def test_attrs_hash_slot(monkeypatch):
+    assert HASH_CACHE_FIELD in Person.__slots__, \
+        "attrs renamed the cache_hash slot: update plans.HASH_CACHE_FIELD"
+    assert Person.__related_frozen__ and not Team.__related_cache_hash__
+
+    monkeypatch.setattr(decorators, "HASH_CACHE_FIELD", "_renamed")
+    with pytest.raises(TypeError) as error:
+        @related.immutable(cache_hash=True)
+        class Point(object):
+            x = related.IntegerField()
+
+    assert "_renamed" in str(error.value)
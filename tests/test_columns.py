@@ -0,0 +1,197 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import attr
+import pytest
+
+import related
+from ex06_json.models import DayData, DayType
+
+np = pytest.importorskip("numpy")
+
+
+@related.immutable
+class Reading(object):
+    id = related.IntegerField(key="reading_id")
+    value = related.FloatField(required=False)
+    valid = related.BooleanField(required=False)
+    taken_on = related.DateTimeField(required=False)
+    label = related.StringField(required=False)
+    amount = related.DecimalField(required=False)
+    tags = related.SequenceField(str, required=False)
+
+
+def make_days(count):
+    return [related.to_model(DayData, dict(
+        date=(date(2017, 1, 1) + timedelta(days=i)).isoformat(),
+        logged_on="10:00", open_at="08:00:00", closed_on="18:00:00",
+        customers=i, day_type="Holiday" if i % 2 else "Normal",
+        sales=None if i % 3 == 0 else i * 1.5)) for i in range(count)]
+
+
+def test_day_data():
+    days = make_days(6)
+    columns = related.to_columns(days, DayData)
+
+    assert list(columns) == ["date", "logged_on", "open_at", "closed_on",
+                             "customers", "day_type", "sales"]
+
+    assert columns["customers"].dtype == np.int64
+    assert columns["customers"].tolist() == list(range(6))
+    assert columns["customers"].mask is np.ma.nomask
+
+    assert columns["date"].dtype == np.dtype("datetime64[D]")
+    assert columns["date"][1] == np.datetime64("2017-01-02")
+
+    sales = columns["sales"]
+    assert sales.dtype == np.float64
+    assert sales.mask.tolist() == [True, False, False, True, False, False]
+    assert sales.sum() == 1.5 * (1 + 2 + 4 + 5)
+
+    assert columns["day_type"].dtype == object
+    assert columns["day_type"][1] is DayType.HOLIDAY
+
+    assert columns["open_at"][0] == days[0].open_at
+
+
+def test_missing_values_and_keys():
+    readings = [
+        Reading(id=1, value=1.5, valid=True, label="a",
+                taken_on=datetime(2017, 1, 1, 12, tzinfo=timezone(
+                    timedelta(hours=2))),
+                amount=Decimal("1.10"), tags=["x"]),
+        Reading(id=2),
+    ]
+    columns = related.to_columns(iter(readings))
+
+    assert list(columns)[0] == "reading_id"
+    assert columns["reading_id"].tolist() == [1, 2]
+
+    assert columns["value"].tolist() == [1.5, None]
+    assert columns["valid"].dtype == bool
+    assert columns["valid"].mask.tolist() == [False, True]
+
+    taken_on = columns["taken_on"]
+    assert taken_on.dtype == np.dtype("datetime64[us]")
+    assert taken_on[0] == np.datetime64("2017-01-01T10:00:00")
+    assert taken_on.mask.tolist() == [False, True]
+
+    assert columns["label"].tolist() == ["a", None]
+    assert columns["amount"][0] == Decimal("1.10")
+    assert list(columns["tags"][0]) == ["x"]
+    assert list(columns["tags"][1]) == []
+
+
+def test_empty_and_single_column():
+    columns = related.to_columns([], DayData)
+    assert all(len(column) == 0 for column in columns.values())
+    assert columns["customers"].dtype == np.int64
+
+    with pytest.raises(ValueError):
+        related.to_columns([])
+
+    @related.mutable
+    class Single(object):
+        name = related.StringField()
+
+    columns = related.to_columns([Single("a"), Single("b")])
+    assert columns["name"].tolist() == ["a", "b"]
+
+
+def test_from_columns_round_trip():
+    days = make_days(6)
+    columns = related.to_columns(days)
+
+    assert related.from_columns(DayData, columns) == days
+
+    lazy = related.from_columns(DayData, columns, lazy=True)
+    assert not isinstance(lazy, list)
+    assert list(lazy) == days
+
+    readings = [Reading(id=1, value=1.5, valid=True, label="a",
+                        taken_on=datetime(2017, 1, 1, 12),
+                        amount=Decimal("1.10"), tags=["x"]),
+                Reading(id=2)]
+    columns = related.to_columns(readings)
+    assert related.from_columns(Reading, columns) == readings
+
+
+def test_from_columns_conversions():
+    columns = dict(reading_id=np.array([1.9, -2.5, 3.0]),
+                   value=[1, None, 3],
+                   valid=np.ma.MaskedArray([True, False, True],
+                                           mask=[False, True, False]),
+                   taken_on=np.array(["2017-01-01T10:00", "NaT",
+                                      "2017-01-02"],
+                                     dtype="datetime64[ns]"),
+                   label=np.array(["a", "b", "c"]),
+                   amount=["1.5", 2, 3.25])
+
+    readings = related.from_columns(Reading, columns)
+
+    assert [r.id for r in readings] == [1, -2, 3]
+    assert readings[0].id.__class__ is int
+    assert [r.value for r in readings] == [1.0, None, 3.0]
+    assert [r.valid for r in readings] == [True, None, True]
+    assert readings[0].taken_on == datetime(2017, 1, 1, 10)
+    assert readings[1].taken_on is None
+    assert readings[2].label == "c"
+    assert readings[0].amount == Decimal("1.5")
+    assert readings[2].tags == []
+
+    big = related.from_columns(Reading, dict(reading_id=[2.0 ** 70],
+                                             amount=[1]))
+    assert big[0].id == 2 ** 70
+
+
+def test_from_columns_errors():
+    with pytest.raises(TypeError) as info:
+        related.from_columns(Reading, dict(
+            reading_id=np.ma.MaskedArray([1, 2], mask=[False, True]),
+            amount=[1, 2]))
+    assert "row 1" in str(info.value)
+
+    with pytest.raises(ValueError):
+        related.from_columns(Reading, dict(reading_id=[1.0, np.nan],
+                                           amount=[1, 2]))
+
+    with pytest.raises(TypeError):
+        related.from_columns(Reading, dict(valid=[True]))
+
+    with pytest.raises(ValueError):
+        related.from_columns(Reading, dict(reading_id=[1, 2], amount=[1]))
+
+    # not converted as a whole: the validators still run
+    with pytest.raises(TypeError):
+        related.from_columns(Reading, dict(reading_id=[1], valid=[1],
+                                           amount=[1]))
+
+    assert related.from_columns(Reading, dict(reading_id=[],
+                                              amount=[])) == []
+
+
+def test_from_columns_defaults():
+    @related.mutable(strict=True)
+    class Point(object):
+        x = related.IntegerField()
+        label = related.RegexField("^[a-z]+$", required=False)
+        tags = related.SequenceField(str, required=False)
+        items = attr.ib(default=attr.Factory(list))
+        count = attr.ib(default=attr.Factory(lambda self: self.x * 2,
+                                             takes_self=True), converter=int)
+        total = attr.ib(init=False, default=0)
+
+        def __attrs_post_init__(self):
+            self.total = self.x + self.count
+
+    points = related.from_columns(Point, dict(x=np.arange(3),
+                                              label=["a", None, "c"]))
+    assert [p.total for p in points] == [0, 3, 6]
+    assert points[0].tags is not points[1].tags
+    assert points[0].items is not points[1].items
+
+    with pytest.raises(TypeError):
+        related.from_columns(Point, dict(x=[1], label=["A"]))
+
+    with pytest.raises(ValueError):
+        related.from_columns(Point, dict(x=[1], y=[2]))
@@ -0,0 +1,126 @@
+from datetime import date, time
+from decimal import Decimal
+import io
+
+import attr
+import pytest
+
+import related
+from related.tabular import csv_columns, parse_bool
+from ex06_json.models import DayData, DayType
+from ex08_self_reference.models import Node
+
+
+@related.immutable
+class Address(object):
+    street = related.StringField()
+    city = related.StringField(required=False)
+
+
+@related.immutable
+class Customer(object):
+    name = related.StringField(key="full_name")
+    since = related.DateField("%m/%d/%Y")
+    active = related.BooleanField(required=False)
+    balance = related.DecimalField(required=False)
+    address = related.ChildField(Address, required=False)
+    tags = related.SequenceField(str, required=False)
+
+
+@related.mutable(strict=True)
+class Point(object):
+    x = related.IntegerField()
+    y = related.FloatField(required=False)
+    z = attr.ib(init=False, default=0)
+
+
+CUSTOMERS = [
+    Customer(name="Ann", since=date(2017, 12, 18), active=True,
+             balance=Decimal("10.50"), address=Address("1 Main St", "NYC"),
+             tags=["a", "b"]),
+    Customer(name="", since=date(2018, 1, 2)),
+]
+
+
+def test_columns():
+    headers = [column.header for column in csv_columns(Customer)]
+    assert headers == ["full_name", "since", "active", "balance",
+                       "address.street", "address.city", "tags"]
+
+    # self references are not flattened
+    headers = [column.header for column in csv_columns(Node)]
+    assert headers == ["name", "node_child", "node_list", "node_map"]
+
+
+def test_round_trip():
+    text = related.to_csv(CUSTOMERS)
+    lines = text.splitlines()
+    assert lines[0] == "full_name,since,active,balance,address.street," \
+                       "address.city,tags"
+    assert lines[1] == 'Ann,12/18/2017,True,10.50,1 Main St,NYC,' \
+                       '"[""a"", ""b""]"'
+    assert lines[2] == ",01/02/2018,,,,,[]"
+
+    customers = list(related.from_csv(text, Customer))
+    assert customers == CUSTOMERS
+
+    # short rows, empty required string of an existing child
+    text = "full_name,since,address.street,address.city\n" \
+           "Bob,01/02/2018,,NYC\nJoe,01/03/2018\n"
+    customer, short = related.from_csv(text, Customer)
+    assert short.address is None
+    assert customer.address == Address("", "NYC")
+    assert customers[0].balance == Decimal("10.50")
+    assert customers[1].name == ""
+    assert customers[1].address is None
+
+
+def test_flat_models_and_streams():
+    day = related.to_model(DayData, dict(
+        date="2017-12-18", logged_on="10:00", open_at="08:00:00",
+        closed_on="18:00:00", customers="12", day_type="Holiday"))
+
+    stream = io.StringIO()
+    assert related.to_csv(iter([day, day]), stream) is None
+    stream.seek(0)
+
+    days = list(related.from_csv(stream, DayData, batch_size=1))
+    assert days == [[day], [day]]
+    assert days[0][0].logged_on == time(10, 0)
+    assert days[0][0].day_type == DayType.HOLIDAY
+
+    node = related.to_model(Node, {"name": "a", "node_child": {"name": "b"},
+                                   "node_list": [{"name": "c"}]})
+    assert list(related.from_csv(related.to_csv([node]), Node)) == [node]
+
+    assert related.to_csv([], cls=Point) == "x,y\r\n"
+    assert list(related.from_csv("", Point)) == []
+    with pytest.raises(ValueError):
+        related.to_csv([])
+
+
+def test_errors():
+    text = "x,y\n1,2.5\nbad,1\n\n3,\n"
+    with pytest.raises(ValueError):
+        list(related.from_csv(text, Point))
+
+    errors = []
+    points = list(related.from_csv(text, Point, on_error="collect",
+                                   errors=errors))
+    assert [(p.x, p.y) for p in points] == [(1, 2.5), (3, None)]
+    assert [error.index for error in errors] == [3]
+
+    with pytest.raises(ValueError):
+        list(related.from_csv("x,z\n1,2\n", Point))
+
+    with pytest.raises(ValueError):
+        parse_bool("maybe")
+    assert parse_bool(" yes ") is True
+    assert parse_bool("0") is False
+
+
+def test_dialect():
+    text = related.to_csv([Point(1, 2.0)], delimiter=";")
+    assert text == "x;y\r\n1;2.0\r\n"
+    points = list(related.from_csv(text, Point, delimiter=";"))
+    assert points == [Point(1, 2.0)]
@@ -0,0 +1,102 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from dateutil import parser
+
+import related
+from related import dates
+
+
+@related.immutable
+class Event(object):
+    day = related.DateField()
+    local_day = related.DateField("%d/%m/%Y", required=False)
+    stamp = related.DateTimeField(required=False)
+    local_stamp = related.DateTimeField("%m/%d/%Y %H:%M", required=False)
+    at = related.TimeField(required=False)
+    short_at = related.TimeField("%H:%M", required=False)
+
+
+def test_parse_date():
+    assert dates.parse_date("2017-12-18") == date(2017, 12, 18)
+    assert dates.parse_date("2017-1-8") == date(2017, 1, 8)
+    assert dates.parse_date("18/12/2017", "%d/%m/%Y") == date(2017, 12, 18)
+
+    with pytest.raises(ValueError):
+        dates.parse_date("2017-02-30")
+
+
+@pytest.mark.parametrize("value", [
+    "2017-12-18T08:00:00", "2017-12-18", "2017-12-18T08:00:00.123456",
+    "2017-12-18T08:00:00+05:00", "2017-12-18 08:00", "Dec 18 2017 8am",
+])
+def test_parse_datetime_same_as_dateutil(value):
+    assert dates.parse_datetime(value) == parser.parse(value)
+
+
+def test_parse_datetime_formatter():
+    assert dates.parse_datetime("03/02/2001 04:05", "%d/%m/%Y %H:%M") == \
+        datetime(2001, 2, 3, 4, 5)
+
+    # strings not matching the formatter are still parsed by dateutil
+    assert dates.parse_datetime("2001-02-03T04:05:06", "%d/%m/%Y %H:%M") == \
+        datetime(2001, 2, 3, 4, 5, 6)
+
+
+def test_parse_time():
+    assert dates.parse_time("08:00:00") == time(8)
+    assert dates.parse_time("8:00:00") == time(8)
+    assert dates.parse_time("08:30", "%H:%M") == time(8, 30)
+
+    with pytest.raises(ValueError):
+        dates.parse_time("25:00:00")
+
+
+def test_format():
+    assert dates.format_date(date(2001, 2, 3)) == "2001-02-03"
+    assert dates.format_date(date(2001, 2, 3), "%d/%m/%Y") == "03/02/2001"
+    assert dates.format_datetime(datetime(2001, 2, 3, 4)) == \
+        "2001-02-03T04:00:00"
+    assert dates.format_datetime(datetime(2001, 2, 3, 4), "%Y %H") == \
+        "2001 04"
+    assert dates.format_time(time(4, 5)) == "04:05:00"
+    assert dates.format_time(time(4, 5), "%H:%M") == "04:05"
+
+
+def test_format_aware_values():
+    utc = datetime(2001, 2, 3, 4, tzinfo=timezone.utc)
+    plus_one = utc.astimezone(timezone(timedelta(hours=1)))
+    assert utc == plus_one
+    assert dates.format_datetime(utc) == "2001-02-03T04:00:00+00:00"
+    assert dates.format_datetime(plus_one) == "2001-02-03T05:00:00+01:00"
+
+    at = time(4, tzinfo=timezone.utc)
+    assert dates.format_time(at, "%H:%M %Z") == "04:00 UTC"
+
+
+def test_caches():
+    dates.clear_caches()
+    for _ in range(3):
+        dates.parse_date("2017-12-18")
+        dates.format_date(date(2017, 12, 18))
+
+    info = dates.cache_info()
+    assert info["parse_date"].hits == 2
+    assert info["format_date"].misses == 1
+    assert info["parse_time"].currsize == 0
+
+    dates.clear_caches()
+    assert dates.cache_info()["parse_date"].currsize == 0
+
+
+def test_fields_round_trip():
+    data = dict(day="2017-12-18", local_day="18/12/2017",
+                stamp="2017-12-18T08:00:00", local_stamp="12/18/2017 08:00",
+                at="08:00:00", short_at="08:00")
+    event = related.to_model(Event, data)
+
+    assert event.local_day == date(2017, 12, 18)
+    assert event.local_stamp == datetime(2017, 12, 18, 8)
+    assert event.short_at == time(8)
+    assert related.to_dict(event) == data
+    assert related.from_json(related.to_json(event), Event) == event
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+import gc
+
+import related
+from related import plans
+
+
+@related.immutable(cache_dict=True)
+class Port(object):
+    number = related.IntegerField()
+    _note = related.StringField(required=False)
+
+
+@related.immutable(cache_dict=True)
+class Server(object):
+    name = related.StringField()
+    port = related.ChildField(Port)
+    aliases = related.SequenceField(str, required=False)
+
+
+@related.immutable
+class Plain(object):
+    port = related.ChildField(Port)
+
+
+@related.immutable
+class Registry(object):
+    servers = related.MappingField(Server, "name")
+
+
+def cached(obj, **kwargs):
+    """ Dictionary kept for obj (to_dict returns shallow copies of it). """
+    return plans.dict_plan(obj.__class__, kwargs).encode(obj)
+
+
+def test_same_dict_per_options():
+    server = Server("web", Port(80))
+
+    first = related.to_dict(server)
+    assert first == {"name": "web", "port": {"number": 80, "_note": None},
+                     "aliases": []}
+    assert cached(server) is cached(server) == first
+    assert related.to_json(server) == related.to_json(Server("web", Port(80)))
+
+    # equal instances and other options are cached apart
+    other = Server("web", Port(80))
+    assert cached(other) is not cached(server)
+    hidden = related.to_dict(server, suppress_private_attr=True)
+    assert hidden == {"name": "web", "port": {"number": 80}, "aliases": []}
+    assert cached(server, suppress_private_attr=True) is \
+        cached(server, suppress_private_attr=True) == hidden
+
+    plain = related.to_dict(server, dict_factory=dict)
+    assert type(plain) is dict and type(plain["port"]) is dict
+    assert cached(server, dict_factory=dict) is \
+        cached(server, dict_factory=dict) == plain
+
+
+def test_children_reused():
+    port = Port(443)
+    port_dict = cached(port)
+
+    assert related.to_dict(Server("a", port))["port"] is port_dict
+    assert related.to_dict(Plain(port))["port"] is port_dict
+
+    # classes without cache_dict build new dictionaries
+    plain = Plain(port)
+    assert related.to_dict(plain) is not related.to_dict(plain)
+
+
+def test_collected_instances_forgotten():
+    cache = plans.dict_plan(Port, {}).cache
+
+    ports = [Port(i) for i in range(10)]
+    dicts = [related.to_dict(port) for port in ports]
+    assert len(cache) >= 10
+
+    ids = [id(port) for port in ports]
+    del ports
+    gc.collect()
+    assert not set(ids) & set(cache)
+
+    # the ids of collected instances are reused safely
+    assert [related.to_dict(Port(i)) for i in range(10)] == dicts
+    assert related.to_dict(Port(1, "x")) == OrderedDict(
+        [("number", 1), ("_note", "x")])
+
+
+def test_mapping_key_values_suppressed():
+    server = Server("web", Port(80))
+    registry = Registry({"web": server})
+    expected = {"servers": {"web": {"port": {"number": 80, "_note": None},
+                                    "aliases": []}}}
+
+    for _ in range(2):
+        assert related.to_dict(registry,
+                               suppress_map_key_values=True) == expected
+        assert related.from_json(related.to_json(
+            registry, suppress_map_key_values=True)) == expected
+        assert related.to_dict(registry.servers,
+                               suppress_map_key_values=True) == \
+            expected["servers"]
+
+    # the cached dictionary of the child is left as it is
+    assert related.to_dict(server)["name"] == "web"
+
+
+def test_copies_returned():
+    server = Server("web", Port(80), ["www"])
+    first = related.to_dict(server)
+    assert related.to_dict(server) is not first
+
+    first.pop("name")
+    first["aliases"] = []
+    assert related.to_dict(server)["name"] == "web"
+    assert related.to_dict(server)["aliases"] == ["www"]
+    assert '"name": "web"' in related.to_json(server)
+
+    # the dictionaries of the children are shared
+    assert related.to_dict(server)["port"] is cached(server.port)
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from datetime import date, datetime
+from io import StringIO
+import json
+
+import pytest
+
+import related
+from related.encoders import ModelJSONEncoder
+
+
+@related.immutable
+class Leaf(object):
+    name = related.StringField()
+    when = related.DateField("%d/%m/%Y", required=False)
+    stamp = related.DateTimeField(required=False)
+
+
+@related.mutable
+class Tree(object):
+    name = related.StringField()
+    leaves = related.SequenceField(Leaf, required=False)
+    index = related.MappingField(Leaf, "name", required=False)
+    tags = related.SetField(str, required=False)
+    extra = related.ChildField(object, required=False)
+    child = related.ChildField("test_encoders.Tree", required=False)
+
+
+def make_tree():
+    leaves = [Leaf(name="a", when=date(2001, 2, 3)),
+              Leaf(name="b", stamp=datetime(2001, 2, 3, 4, 5, 6))]
+    return Tree(name="root", leaves=leaves, index={"a": leaves[0]},
+                tags={"x"}, extra=dict(nested=[date(2002, 1, 1)], empty=None),
+                child=Tree(name="kid"))
+
+
+OPTIONS = [
+    dict(),
+    dict(suppress_empty_values=True),
+    dict(suppress_map_key_values=True),
+    dict(suppress_empty_values=True, suppress_map_key_values=True),
+    dict(suppress_private_attr=True, indent=None, sort_keys=False),
+    dict(indent=2, sort_keys=False),
+]
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_same_as_to_dict(options):
+    options = dict(options)
+    indent = options.pop("indent", 4)
+    sort_keys = options.pop("sort_keys", True)
+
+    for obj in (make_tree(), [make_tree(), None], make_tree().leaves):
+        expected = json.dumps(related.to_dict(obj, **options), indent=indent,
+                              sort_keys=sort_keys)
+        assert related.to_json(obj, indent=indent, sort_keys=sort_keys,
+                               **options) == expected
+
+        stream = StringIO()
+        related.to_json(obj, indent=indent, sort_keys=sort_keys,
+                        stream=stream, **options)
+        assert stream.getvalue() == expected
+
+
+def test_empty_collections():
+    tree = Tree(name="bare")
+    stream = StringIO()
+    related.to_json(tree, stream=stream)
+    assert json.loads(stream.getvalue()) == related.to_dict(tree)
+
+    stream = StringIO()
+    related.to_json(tree, stream=stream, suppress_empty_values=True)
+    assert "leaves" not in stream.getvalue()
+
+
+def test_top_level_formatter():
+    assert related.to_json(date(2001, 2, 3), formatter="%Y") == '"2001"'
+
+
+def test_stream():
+    stream = StringIO()
+    tree = make_tree()
+    assert related.to_json(tree, stream=stream) is None
+    assert stream.getvalue() == related.to_json(tree)
+
+    stream = StringIO()
+    ModelJSONEncoder(indent=None).dump(tree, stream, chunk_size=10)
+    assert json.loads(stream.getvalue())["name"] == "root"
+
+
+def test_mapping_of_values():
+    mapping = related.TypedMapping(dict, {"a": OrderedDict(key="a", v=1)},
+                                   key="key")
+    stream = StringIO()
+    related.to_json(mapping, stream=stream, suppress_map_key_values=True)
+    assert json.loads(stream.getvalue()) == {"a": {"v": 1}}
+
+
+def test_unknown_type():
+    with pytest.raises(TypeError):
+        related.to_json(dict(value=object()))
+
+
+@related.immutable
+class Named(object):
+    name = related.StringField(key="Name")
+    size = related.IntegerField(required=False)
+
+
+@related.mutable
+class Box(object):
+    by_name = related.MappingField(Named, "name")
+
+
+def test_mapping_key_field_renamed():
+    box = Box(by_name={"a": Named("a", 1), "b": Named("b")})
+    options = dict(suppress_map_key_values=True)
+
+    expected = {"by_name": {"a": {"size": 1}, "b": {"size": None}}}
+    assert related.to_dict(box, **options) == expected
+    assert json.loads(related.to_json(box, **options)) == expected
+
+    stream = StringIO()
+    related.to_json(box, stream=stream, **options)
+    assert stream.getvalue() == related.to_json(box, **options)
+    assert related.from_yaml(related.to_yaml(box, **options)) == expected
+
+    to_dict = related.to_dict.dispatch(related.TypedMapping)
+    assert to_dict(box.by_name, formatter=None, **options) == \
+        expected["by_name"]
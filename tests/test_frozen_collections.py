@@ -0,0 +1,228 @@
+from copy import copy
+from functools import lru_cache
+import pickle
+
+import attr
+from attr.exceptions import FrozenInstanceError
+import pytest
+
+import related
+from related import FrozenMapping, FrozenSequence, FrozenSet
+from related.lazy import (FrozenLazyTypedSequence, LazyTypedSequence,
+                          materialize)
+
+
+@related.immutable
+class Tag(object):
+    name = related.StringField()
+
+
+@related.immutable
+class Post(object):
+    title = related.StringField()
+    tags = related.SequenceField(Tag)
+    labels = related.SetField(str, required=False)
+    by_name = related.MappingField(Tag, "name", required=False)
+
+
+@related.immutable
+class Blog(object):
+    posts = related.SetField(Post)
+
+
+@related.immutable(frozen_collections=False)
+class OpenPost(object):
+    tags = related.SequenceField(Tag)
+
+
+@related.mutable
+class Draft(object):
+    by_name = related.MappingField(Tag, "name")
+
+
+POST = {"title": "a", "tags": [{"name": "x"}, {"name": "y"}],
+        "labels": ["l"], "by_name": {"x": {}}}
+
+
+def test_frozen_fields():
+    post = related.to_model(Post, POST)
+    assert type(post.tags) is FrozenSequence
+    assert type(post.labels) is FrozenSet
+    assert type(post.by_name) is FrozenMapping
+
+    assert post.tags == [Tag("x"), Tag("y")]
+    assert [Tag("x"), Tag("y")] == post.tags
+    assert post.tags == related.TypedSequence(Tag, [Tag("x"), Tag("y")])
+    assert related.TypedSequence(Tag, [Tag("x"), Tag("y")]) == post.tags
+    assert post.labels == {"l"}
+    assert post.by_name == {"x": Tag("x")}
+    assert repr(post.tags) == repr([Tag("x"), Tag("y")])
+    assert str(post.labels) == str({"l"})
+    assert repr(post.labels) == repr({"l"})
+
+    # hashable: in sets and as cache keys
+    assert hash(post) == hash(related.to_model(Post, POST))
+    blog = related.to_model(Blog, {"posts": [POST, POST]})
+    assert len(blog.posts) == 1 and post in blog.posts
+
+    calls = []
+
+    @lru_cache()
+    def title(post):
+        calls.append(post)
+        return post.title
+
+    assert title(post) == title(related.to_model(Post, POST)) == "a"
+    assert len(calls) == 1
+
+    assert related.to_dict(post) == {
+        "title": "a", "tags": [{"name": "x"}, {"name": "y"}],
+        "labels": ["l"], "by_name": {"x": {"name": "x"}}}
+    assert related.from_json(related.to_json(post), Post) == post
+    assert related.from_yaml(related.to_yaml(post), Post) == post
+
+
+def test_not_modified():
+    post = related.to_model(Post, POST)
+
+    for method, args in [(post.tags.append, (Tag("z"),)),
+                         (post.tags.extend, ([Tag("z")],)),
+                         (post.tags.__setitem__, (0, Tag("z"))),
+                         (post.tags.__delitem__, (0,)),
+                         (post.tags.pop, ()),
+                         (post.labels.add, ("z",)),
+                         (post.labels.update, (["z"],)),
+                         (post.labels.discard, ("l",)),
+                         (post.labels.pop, ()),
+                         (post.by_name.add, (Tag("z"),)),
+                         (post.by_name.update, ({"z": Tag("z")},)),
+                         (post.by_name.__setitem__, ("z", Tag("z"))),
+                         (post.by_name.pop, ("x",))]:
+        with pytest.raises(FrozenInstanceError):
+            method(*args)
+
+    with pytest.raises(FrozenInstanceError):
+        post.tags += [Tag("z")]
+
+    assert post == related.to_model(Post, POST)
+
+    with pytest.raises(TypeError):
+        FrozenSequence(int, [1, "2"])
+    with pytest.raises(TypeError):
+        FrozenSet(int, [1, "2"])
+    with pytest.raises(TypeError):
+        FrozenMapping(int, {"a": "1"})
+
+
+def test_shared_as_is():
+    post = related.to_model(Post, POST)
+    other = attr.evolve(post, title="b")
+    assert other.tags is post.tags
+    assert other.labels is post.labels
+    assert other.by_name is post.by_name
+    assert copy(post.tags) is post.tags
+    assert copy(post.labels) is post.labels
+    assert copy(post.by_name) is post.by_name
+
+    # copied into mutable collections, and the other way around
+    open_post = OpenPost(tags=post.tags)
+    assert type(open_post.tags) is related.TypedSequence
+    open_post.tags.append(Tag("z"))
+    assert len(post.tags) == 2
+
+    draft = Draft(by_name=post.by_name)
+    assert type(draft.by_name) is related.TypedMapping
+    draft.by_name.add(Tag("z"))
+    assert type(Post("c", [], by_name=draft.by_name).by_name) is FrozenMapping
+
+
+def test_pickle_and_lazy():
+    post = related.to_model(Post, POST)
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        copied = pickle.loads(pickle.dumps(post, protocol))
+        assert copied == post
+        assert type(copied.tags) is FrozenSequence
+        assert type(copied.labels) is FrozenSet
+        assert type(copied.by_name) is FrozenMapping
+        assert copied.by_name.key == "name"
+
+    # lazy sequences until materialized
+    lazy = related.to_model(Post, POST, lazy=True)
+    assert lazy == post
+    assert type(materialize(lazy).tags) is FrozenSequence
+
+    assert type(related.to_model(Post, POST, trusted=True).tags) is \
+        FrozenSequence
+    assert type(related.from_bytes(related.to_bytes(post), Post).labels) \
+        is FrozenSet
+
+
+@related.mutable
+class Base(object):
+    items = related.SequenceField(str)
+    by_name = related.MappingField(Tag, "name", required=False)
+
+
+@related.immutable
+class FrozenChild(Base):
+    labels = related.SetField(str, required=False)
+
+
+def test_mutable_base_not_frozen():
+    base = Base(items=["a"], by_name={"x": {}})
+    assert type(base.items) is related.TypedSequence
+    base.items.append("b")
+    base.by_name.add(Tag("y"))
+    assert base.items == ["a", "b"] and len(base.by_name) == 2
+
+    child = FrozenChild(items=["a"], by_name={"x": {}}, labels=["l"])
+    assert type(child.items) is FrozenSequence
+    assert type(child.by_name) is FrozenMapping
+    assert type(child.labels) is FrozenSet
+
+    for a in attr.fields(Base):
+        assert not a.converter.frozen
+    for a in attr.fields(FrozenChild):
+        assert a.converter.frozen
+
+
+def test_lazy_frozen():
+    post = related.to_model(Post, POST)
+    lazy = related.to_model(Post, POST, lazy=True)
+    tags = lazy.tags
+    assert type(tags) is FrozenLazyTypedSequence
+    assert isinstance(tags, FrozenSequence) and type(tags.list) is tuple
+
+    # converted on access, raw items kept in the tuple
+    assert tags[-1] == Tag("y") and tags[1] is tags[-1]
+    assert isinstance(tags.list[1], dict)
+    assert related.to_dict(lazy) == related.to_dict(post)
+
+    for method, args in [(tags.append, (Tag("z"),)),
+                         (tags.extend, ([Tag("z")],)),
+                         (tags.__setitem__, (0, Tag("z"))),
+                         (tags.__delitem__, (0,)),
+                         (tags.pop, ())]:
+        with pytest.raises(FrozenInstanceError):
+            method(*args)
+    assert len(tags) == 2
+
+    assert hash(lazy) == hash(post)
+    assert lazy in {post} and post in {lazy}
+    assert tags.list == (Tag("x"), Tag("y")) and tags[1] is tags.list[1]
+    assert tags == post.tags and post.tags == tags
+    assert repr(tags) == repr(post.tags) and str(tags) == str(post.tags)
+    assert tags[:1] == [Tag("x")] and copy(tags) is tags
+
+    copied = pickle.loads(pickle.dumps(tags))
+    assert type(copied) is FrozenSequence and copied == post.tags
+    assert type(attr.evolve(lazy, title="b").tags) is FrozenSequence
+
+    # mutable lazy sequences for the other models
+    base = related.to_model(Base, {"items": ["a"]}, lazy=True)
+    assert type(base.items) is LazyTypedSequence
+    assert base.items[:1] == ["a"] and str(base.items) == "['a']"
+    base.items.append("b")
+    assert base.items == ["a", "b"]
+    assert type(pickle.loads(pickle.dumps(base.items))) is \
+        related.TypedSequence
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from datetime import date
+import json
+
+import related
+from related.interning import Interner, InternStats, intern_tree
+from ex01_compose_v2.models import Compose
+from ex06_json.models import DayData
+
+
+def compose_document(count):
+    return {"version": "2",
+            "services": dict(("service-%d" % i, {
+                "image": "image-%d:latest" % (i % 2),
+                "ports": ["5000:80"]}) for i in range(count))}
+
+
+def test_interner():
+    interner = Interner()
+    first, second = "".join(["a", "b"]), "".join(["a", "b"])
+    assert first is not second
+
+    assert interner(first) is first
+    assert interner(second) is first
+    big = int("9" * 30)
+    assert interner(big) is big
+    assert interner(int("9" * 30)) is big
+
+    # equal values of other classes or signs are kept apart
+    assert interner(1.0).__class__ is float
+    assert interner(True) is True
+    assert str(interner(-0.0)) == "-0.0"
+    assert interner(None) is None
+
+    nan = float("nan")
+    assert interner(nan) is nan
+    assert interner(date(2017, 1, 1)) is interner(date(2017, 1, 1))
+
+    stats = interner.stats()
+    assert isinstance(stats, InternStats)
+    assert stats.hits == 3
+    assert stats.values == 4
+    assert stats.bytes_saved > 0
+
+    interner.clear()
+    assert interner.stats() == (0, 0, 0)
+
+
+def test_intern_tree():
+    tree = json.loads(json.dumps({"a": ["x" * 10, {"b": "x" * 10}]}),
+                      object_pairs_hook=OrderedDict)
+    copy = intern_tree(tree, True)
+
+    assert copy == tree
+    assert copy is not tree
+    assert isinstance(copy, OrderedDict)
+    assert tree["a"][0] is not tree["a"][1]["b"]
+    assert copy["a"][0] is copy["a"][1]["b"]
+
+
+def test_to_model():
+    interner = Interner()
+    compose = related.to_model(Compose, compose_document(10),
+                               intern=interner)
+    services = list(compose.services.values())
+
+    assert services[0].image is services[2].image
+    assert services[1].image is not services[2].image
+    assert services[0].ports[0] is services[9].ports[0]
+    assert interner.stats().hits > 0
+    assert compose == related.to_model(Compose, compose_document(10))
+
+
+def test_from_json_and_yaml():
+    text = related.to_json(related.to_model(Compose, compose_document(4)))
+    interner = Interner()
+
+    from_json = related.from_json(text, Compose, intern=interner)
+    assert from_json.services["service-0"].image is \
+        from_json.services["service-2"].image
+
+    # values are shared across the loads using the same interner
+    from_yaml = related.from_yaml(related.to_yaml(from_json), Compose,
+                                  intern=interner)
+    assert from_yaml == from_json
+    assert from_yaml.services["service-1"].image is \
+        from_json.services["service-1"].image
+
+    lazy = related.from_json(text, Compose, lazy=True, intern=True)
+    assert lazy == from_json
+
+    values = related.from_json('[["abc", {"abc": "abc"}], "abc"]',
+                               intern=True)
+    assert values[0][0] is values[1]
+    assert values[0][1]["abc"] is values[1]
+
+
+def test_dates_shared():
+    day = dict(date="2017-12-18", logged_on="10:00", open_at="08:00:00",
+               closed_on="18:00:00", customers=1, day_type="Normal")
+    days = [related.to_model(DayData, dict(day), intern=True)
+            for _ in range(2)]
+    assert days[0].date is days[1].date
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from io import StringIO
+
+import pytest
+
+import related
+from ex00_sets_hashes.models import Person
+
+LINES = """{"first_name": "Grace", "last_name": "Hopper"}
+{"first_name": "Katherine", "last_name": "Johnson"}
+
+{"first_name": "Ada", "nickname": "Countess"}
+not json
+{"first_name": "Margaret", "last_name": "Hamilton"}
+"""
+
+
+def test_from_jsonl_dicts():
+    first_lines = "\n".join(LINES.splitlines()[:2])
+    records = list(related.from_jsonl(StringIO(first_lines)))
+    assert records == [
+        OrderedDict(first_name="Grace", last_name="Hopper"),
+        OrderedDict(first_name="Katherine", last_name="Johnson"),
+    ]
+
+
+def test_from_jsonl_raise():
+    records = related.from_jsonl(LINES, Person)
+    assert next(records) == Person(first_name="Grace", last_name="Hopper")
+    assert next(records).last_name == "Johnson"
+
+    with pytest.raises(ValueError):
+        next(records)
+
+
+def test_from_jsonl_skip():
+    records = related.from_jsonl(LINES, Person, on_error="skip")
+    assert [p.first_name for p in records] == ["Grace", "Katherine",
+                                               "Margaret"]
+
+
+def test_from_jsonl_collect():
+    errors = []
+    records = related.from_jsonl(LINES, Person, batch_size=2,
+                                 on_error="collect", errors=errors)
+    assert [len(batch) for batch in records] == [2, 1]
+    assert [e.index for e in errors] == [4, 5]
+    assert errors[1].value == "not json"
+    assert isinstance(errors[1].error, ValueError)
+
+
+def test_invalid_error_policy():
+    with pytest.raises(ValueError):
+        related.from_jsonl(LINES, Person, on_error="ignore")
+
+    with pytest.raises(ValueError):
+        related.from_jsonl(LINES, Person, on_error="collect")
+
+
+def test_to_jsonl():
+    people = [Person(first_name="Grace", last_name="Hopper"),
+              Person(first_name="Ada", last_name="Lovelace")]
+    text = related.to_jsonl(people)
+    assert text == ('{"first_name":"Grace","last_name":"Hopper"}\n'
+                    '{"first_name":"Ada","last_name":"Lovelace"}\n')
+    assert list(related.from_jsonl(text, Person)) == people
+
+    stream = StringIO()
+    assert related.to_jsonl(people * 3, stream, batch_size=4) is None
+    assert stream.getvalue() == text * 3
+
+
+def test_to_jsonl_errors():
+    errors = []
+    items = [Person(first_name="Grace", last_name="Hopper"), object()]
+    text = related.to_jsonl(items, on_error="collect", errors=errors)
+    assert text.count("\n") == 1
+    assert errors[0].index == 1
+    assert isinstance(errors[0].error, TypeError)
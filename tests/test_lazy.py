@@ -0,0 +1,199 @@
+from copy import copy
+from datetime import date
+from os.path import join, dirname
+import json
+import pickle
+
+import attr
+import pytest
+
+import related
+from related import plans
+from related.lazy import LazyTypedSequence, materialize
+from ex06_json.models import StoreData, DayData, DayType
+from ex08_self_reference.models import Node
+
+JSON_FILE = join(dirname(__file__), "ex06_json", "store-data.json")
+
+
+def load_store(**kwargs):
+    return related.from_json(open(JSON_FILE).read(), StoreData, lazy=True,
+                             **kwargs)
+
+
+def test_fields_converted_on_access():
+    store = load_store()
+    assert isinstance(store, StoreData)
+    assert isinstance(store.days, LazyTypedSequence)
+
+    raw_days = store.days.list
+    assert all(isinstance(day, dict) for day in raw_days)
+
+    day = store.days[1]
+    assert isinstance(day, DayData)
+    assert isinstance(raw_days[0], dict)
+    assert store.days[1] is day
+
+    assert day.day_type == DayType.HOLIDAY
+    assert day.date == date(2017, 12, 19)
+    assert day.sales is None
+    assert store.days[1] is day
+    assert store.name == "Acme store"
+
+
+def test_same_as_eager():
+    store = load_store()
+    eager = related.to_model(StoreData, json.load(open(JSON_FILE)))
+    assert store == eager
+    assert eager == store
+    assert not store != eager
+    assert hash(store.days[0]) == hash(eager.days[0])
+    assert repr(store) == repr(eager)
+    assert store.days == eager.days
+    assert str(store.days) == str(eager.days)
+    assert store != "other"
+
+
+def test_to_dict_passes_raw_values():
+    original = json.load(open(JSON_FILE))
+    store = load_store()
+    store.days[0].customers
+    options = dict(suppress_empty_values=True)
+
+    assert json.loads(related.to_json(store, **options)) == original
+    assert dict(related.to_dict(store, **options)) == original
+    assert isinstance(store.days.list[1], dict)
+
+    eager = related.to_model(StoreData, original)
+    assert related.to_dict(materialize(store)) == related.to_dict(eager)
+
+
+def test_validation_on_access():
+    data = json.load(open(JSON_FILE))
+    data["days"][0]["customers"] = "many"
+    store = related.to_model(StoreData, data, lazy=True)
+
+    assert store.days[1].customers == 192
+    with pytest.raises(ValueError):
+        store.days[0].customers
+
+
+def test_missing_and_extra_keys():
+    with pytest.raises(TypeError):
+        related.to_model(DayData, {"date": "2017-12-18"}, lazy=True)
+
+    @related.mutable(strict=True)
+    class Strict(object):
+        name = related.StringField(required=False)
+
+    with pytest.raises(ValueError):
+        related.to_model(Strict, {"other": 1}, lazy=True)
+
+    assert related.to_model(Strict, {}, lazy=True).name is None
+
+
+def test_self_reference():
+    raw = {"name": "root", "node_list": [{"name": "A"}],
+           "node_child": {"name": "C"},
+           "node_map": {"F": {"node_child": {"name": "G"}}}}
+    root = related.to_model(Node, raw, lazy=True)
+
+    assert root.node_child.name == "C"
+    assert root.node_list[0].name == "A"
+    assert root.node_map["F"].node_child.name == "G"
+
+    root.name = "changed"
+    assert related.to_dict(root)["name"] == "changed"
+    assert related.to_dict(root) == related.to_dict(
+        related.to_model(Node, related.to_dict(root)))
+
+
+def test_yaml_and_slices():
+    text = "name: root\nnode_list:\n- name: A\n- name: B\n"
+    root = related.from_yaml(text, Node, lazy=True)
+    assert [n.name for n in root.node_list[::-1]] == ["B", "A"]
+    assert related.to_yaml(root, suppress_empty_values=True) == text
+
+
+def test_pickle_and_copy():
+    store = load_store()
+    restored = pickle.loads(pickle.dumps(store))
+    assert type(restored) is StoreData
+    assert type(restored.days) is related.FrozenSequence
+    assert restored == store
+    assert type(copy(store)) is StoreData
+    assert materialize(restored) is restored
+
+    days = pickle.loads(pickle.dumps(load_store().days))
+    assert type(days) is related.FrozenSequence  # immutable model
+    assert days == store.days
+
+
+@related.mutable
+class Counter(object):
+    name = related.StringField()
+    tags = related.SequenceField(str, required=False)
+    size = related.IntegerField(required=False)
+
+    def __attrs_post_init__(self):
+        self.size = len(self.name)
+
+
+def test_defaults_and_post_init():
+    counter = related.to_model(Counter, {"name": "abc"}, lazy=True)
+    assert counter.size == 3
+    assert repr(counter.tags) == "[]"
+    assert related.to_dict(counter, suppress_empty_values=True) == \
+        {"name": "abc", "size": 3}
+    assert counter != related.to_model(Counter, {"name": "abcd"}, lazy=True)
+
+    with pytest.raises(AttributeError):
+        counter.missing
+
+
+def test_evolve():
+    store = load_store()
+    renamed = attr.evolve(store, name="Other store")
+    assert renamed.name == "Other store"
+    assert renamed.days == store.days
+
+    as_dict = related.to_dict(renamed)
+    assert as_dict["name"] == "Other store"
+    assert as_dict == dict(related.to_dict(store), name="Other store")
+    assert related.from_json(related.to_json(renamed), StoreData) == renamed
+    assert related.to_yaml(renamed) == related.to_yaml(materialize(renamed))
+
+    counter = attr.evolve(related.to_model(Counter, {"name": "a"}, lazy=True),
+                          name="abc")
+    assert related.to_dict(counter) == {"name": "abc", "tags": [], "size": 3}
+    assert related.to_json(counter) == related.to_json(Counter(name="abc"))
+
+
+@related.immutable
+class Tag(object):
+    name = related.StringField()
+
+
+@related.immutable
+class Doc(object):
+    tag = related.ChildField(Tag)
+    tags = related.SequenceField(Tag)
+    by_name = related.MappingField(Tag, "name")
+
+
+def test_lazy_class_built_on_first_lazy_load():
+    raw = {"tag": {"name": "a"}, "tags": [{"name": "b"}],
+           "by_name": {"c": {}}}
+    doc = related.to_model(Doc, raw)
+    assert related.to_model(Doc, doc) is doc
+    assert Tag.__subclasses__() == []
+    assert Doc.__subclasses__() == []
+    assert plans.TRUSTED_LOADER_ATTR not in Tag.__dict__
+
+    lazy = related.to_model(Doc, raw, lazy=True)
+    assert lazy.tag == doc.tag and lazy.tags == doc.tags
+    assert [cls.__name__ for cls in Tag.__subclasses__()] == ["Tag"]
+    assert plans.TRUSTED_LOADER_ATTR not in Tag.__dict__
+
+    assert related.to_model(Doc, raw, trusted=True) == doc
+    assert plans.TRUSTED_LOADER_ATTR in Tag.__dict__
@@ -0,0 +1,113 @@
+from io import StringIO
+import json
+from os.path import join, dirname
+
+import pytest
+
+import related
+from related import parallel
+from ex00_sets_hashes.models import Person
+from ex06_json.models import StoreData
+from ex08_self_reference.models import Node
+
+JSON_FILE = join(dirname(__file__), "ex06_json", "store-data.json")
+
+ROWS = [{"first_name": "P%d" % i, "last_name": "L%d" % i} for i in range(9)]
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(parallel, "CHUNK_SIZE", 2)
+    monkeypatch.setattr(parallel, "PREFETCH", 1)
+
+
+def store_data(days=5):
+    data = json.load(open(JSON_FILE))
+    data["days"] = data["days"] * days
+    return data
+
+
+def test_to_models_and_dicts():
+    people = list(related.to_models(Person, ROWS, workers=2))
+    assert people == list(related.to_models(Person, ROWS))
+
+    batches = list(related.to_dicts(people, batch_size=4, workers=2))
+    assert [len(batch) for batch in batches] == [4, 4, 1]
+    assert batches[2][0] == ROWS[8]
+
+    lazy = related.to_models(Person, ROWS, lazy=True, workers=2)
+    assert [type(p) for p in lazy] == [Person] * 9
+
+
+def test_errors():
+    rows = ROWS[:3] + ["bad"] + ROWS[3:6] + [{"first_name": 1}]
+    errors = []
+    people = related.to_models(Person, rows, on_error="collect",
+                               errors=errors, workers=2)
+    assert len(list(people)) == 6
+    assert [e.index for e in errors] == [3, 7]
+    assert isinstance(errors[0].error, TypeError)
+
+    with pytest.raises(TypeError):
+        list(related.to_models(Person, rows, workers=2))
+
+
+def test_jsonl():
+    people = list(related.to_models(Person, ROWS))
+    text = related.to_jsonl(people, workers=3)
+    assert text == related.to_jsonl(people)
+
+    stream = StringIO()
+    related.to_jsonl(people, stream, batch_size=4, workers=2)
+    assert stream.getvalue() == text
+
+    lines = text.splitlines()
+    lines.insert(4, "not json")
+    errors = []
+    records = related.from_jsonl(lines, Person, on_error="collect",
+                                 errors=errors, workers=2)
+    assert list(records) == people
+    assert errors[0].index == 5
+
+
+def test_json():
+    data = store_data()
+    text = json.dumps(data)
+    store = related.from_json(text, StoreData, workers=2)
+    assert store == related.from_json(text, StoreData)
+    assert len(store.days) == 10
+
+    for kwargs in (dict(), dict(suppress_empty_values=True, indent=None)):
+        expected = related.to_json(store, **kwargs)
+        assert related.to_json(store, workers=2, **kwargs) == expected
+
+        stream = StringIO()
+        related.to_json(store, stream=stream, workers=2, **kwargs)
+        assert stream.getvalue() == expected
+
+    days = tuple(store.days)
+    assert related.to_json(days, workers=2, retain_collection_types=True) \
+        == related.to_json(days)
+
+
+def test_lazy_sequence():
+    store = related.to_model(StoreData, store_data(), lazy=True)
+    store.days[3].customers
+    assert related.to_json(store, workers=2) == related.to_json(store)
+
+
+def test_self_reference():
+    raw = dict(name="root", node_list=[dict(name=str(i)) for i in range(5)])
+    root = related.from_json(json.dumps(raw), Node, workers=2)
+    assert root.node_list[4].name == "4"
+    assert related.to_dict(root, suppress_empty_values=True) == raw
+    assert json.loads(related.to_json(root, suppress_empty_values=True,
+                                      workers=2)) == raw
+
+
+def test_convert_chunk():
+    chunk = [(0, ROWS[0]), (1, "bad")]
+    results, errors = parallel.convert_chunk(related.plans.value_loader,
+                                             (Person,), chunk, "collect")
+    assert results == [related.to_model(Person, ROWS[0])]
+    assert errors[0].index == 1
@@ -0,0 +1,104 @@
+from array import array
+from os.path import join, dirname
+import pickle
+import sys
+
+import attr
+
+import related
+from related.types import BUFFER_MIN_LENGTH, _float_sequence
+from ex01_compose_v2.models import Compose
+from ex06_json.models import StoreData
+from ex08_self_reference.models import Node
+
+JSON_FILE = join(dirname(__file__), "ex06_json", "store-data.json")
+
+CONVERTED = []
+
+
+def counted(value):
+    CONVERTED.append(value)
+    return int(value)
+
+
+@related.immutable
+class Counted(object):
+    count = attr.ib(converter=counted)
+
+
+@related.immutable
+class Series(object):
+    name = related.StringField()
+    values = related.SequenceField(float)
+
+
+@related.mutable(slots=True)
+class Empty(object):
+    pass
+
+
+def round_trip(obj, protocol=pickle.HIGHEST_PROTOCOL):
+    return pickle.loads(pickle.dumps(obj, protocol))
+
+
+def test_models_round_trip():
+    store = related.from_json(open(JSON_FILE), StoreData)
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        assert round_trip(store, protocol) == store
+
+    # state is the tuple of the field values
+    assert store.__getstate__()[:2] == (store.name, store.id)
+
+    node = related.to_model(Node, {"name": "a", "node_list": [{"name": "b"}],
+                                   "node_map": {"c": {"name": "c"}}})
+    assert round_trip(node) == node
+
+    compose = related.to_model(Compose, {"services": {
+        "web": {"build": "."}, "redis": {"image": "redis"}}})
+    copy = round_trip(compose)
+    assert copy == compose
+    assert list(copy.services) == ["web", "redis"]
+    assert copy.services.key == "name"
+
+    assert isinstance(round_trip(Empty()), Empty)
+
+
+def test_not_converted_on_load():
+    obj = Counted("1")
+    del CONVERTED[:]
+    assert round_trip(obj) == obj
+    assert CONVERTED == []
+
+
+def test_float_buffers():
+    series = Series("s", [i / 3.0 for i in range(BUFFER_MIN_LENGTH)])
+
+    buffers = []
+    data = pickle.dumps(series, 5, buffer_callback=buffers.append)
+    assert len(buffers) == 1
+    assert len(data) < 128  # the 8 KiB of floats are out-of-band
+    copy = pickle.loads(data, buffers=buffers)
+    assert copy == series
+    assert isinstance(copy.values, related.FrozenSequence)
+
+    # in-band, and not for short sequences, sequences with None values or
+    # older protocols
+    assert round_trip(series, 5) == series
+    for values in ([1.5] * 10, [None] * BUFFER_MIN_LENGTH):
+        series = Series("s", values)
+        buffers = []
+        data = pickle.dumps(series, 5, buffer_callback=buffers.append)
+        assert buffers == []
+        assert pickle.loads(data) == series
+        assert round_trip(series, 4) == series
+
+    lazy = related.to_model(Series, {"name": "s", "values": [0.5] * 2000},
+                            lazy=True)
+    assert round_trip(lazy, 5) == lazy
+
+
+def test_float_buffer_byte_order():
+    swapped = array("d", [1.5, -2.0])
+    swapped.byteswap()
+    other = "big" if sys.byteorder == "little" else "little"
+    assert _float_sequence(swapped.tobytes(), False, other) == [1.5, -2.0]
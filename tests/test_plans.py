@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from datetime import date
+
+import related
+from related import plans
+
+
+class Secret(object):
+
+    def __init__(self, value):
+        self.value = value
+
+
+@related.mutable
+class Item(object):
+    name = related.StringField()
+    _hidden = related.StringField(required=False)
+    when = related.DateField("%d/%m/%Y", required=False)
+
+
+@related.mutable
+class Basket(object):
+    items = related.SequenceField(Item, key="contents")
+    tags = related.SetField(str, required=False)
+    owner = related.ChildField(object, required=False)
+
+
+def make_basket():
+    return Basket(items=[Item(name="a", hidden="x", when=date(2001, 2, 3)),
+                         Item(name="b")],
+                  tags={"one"})
+
+
+def test_plan_cached_on_class():
+    basket = make_basket()
+    related.to_dict(basket)
+
+    plan = plans.dict_plan(Basket, {})
+    assert plan is plans.dict_plan(Basket, {})
+    assert plan is Basket.__dict__[plans.PLANS_ATTR][()]
+    assert plan.fields[0] == ("items", "contents", None)
+    assert plans.PLANS_ATTR in Item.__dict__
+
+
+def test_plan_output():
+    d = related.to_dict(make_basket())
+    assert d == {
+        "contents": [
+            {"name": "a", "_hidden": "x", "when": "03/02/2001"},
+            {"name": "b", "_hidden": None, "when": None},
+        ],
+        "tags": ["one"],
+        "owner": None,
+    }
+    assert isinstance(d, OrderedDict)
+
+    d = related.to_dict(make_basket(), suppress_private_attr=True,
+                        suppress_empty_values=True, dict_factory=dict)
+    assert d == {"contents": [{"name": "a", "when": "03/02/2001"},
+                              {"name": "b"}],
+                 "tags": ["one"]}
+    assert type(d) is dict
+
+
+def test_retain_collection_types():
+    basket = make_basket()
+    basket.owner = ("x", "y")
+    assert related.to_dict(basket)["owner"] == ["x", "y"]
+    d = related.to_dict(basket, retain_collection_types=True)
+    assert d["owner"] == ("x", "y")
+
+
+def test_collections_to_dict():
+    basket = make_basket()
+    assert related.to_dict(basket.items)[1] == {"name": "b", "_hidden": None,
+                                                "when": None}
+    assert related.to_dict(basket.tags) == ["one"]
+
+    mapping = related.TypedMapping(Item, {"c": Item(name="c")}, key="name")
+    assert related.to_dict(mapping, suppress_map_key_values=True) == {
+        "c": {"_hidden": None, "when": None}}
+    assert related.to_dict(related.TypedMapping(Item, {}),
+                           suppress_empty_values=True) is None
+
+
+def test_dict_values():
+    value = {"when": date(2001, 2, 3), "empty": None, "none": {"a": None}}
+    for options in (dict(), dict(suppress_empty_values=True)):
+        expected = related.to_dict(value, **options)
+        assert plans.encode_value(value, None,
+                                  plans.DictOptions(options)) == expected
+    assert expected == {"when": "2001-02-03"}
+
+
+def test_unhashable_options():
+    options = dict(dict_factory=OrderedDict, unused=[])
+    plan = plans.dict_plan(Item, options)
+    assert plan is not plans.dict_plan(Item, options)
+    assert plan(Item(name="c")) == {"name": "c", "_hidden": None,
+                                    "when": None}
+
+
+def test_register_after_plan_built():
+    basket = make_basket()
+    basket.owner = Secret("value")
+    assert related.to_dict(basket)["owner"] is basket.owner
+
+    @related.to_dict.register(Secret)
+    def _(obj, **kwargs):
+        return "*" * len(obj.value)
+
+    assert related.to_dict(basket)["owner"] == "*****"
+
+
+@related.immutable(strict=True)
+class Renamed(object):
+    is_for = related.StringField(key="for")
+    count = related.IntegerField(required=False)
+
+
+def test_loader_cached_on_class():
+    loader = plans.model_loader(Renamed)
+    assert loader is plans.model_loader(Renamed)
+    assert loader is Renamed.__dict__[plans.LOADER_ATTR]
+    assert loader.keys == (("for", "is_for"), ("count", "count"))
+
+
+def test_loader_arguments():
+    loader = plans.model_loader(Renamed)
+    assert loader.arguments({"for": "x", "count": "1"}) == dict(is_for="x",
+                                                                count="1")
+    assert related.functions.convert_key_to_attr_names(
+        Renamed, {"for": "x"}) == dict(is_for="x")
+    assert loader({"for": "x", "count": "1"}) == Renamed(is_for="x", count=1)
+    assert loader(None) is None
+
+    obj = Renamed(is_for="y")
+    assert loader(obj) is obj
+    assert related.to_model(Renamed, {"for": "y"}) == obj
+
+    try:
+        loader({"for": "x", "extra": 1})
+        assert False, "Did not fail."
+    except ValueError as e:
+        assert "extra" in str(e)
+
+
+def test_value_loader():
+    assert plans.value_loader(Renamed) is plans.model_loader(Renamed)
+    assert plans.value_loader(int)("5") == 5
+    assert plans.value_loader(int)(None) is None
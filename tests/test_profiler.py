@@ -0,0 +1,244 @@
+import json
+from threading import Thread
+from os.path import join, dirname
+
+import pytest
+
+import attr
+
+import related
+from related import plans, profiler
+from ex06_json.models import StoreData, DayData
+from ex08_self_reference.models import Node
+
+JSON_FILE = join(dirname(__file__), "ex06_json", "store-data.json")
+
+STORE = "ex06_json.models.StoreData"
+DAY = "ex06_json.models.DayData"
+
+
+def stats_by_key(stats):
+    return dict(((s["model"], s["field"], s["operation"]), s)
+                for s in stats.to_dict())
+
+
+def test_load_and_dump():
+    text = open(JSON_FILE).read()
+
+    with related.profile() as stats:
+        store = related.from_json(text, StoreData)
+        related.to_json(store)
+
+    assert store == related.from_json(text, StoreData)
+    by_key = stats_by_key(stats)
+
+    assert by_key[(STORE, "*", "load")]["calls"] == 1
+    assert by_key[(STORE, "days", "load")]["calls"] == 1
+    assert by_key[(DAY, "date", "load")]["calls"] == 2
+    assert (DAY, "customers", "load") not in by_key  # timed with the model
+    assert by_key[(DAY, "*", "load")]["calls"] == 2
+    assert by_key[(DAY, "customers", "dump")]["calls"] == 2
+    assert by_key[(STORE, "*", "dump")]["errors"] == 0
+
+    assert by_key[(STORE, "*", "load")]["seconds"] >= \
+        by_key[(DAY, "*", "load")]["seconds"]
+
+    results = stats.results()
+    assert results[0].seconds == max(s.seconds for s in results)
+
+    report = stats.report(limit=3)
+    assert len(report.splitlines()) == 4
+    assert report.splitlines()[0].split() == ["model", "field", "op",
+                                              "calls", "seconds", "errors"]
+
+
+def test_errors():
+    data = json.load(open(JSON_FILE))
+    data["days"][1]["date"] = "never"
+
+    with related.profile() as stats:
+        with pytest.raises(ValueError):
+            related.to_model(StoreData, data)
+
+        with pytest.raises(TypeError):
+            related.to_model(DayData, {"date": "2017-12-18"})
+
+    by_key = stats_by_key(stats)
+    assert by_key[(DAY, "date", "load")]["errors"] == 1
+    assert by_key[(STORE, "days", "load")]["errors"] == 1
+    assert by_key[(STORE, "*", "load")]["errors"] == 1
+    assert by_key[(DAY, "*", "load")]["errors"] == 2
+
+
+def test_same_results_as_unprofiled():
+    raw = {"name": "root", "node_list": [{"name": "A"}],
+           "node_map": {"B": {"node_child": {"name": "C"}}}}
+
+    with related.profile() as stats:
+        root = related.to_model(Node, raw)
+        as_dict = related.to_dict(root, suppress_empty_values=True)
+        lazy = related.to_model(Node, raw, lazy=True)
+        assert related.to_json(lazy, suppress_empty_values=True) == \
+            related.to_json(root, suppress_empty_values=True)
+
+    assert root == related.to_model(Node, raw)
+    assert as_dict == related.to_dict(root, suppress_empty_values=True)
+    assert len(stats.to_dict()) > 0
+
+    stats.reset()
+    assert stats.to_dict() == []
+
+
+def test_disabled_and_nested():
+    original = plans.ModelLoader.__dict__["__call__"]
+
+    with related.profile(enabled=False) as disabled:
+        assert plans.ModelLoader.__dict__["__call__"] is original
+        related.to_model(DayData, json.load(open(JSON_FILE))["days"][0])
+    assert disabled.to_dict() == []
+
+    with related.profile() as outer:
+        with related.profile() as inner:
+            related.to_dict(related.to_model(Node, {"name": "A"}))
+        related.to_model(Node, {"name": "B"})
+
+    assert plans.ModelLoader.__dict__["__call__"] is original
+    assert profiler._active == []
+
+    node = "ex08_self_reference.models.Node"
+    assert stats_by_key(inner)[(node, "*", "load")]["calls"] == 1
+    assert stats_by_key(outer)[(node, "*", "load")]["calls"] == 2
+    assert (node, "*", "dump") in stats_by_key(outer)
+
+
+def test_validators_and_post_init():
+    @related.mutable
+    class Counted(object):
+        name = related.StringField()
+        size = related.IntegerField(required=False)
+        tags = related.SequenceField(str, required=False)
+
+        def __attrs_post_init__(self):
+            self.size = len(self.name)
+
+    with related.profile() as stats:
+        counted = related.to_model(Counted, {"name": "abc"})
+        assert related.to_model(Counted, counted) is counted
+        assert related.to_model(Counted, None) is None
+        with pytest.raises(TypeError):
+            related.to_model(Counted, {"name": None})
+
+    assert counted == Counted(name="abc")
+    assert counted.tags == []
+    # validators are timed with the model
+    errors = [s for s in stats.results() if s.errors]
+    assert [(s.field, s.errors) for s in errors] == [("*", 1)]
+
+
+class Opaque(object):
+    pass
+
+
+@related.to_dict.register(Opaque)
+def opaque_to_dict(obj, **kwargs):
+    raise ValueError("cannot encode")
+
+
+@related.mutable
+class Holder(object):
+    _secret = related.StringField(required=False)
+    value = related.ChildField(object, required=False)
+    items = attr.ib(default=attr.Factory(list))
+    copies = attr.ib(default=attr.Factory(lambda self: list(self.items),
+                                          takes_self=True))
+
+
+def test_defaults_and_dump_errors():
+    with related.profile() as stats:
+        holder = related.to_model(Holder, {"value": 1})
+        assert holder.items == [] and holder.copies == []
+
+        with pytest.raises(TypeError):
+            related.to_model(Holder, {"_secret": "x"})
+
+        with pytest.raises(ValueError):
+            related.to_dict(Holder(value=Opaque()))
+
+    errors = dict(((s.field, s.operation), s.errors)
+                  for s in stats.results() if s.errors)
+    assert errors == {("*", "load"): 1, ("value", "dump"): 1,
+                      ("*", "dump"): 1}
+
+
+@related.immutable(cache_dict=True)
+class Cached(object):
+    name = related.StringField()
+    size = related.IntegerField()
+    day = related.DateField(required=False)
+
+
+@related.mutable
+class PreInit(object):
+    name = related.StringField()
+    calls = []
+
+    def __attrs_pre_init__(self):
+        self.calls.append(True)
+
+
+def test_real_init_and_plan():
+    cached = Cached("a", 1)
+    first = related.to_dict(cached)
+    calls = dict((a.name, a.converter.__class__.__call__)
+                 for a in attr.fields(Cached))
+
+    with related.profile() as stats:
+        # the plan and its cache are used as they are
+        assert related.to_dict(cached) == first
+        obj = related.to_model(Cached, {"name": "b", "size": "2",
+                                        "day": "2020-01-02"})
+        plan = plans.dict_plan(Cached, {})
+        assert plan.encode(obj) is plan.encode(obj)
+        assert related.to_model(PreInit, {"name": "x"}).name == "x"
+
+        # direct calls are not recorded
+        assert Cached("c", "3", "2020-01-03").day.day == 3
+        with pytest.raises(TypeError) as error:
+            Cached(name="b", size=2, extra=1)
+    assert PreInit.calls == [True]
+
+    by_key = stats_by_key(stats)
+    model = "test_profiler.Cached"
+    assert by_key[(model, "*", "dump")]["calls"] == 3
+    assert (model, "name", "dump") in by_key  # one cache miss
+    assert by_key[(model, "size", "dump")]["calls"] == 1
+
+    # converters related created, timed through their class
+    assert by_key[(model, "day", "load")]["calls"] == 1
+    assert (model, "size", "load") not in by_key
+    assert by_key[(model, "*", "load")]["calls"] == 1
+    assert "unexpected keyword argument 'extra'" in str(error.value)
+
+    assert calls == dict((a.name, a.converter.__class__.__call__)
+                         for a in attr.fields(Cached))
+    assert profiler._converter_calls == {}
+
+
+def test_threads():
+    def load(name):
+        for _ in range(20):
+            related.to_model(Node, {"name": name, "node_child": {"name": "c"}})
+
+    with related.profile() as stats:
+        threads = [Thread(target=load, args=(str(i),)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # each thread attributes the conversions to the models it loads
+    by_key = stats_by_key(stats)
+    node = "ex08_self_reference.models.Node"
+    assert by_key[(node, "node_child", "load")]["calls"] == 160  # and None
+    assert by_key[(node, "*", "load")]["calls"] == 160
+    assert profiler._converter_calls == {}
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+import json
+
+import pytest
+
+import related
+from related.sharing import freeze
+from ex01_compose_v2.models import Compose
+from ex06_json.models import StoreData
+
+DAY = {"date": "2017-01-02", "logged_on": "10:00", "open_at": "08:00:00",
+       "closed_on": "18:00:00", "customers": 12, "day_type": "Normal"}
+
+STORE = {"name": "Acme", "id": 1, "created_on": "12/21/2017 14:21:55",
+         "data_from": "2017-01-01T00:00:00",
+         "data_to": "2017-12-31T23:59:59", "price": "1.5",
+         "days": [dict(DAY), dict(DAY), dict(DAY, customers=13),
+                  dict(DAY, sales=0.0), dict(DAY, sales=-0.0)]}
+
+
+@related.immutable
+class Tag(object):
+    name = related.StringField()
+    extra = related.ChildField(object, required=False)
+
+
+@related.mutable
+class Post(object):
+    title = related.StringField()
+    tags = related.SequenceField(Tag)
+
+
+@related.immutable
+class Thread(object):
+    posts = related.SequenceField(Post)
+    pinned = related.ChildField(Post, required=False)
+
+
+def test_shared_days():
+    sharer = related.Sharer()
+    store = related.to_model(StoreData, STORE, share=sharer)
+
+    assert store == related.to_model(StoreData, STORE)
+    days = store.days
+    assert days[0] is days[1]
+    assert days[2] is not days[0]
+    assert days[3] is not days[4]  # 0.0 and -0.0
+    assert str(days[4].sales) == "-0.0"
+
+    assert sharer.stats() == (5, 1, {"DayData": 1})
+
+    # the table is kept for the next loads
+    other = related.from_json(json.dumps(STORE), StoreData, share=sharer)
+    assert other is store
+    assert other.days[0] is days[0]
+    assert sharer.stats().duplicates == 7
+
+    sharer.clear()
+    assert sharer.stats() == (0, 0, {})
+
+
+def test_share_from_json_and_yaml():
+    text = json.dumps(STORE)
+    store = related.from_json(text, StoreData, share=True)
+    assert store.days[0] is store.days[1]
+    assert store == related.from_json(text, StoreData, trusted=True,
+                                      share=True)
+
+    yaml = related.to_yaml(store)
+    copy = related.from_yaml(yaml, StoreData, share=True)
+    assert copy == store
+    assert copy.days[0] is copy.days[1]
+
+
+def test_mutable_models_not_shared():
+    thread = related.to_model(Thread, {
+        "posts": [{"title": "a", "tags": [{"name": "x"}, {"name": "x"}]},
+                  {"title": "a", "tags": [{"name": "x"}]}],
+        "pinned": {"title": "a", "tags": [{"name": "x"}]}}, share=True)
+
+    posts = thread.posts
+    assert posts[0] is not posts[1]
+    assert posts[0].tags[0] is posts[0].tags[1] is posts[1].tags[0]
+    assert thread.pinned.tags[0] is posts[0].tags[0]
+
+    # instances are kept as is
+    post = Post("b", [])
+    thread = related.to_model(Thread, {"posts": [post], "pinned": post},
+                              share=True)
+    assert thread.posts[0] is thread.pinned is post
+
+    compose = related.to_model(Compose, {"services": {
+        "web": {"ports": ["80:80"]}, "api": {"ports": ["80:80"]}}},
+        share=True)
+    assert compose.services["web"].name == "web"
+    assert compose.services["api"].name == "api"
+
+
+def test_unhashable_and_typed_values():
+    values = [{"name": "a", "extra": [1, {"b": 2}]},
+              {"name": "a", "extra": [1, {"b": 2}]},
+              {"name": "a", "extra": {1}},
+              {"name": "a", "extra": bytearray(b"x")},
+              {"name": "a", "extra": 1},
+              {"name": "a", "extra": 1.0},
+              {"name": "a", "extra": True}]
+    sharer = related.Sharer()
+    tags = [related.to_model(Tag, value, share=sharer) for value in values]
+
+    assert tags[0] is tags[1]
+    assert len(set(map(id, tags[2:]))) == 5
+    assert [type(tag.extra) for tag in tags[4:]] == [int, float, bool]
+    assert sharer.stats().duplicates == 1
+
+    assert freeze(OrderedDict(a=[1])) == freeze(OrderedDict(a=[1]))
+    assert freeze({"a": 1}) != freeze({"a": True})
+
+    with pytest.raises(ValueError):
+        related.to_model(Tag, {"name": "a"}, lazy=True, share=True)
+
+    with pytest.raises(ValueError):
+        related.from_json(json.dumps(STORE), StoreData, workers=2,
+                          share=True)
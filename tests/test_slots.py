@@ -0,0 +1,50 @@
+import pickle
+
+import pytest
+
+import related
+
+
+@related.mutable(slots=True)
+class Item(object):
+    name = related.StringField()
+    quantity = related.IntegerField(default=1)
+
+
+@related.mutable(slots=True)
+class Order(object):
+    id = related.IntegerField()
+    items = related.SequenceField(Item)
+    lookup = related.MappingField(Item, "name", required=False)
+
+
+ORDER = {"id": 1, "items": [{"name": "a"}, {"name": "b", "quantity": 2}],
+         "lookup": {"c": {"quantity": 3}}}
+
+
+def test_slotted_mutable():
+    order = related.to_model(Order, ORDER)
+    assert not hasattr(order, "__dict__")
+    assert not hasattr(order.items[0], "__dict__")
+
+    order.id = 2
+    order.items[0].quantity = 5
+    assert related.to_dict(order)["items"][0] == {"name": "a",
+                                                  "quantity": 5}
+
+    with pytest.raises(AttributeError):
+        order.extra = True
+
+
+def test_slotted_loads():
+    order = related.to_model(Order, ORDER)
+
+    assert related.from_json(related.to_json(order), Order) == order
+    assert related.to_model(Order, related.to_dict(order),
+                            trusted=True) == order
+
+    lazy = related.to_model(Order, ORDER, lazy=True)
+    assert lazy.lookup["c"].quantity == 3
+    assert lazy == order
+
+    assert pickle.loads(pickle.dumps(order)) == order
@@ -0,0 +1,163 @@
+from datetime import date, datetime
+from os.path import join, dirname
+
+import attr
+import pytest
+
+import related
+from related import plans
+from ex00_sets_hashes.models import RoleModels
+from ex01_compose_v2.models import Compose
+from ex06_json.models import StoreData, DayData
+from ex08_self_reference.models import Node
+
+JSON_FILE = join(dirname(__file__), "ex06_json", "store-data.json")
+
+COMPOSE = {"version": "2",
+           "services": {"web": {"build": ".", "ports": ["5000:5000"]},
+                        "redis": {"image": "redis:latest"}}}
+
+NODES = {"name": "root",
+         "node_child": {"name": "child"},
+         "node_list": [{"name": "a"}, {"name": "b"}],
+         "node_map": {"c": {"name": "c"}}}
+
+DAY = {"date": "2017-01-02", "logged_on": "10:00", "open_at": "08:00:00",
+       "closed_on": "18:00:00", "customers": "12", "day_type": "Normal"}
+
+
+def counted(values):
+    def convert(value):
+        values.append(value)
+        return int(value)
+    return convert
+
+
+@related.mutable
+class Counter(object):
+    converted = []
+
+    count = attr.ib(converter=counted(converted),
+                    validator=attr.validators.instance_of(int))
+    email = related.RegexField("[^@]+@[^@]+", required=False)
+    tags = attr.ib(default=attr.Factory(list))
+    double = attr.ib(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        self.double = self.count * 2
+
+
+@related.immutable(trusted=True)
+class Cached(object):
+    email = related.RegexField("[^@]+@[^@]+")
+    day = related.ChildField(DayData, required=False)
+
+
+def test_round_trip():
+    text = open(JSON_FILE).read()
+    store = related.from_json(text, StoreData)
+    trusted = related.from_json(related.to_json(store), StoreData,
+                                trusted=True)
+    assert trusted == store
+    assert related.to_json(trusted) == related.to_json(store)
+
+    compose = related.to_model(Compose, COMPOSE)
+    trusted = related.to_model(Compose, related.to_dict(compose),
+                               trusted=True)
+    assert trusted == compose
+    assert trusted.services["web"].ports == ["5000:5000"]
+
+    node = related.to_model(Node, NODES)
+    trusted = related.to_model(Node, related.to_dict(node), trusted=True)
+    assert trusted == node
+    assert trusted.node_map["c"].name == "c"
+
+    models = related.to_model(RoleModels, {"scientists": [
+        {"first_name": "Marie", "last_name": "Curie"}]})
+    trusted = related.to_model(RoleModels, related.to_dict(models),
+                               trusted=True)
+    assert trusted == models
+
+
+def test_validators_skipped():
+    value = {"count": 1, "email": "not an email"}
+
+    with pytest.raises(TypeError):
+        related.to_model(Counter, value)
+
+    counter = related.to_model(Counter, value, trusted=True)
+    assert counter.email == "not an email"
+
+
+def test_converters_short_circuited():
+    del Counter.converted[:]
+
+    counter = related.to_model(Counter, {"count": 2}, trusted=True)
+    assert counter.count == 2
+    assert Counter.converted == []
+
+    counter = related.to_model(Counter, {"count": "3"}, trusted=True)
+    assert counter.count == 3
+    assert Counter.converted == ["3"]
+
+    # datetime is a date subclass, the converter still truncates it
+    day = related.to_model(DayData, dict(DAY, date=datetime(2017, 1, 2, 3)),
+                           trusted=True)
+    assert day.date.__class__ is date
+
+
+def test_defaults_and_post_init():
+    counter = related.to_model(Counter, {"count": 4, "double": 0},
+                               trusted=True)
+    assert counter.tags == []
+    assert counter.double == 8
+    assert counter.email is None
+
+    with pytest.raises(TypeError):
+        related.to_model(Counter, {}, trusted=True)
+
+    assert plans.trusted_loader(Counter)(None) is None
+    assert plans.trusted_loader(Counter)(counter) is counter
+
+
+def test_trusted_class():
+    assert plans.is_trusted(Cached)
+    assert not plans.is_trusted(Counter)
+
+    cached = related.to_model(Cached, {"email": "invalid"})
+    assert cached.email == "invalid"
+
+    with pytest.raises(TypeError):
+        Cached(email="invalid")
+
+    cached = related.from_yaml("email: invalid\n", Cached)
+    assert cached.email == "invalid"
+
+    cached = related.to_model(Cached, {"email": "invalid", "day": DAY})
+    assert cached.day.customers == 12
+    assert cached.day.date == date(2017, 1, 2)
+
+
+def test_batch_functions():
+    values = [{"count": 1, "email": "invalid"}, {"count": 2}]
+    counters = list(related.to_models(Counter, values, trusted=True))
+    assert [c.count for c in counters] == [1, 2]
+
+    lines = '{"count": 1, "email": "invalid"}\n{"count": 2}\n'
+    counters = list(related.from_jsonl(lines, Counter, trusted=True))
+    assert [c.email for c in counters] == ["invalid", None]
+
+    counter = related.from_yaml("count: 5\nemail: invalid\n", Counter,
+                                trusted=True)
+    assert counter.double == 10
+
+
+def test_validated_type():
+    assert plans.validated_type(None) is None
+    assert plans.validated_type(attr.validators.instance_of(int)) is int
+    for name in ("email", "day"):
+        a = attr.fields_dict(Cached)[name]
+        assert plans.validated_type(a.validator) is \
+            (str if name == "email" else DayData)
+    a = attr.fields_dict(Counter)["tags"]
+    assert plans.validated_type(a.validator) is None
@@ -3,6 +3,8 @@ from related.types import TypedSequence, TypedMapping, TypedSet, ImmutableDict
 from attr.exceptions import FrozenInstanceError
 from related.converters import str_if_not_none
 from collections import OrderedDict
+import copy
+import pickle
 import pytest
 
 
@@ -108,3 +110,63 @@ def test_set():
 
     with pytest.raises(TypeError):
         typed.add(5)
+
+
+def test_sequence_bulk():
+    seq = TypedSequence(int, range(3))
+    seq.extend(iter([3, 4]))
+    assert seq == [0, 1, 2, 3, 4]
+
+    with pytest.raises(TypeError):
+        seq.extend([5, "6"])
+    assert seq == [0, 1, 2, 3, 4]
+
+    with pytest.raises(TypeError):
+        TypedSequence(int, [1, "2"])
+
+    trusted = TypedSequence(int, (1, 2), trusted=True)
+    assert trusted == [1, 2] and type(trusted.list) is list
+
+
+def test_set_bulk():
+    typed = TypedSet(int, [1, 2])
+    typed.update(iter([2, 3]))
+    assert typed == {1, 2, 3}
+
+    with pytest.raises(TypeError):
+        typed.update([4, "5"])
+    assert typed == {1, 2, 3}
+
+    assert TypedSet(int, [1], trusted=True) == {1}
+    assert TypedSet(int, None, trusted=True) == set()
+
+
+def test_mapping_bulk():
+    map = TypedMapping(int, OrderedDict(a=1))
+    map.update([("b", 2)], c=3)
+    assert list(map.items()) == [("a", 1), ("b", 2), ("c", 3)]
+
+    with pytest.raises(TypeError):
+        map.update(d=4, e="5")
+    assert len(map) == 3
+
+
+@pytest.mark.parametrize("collection", [
+    TypedSequence(int, [1, 2]),
+    TypedSequence(int, [1], allow_none=False),
+    TypedMapping(int, {"a": 1}, key="name"),
+    TypedSet(int, {1, 2}, allow_none=False),
+])
+def test_slots_and_pickle(collection):
+    assert not hasattr(collection, "__dict__")
+    with pytest.raises(AttributeError):
+        collection.extra = True
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        loaded = pickle.loads(pickle.dumps(collection, protocol))
+        assert loaded == collection
+        assert loaded.allowed_types == collection.allowed_types
+
+    copied = copy.copy(collection)
+    assert copied == collection
+    assert getattr(copied, "key", None) == getattr(collection, "key", None)
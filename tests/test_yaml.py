@@ -0,0 +1,91 @@
+from collections import OrderedDict
+from os.path import join, dirname
+
+import pytest
+import yaml
+
+import related
+from related.functions import yaml_dumper, yaml_loader
+from ex01_compose_v2.models import Compose
+
+YML_FILE = join(dirname(__file__), "ex01_compose_v2", "docker-compose.yml")
+
+
+def test_classes_cached():
+    assert yaml_loader() is yaml_loader()
+    assert yaml_loader() is not yaml_loader(object_pairs_hook=dict)
+    assert yaml_dumper() is yaml_dumper()
+    assert yaml_dumper() is not yaml_dumper(yaml.SafeDumper)
+    assert issubclass(yaml_loader(), related.functions.YAML_LOADER)
+
+
+def test_pure_python_classes():
+    original_yaml = open(YML_FILE).read().strip()
+    compose = related.from_yaml(original_yaml, Compose,
+                                loader_cls=yaml.SafeLoader)
+    assert compose == related.from_yaml(original_yaml, Compose)
+
+    generated_yaml = related.to_yaml(compose, dumper_cls=yaml.SafeDumper,
+                                     suppress_empty_values=True,
+                                     suppress_map_key_values=True)
+    assert generated_yaml.strip() == original_yaml
+
+
+def test_same_as_to_dict():
+    compose = related.from_yaml(open(YML_FILE).read(), Compose)
+    for kwargs in (dict(), dict(suppress_empty_values=True)):
+        expected = yaml.dump(related.to_dict(compose, **kwargs),
+                             Dumper=yaml_dumper(), default_flow_style=False)
+        assert related.to_yaml(compose, **kwargs) == expected
+
+
+def test_typed_collections():
+    sequence = related.TypedSequence(str, ["a", "b"])
+    mapping = related.TypedMapping(int, OrderedDict([("z", 1), ("a", 2)]))
+    data = OrderedDict([("sequence", sequence), ("mapping", mapping),
+                        ("set", related.TypedSet(str, {"c"}))])
+
+    text = yaml.dump(data, Dumper=yaml_dumper(), default_flow_style=False)
+    assert text == "sequence:\n- a\n- b\nmapping:\n  z: 1\n  a: 2\nset:\n- c\n"
+    assert related.to_yaml(sequence, formatter="%Y") == "- a\n- b\n"
+
+
+@related.immutable
+class Renamed(object):
+    is_for = related.StringField(key="for")
+    count = related.IntegerField(key="n", required=False)
+
+
+def test_key_names_on_every_path():
+    text = "for: everyone\nn: '3'\n"
+    expected = Renamed(is_for="everyone", count=3)
+
+    for kwargs in (dict(share=True), dict(lazy=True),
+                   dict(share=True, intern=True)):
+        obj = related.from_yaml(text, Renamed, **kwargs)
+        assert (obj.is_for, obj.count) == ("everyone", 3), kwargs
+        assert obj == expected
+
+    # trusted input is not converted
+    trusted = related.from_yaml("for: everyone\nn: 3\n", Renamed,
+                                trusted=True)
+    assert trusted == expected
+    assert related.to_yaml(expected) == "for: everyone\nn: 3\n"
+
+
+@related.mutable
+class Box(object):
+    items = related.SequenceField(str)
+    label = related.StringField(key="name")
+
+
+def test_attribute_names_by_default():
+    # the constructor arguments, as in previous versions
+    assert related.from_yaml("items: []\nlabel: x\n", Box) == Box([], "x")
+    assert related.from_yaml("items: [a]\n", Box, label="y") == \
+        Box(["a"], "y")
+    assert related.from_yaml("is_for: all\ncount: '2'\n", Renamed,
+                             intern=True) == Renamed("all", 2)
+
+    with pytest.raises(TypeError):
+        related.from_yaml("items: []\nname: x\n", Box)